@@ -0,0 +1,106 @@
+# abi_index.py
+# Precomputed lookup tables for a contract ABI: function selectors, event
+# topic0 hashes, error selectors and the canonical input/output types of each.
+# extract_abi.py writes one next to every ABI (abi/<Contract>.index.json);
+# at runtime it is a small JSON read instead of re-hashing signatures.
+#
+# Layout:
+#   {"version", "contract", "abi_sha256",
+#    "functions": {key: {"signature", "selector", "inputs", "input_names", "outputs", "state_mutability"}},
+#    "events":    {key: {"signature", "topic", "inputs", "input_names", "indexed", "anonymous"}},
+#    "errors":    {key: {"signature", "selector", "inputs"}},
+#    "selectors": {selector: function key}, "topics": {topic: event key}}
+# key is the name, or the full signature for overloaded names.
+import json
+import hashlib
+
+from eth_utils import keccak
+
+INDEX_VERSION = 1
+
+
+def canonical_type(param):
+    """ABI type as it appears in a signature; tuples expand to their components"""
+    kind = param["type"]
+    if kind.startswith("tuple"):
+        return "(" + ",".join(canonical_type(component) for component in param["components"]) + ")" + kind[len("tuple"):]
+    return kind
+
+
+def signature(entry):
+    return f"{entry['name']}({','.join(canonical_type(param) for param in entry.get('inputs', []))})"
+
+
+def abi_bytes(abi):
+    """The ABI serialized the way extract_abi.py writes it"""
+    return json.dumps(abi, indent=2).encode()
+
+
+def _keyed(entries):
+    """{key: entry}, keyed by name unless the name is overloaded"""
+    counts = {}
+    for entry in entries:
+        counts[entry["name"]] = counts.get(entry["name"], 0) + 1
+    return {(entry["name"] if counts[entry["name"]] == 1 else signature(entry)): entry for entry in entries}
+
+
+def build_index(abi, contract=None, abi_sha256=None):
+    """Lookup tables for abi (a list of ABI entries)"""
+    by_type = {kind: [entry for entry in abi if entry.get("type") == kind] for kind in ("function", "event", "error")}
+    functions, events, errors = {}, {}, {}
+
+    for key, entry in _keyed(by_type["function"]).items():
+        functions[key] = {
+            "signature": signature(entry),
+            "selector": "0x" + keccak(text=signature(entry))[:4].hex(),
+            "inputs": [canonical_type(param) for param in entry["inputs"]],
+            "input_names": [param["name"] for param in entry["inputs"]],
+            "outputs": [canonical_type(param) for param in entry.get("outputs", [])],
+            "state_mutability": entry.get("stateMutability"),
+        }
+    for key, entry in _keyed(by_type["event"]).items():
+        events[key] = {
+            "signature": signature(entry),
+            "topic": "0x" + keccak(text=signature(entry)).hex(),
+            "inputs": [canonical_type(param) for param in entry["inputs"]],
+            "input_names": [param["name"] for param in entry["inputs"]],
+            "indexed": [bool(param.get("indexed")) for param in entry["inputs"]],
+            "anonymous": bool(entry.get("anonymous")),
+        }
+    for key, entry in _keyed(by_type["error"]).items():
+        errors[key] = {
+            "signature": signature(entry),
+            "selector": "0x" + keccak(text=signature(entry))[:4].hex(),
+            "inputs": [canonical_type(param) for param in entry["inputs"]],
+        }
+
+    return {
+        "version": INDEX_VERSION,
+        "contract": contract,
+        "abi_sha256": abi_sha256 or hashlib.sha256(abi_bytes(abi)).hexdigest(),
+        "functions": functions,
+        "events": events,
+        "errors": errors,
+        "selectors": {entry["selector"]: key for key, entry in functions.items()},
+        "topics": {entry["topic"]: key for key, entry in events.items() if not entry["anonymous"]},
+    }
+
+
+def index_path(abi_path):
+    return abi_path[:-len(".json")] + ".index.json" if abi_path.endswith(".json") else abi_path + ".index.json"
+
+
+def load_index(abi_path):
+    """Index for the ABI file at abi_path; rebuilt in memory if the stored one is missing or stale"""
+    with open(abi_path, "rb") as abi_file:
+        raw_abi = abi_file.read()
+    abi_sha256 = hashlib.sha256(raw_abi).hexdigest()
+    try:
+        with open(index_path(abi_path)) as index_file:
+            index = json.load(index_file)
+        if index.get("version") == INDEX_VERSION and index.get("abi_sha256") == abi_sha256:
+            return index
+    except (OSError, ValueError):
+        pass
+    print(f"ABI index for {abi_path} is missing or stale, building it (run extract_abi.py to store it)")
+    return build_index(json.loads(raw_abi), abi_sha256=abi_sha256)
@@ -0,0 +1,98 @@
+# api_client.py
+# What the Streamlit page talks to. With ZAGENT_API_URL set every call goes to
+# api_server.py over HTTP, so the UI and the backend scale independently;
+# without it the same functions run in-process through service.py.
+import os
+
+import requests
+from requests.adapters import HTTPAdapter
+
+API_URL = os.getenv("ZAGENT_API_URL", "").rstrip("/")
+API_TIMEOUT = float(os.getenv("ZAGENT_API_TIMEOUT", "180"))
+
+
+class APIError(Exception):
+    """The backend answered with an error status"""
+
+
+class HTTPBackend:
+    """service.py interface over HTTP"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.session = requests.Session()
+        self.session.mount(base_url, HTTPAdapter(pool_maxsize=20))
+
+    def _request(self, method, path, **kwargs):
+        response = self.session.request(method, self.base_url + path, timeout=API_TIMEOUT, **kwargs)
+        if response.status_code >= 400:
+            try:
+                error = response.json().get("error")
+            except ValueError:
+                error = response.text
+            raise APIError(f"{response.status_code}: {error}")
+        return response
+
+    def get_eth_price(self):
+        data = self._request("GET", "/price").json()
+        return data["price"], data["change_24h"]
+
+    def get_market_summary(self):
+        return self._request("GET", "/markets").json()["assets"]
+
+    def get_defi_recommendation(self, user_input, risk_profile):
+        payload = {"user_input": user_input, "risk_profile": risk_profile}
+        return self._request("POST", "/recommendation", json=payload).json()["recommendation"]
+
+    def stream_defi_recommendation(self, user_input, risk_profile):
+        payload = {"user_input": user_input, "risk_profile": risk_profile}
+        with self._request("POST", "/recommendation/stream", json=payload, stream=True) as response:
+            # Closing the response early (e.g. Streamlit aborting the run) makes the server stop generating
+            yield from response.iter_content(chunk_size=None, decode_unicode=True)
+
+    def send_to_blockchain(self, prompt_text, model_id=11, session_id=None):
+        payload = {"prompt": prompt_text, "model_id": model_id, "session_id": session_id}
+        return self._request("POST", "/submissions", json=payload).json()["tx_hash"]
+
+    def get_transaction_status(self, tx_hash):
+        try:
+            return self._request("GET", f"/submissions/{tx_hash}").json()
+        except APIError:
+            return None
+
+    def list_requests(self, session_id, limit=50):
+        return self._request("GET", f"/sessions/{session_id}/requests", params={"limit": limit}).json()["requests"]
+
+    def get_request_result(self, tx_hash):
+        try:
+            return self._request("GET", f"/submissions/{tx_hash}/result").json()["result"]
+        except APIError:
+            return None
+
+    def get_blockchain_result(self, model_id, prompt_text):
+        params = {"model_id": model_id, "prompt": prompt_text}
+        return self._request("GET", "/result", params=params).json()["result"]
+
+    def recommend_and_submit(self, user_input, risk_profile, blockchain_prompt=None, model_id=11, session_id=None):
+        payload = {"user_input": user_input, "risk_profile": risk_profile,
+                   "blockchain_prompt": blockchain_prompt, "model_id": model_id, "session_id": session_id}
+        return self._request("POST", "/pipeline", json=payload).json()
+
+
+class InProcessBackend:
+    """service.py in this process, imported on the first call rather than when the page loads"""
+
+    def __getattr__(self, name):
+        import service
+        return getattr(service, name)
+
+
+_backend = None
+
+
+def get_backend():
+    """HTTP backend when ZAGENT_API_URL is set, otherwise the in-process service module"""
+    global _backend
+    if _backend is None:
+        _backend = HTTPBackend(API_URL) if API_URL else InProcessBackend()
+    return _backend
@@ -0,0 +1,268 @@
+# api_server.py
+# Headless HTTP API for service.py, so the backend can run behind a load
+# balancer without the Streamlit UI. Stdlib only.
+#
+# Connections are handed to a fixed pool of worker threads through a bounded
+# queue. When the queue is full the server answers 503 with Retry-After right
+# away (backpressure) instead of piling up threads. Calls refused by an
+# exhausted upstream rate limit (rate_limit.UpstreamBusy) get a 503 too.
+#
+# Every request runs in a tracing context; its correlation id is taken from the
+# X-Correlation-ID header when present and echoed back. GET /metrics serves
+# Prometheus text.
+#
+# The server listens right away and warms up (web3, clients, price cache) in
+# the background: GET /health is liveness, GET /ready answers 503 until the
+# warm-up has finished, for the orchestrator's readiness probe.
+#
+# Usage: python api_server.py  (API_HOST, API_PORT, API_WORKERS, API_QUEUE_SIZE)
+import startup  # First, so STARTUP_PROFILE=1 times every import after it
+import os
+import re
+import json
+import queue
+import itertools
+import threading
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import service
+from tracing import request_context, render_metrics, register_stats
+from rate_limit import UpstreamBusy
+
+API_HOST = os.getenv("API_HOST", "0.0.0.0")
+API_PORT = int(os.getenv("API_PORT", "8080"))
+API_WORKERS = int(os.getenv("API_WORKERS", "16"))
+API_QUEUE_SIZE = int(os.getenv("API_QUEUE_SIZE", "64"))
+RETRY_AFTER_SECONDS = os.getenv("API_RETRY_AFTER", "1")
+
+# Idle keep-alive connections give their worker back after this many seconds
+KEEPALIVE_TIMEOUT = float(os.getenv("API_KEEPALIVE_TIMEOUT", "5"))
+
+BUSY_BODY = b'{"error": "overloaded"}'
+BUSY_RESPONSE = (
+    "HTTP/1.1 503 Service Unavailable\r\n"
+    f"Retry-After: {RETRY_AFTER_SECONDS}\r\n"
+    "Content-Type: application/json\r\n"
+    f"Content-Length: {len(BUSY_BODY)}\r\n"
+    "Connection: close\r\n\r\n"
+).encode("ascii") + BUSY_BODY
+
+
+class BadRequest(Exception):
+    """Invalid client input, answered with 400"""
+
+
+def _integer(source, name, default):
+    """source[name] as an int (default when absent); BadRequest if it isn't one"""
+    try:
+        return int(source.get(name, default))
+    except (TypeError, ValueError):
+        raise BadRequest(f"{name} must be an integer")
+
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer with a fixed worker pool and a bounded accept queue"""
+
+    def __init__(self, server_address, handler_class, workers=API_WORKERS, queue_size=API_QUEUE_SIZE):
+        super().__init__(server_address, handler_class)
+        self.requests_queue = queue.Queue(maxsize=queue_size)
+        self.rejected = 0
+        for index in range(workers):
+            threading.Thread(target=self._worker, name=f"api-worker-{index}", daemon=True).start()
+
+    def process_request(self, request, client_address):
+        try:
+            self.requests_queue.put_nowait((request, client_address))
+        except queue.Full:
+            self.rejected += 1
+            try:
+                request.sendall(BUSY_RESPONSE)
+            finally:
+                self.shutdown_request(request)
+
+    def _worker(self):
+        while True:
+            request, client_address = self.requests_queue.get()
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+
+class APIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive and chunked streaming
+    timeout = KEEPALIVE_TIMEOUT
+    correlation_id = None
+
+    # Routing
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/health":
+            return self._json(200, {"status": "ok", "queued": self.server.requests_queue.qsize(),
+                                    "rejected": self.server.rejected})
+        if url.path == "/ready":
+            return self._json(200 if startup.is_ready() else 503, startup.readiness())
+        if url.path == "/metrics":
+            return self._text(200, render_metrics(), "text/plain; version=0.0.4")
+        self._traced(self._route_get, url)
+
+    def do_POST(self):
+        self._traced(self._route_post, urlparse(self.path))
+
+    def _traced(self, route, url):
+        # Metric label: the route, without per-transaction path segments
+        name = self.command + " " + re.sub(r"^/(submissions|sessions)/[^/]+", r"/\1/<id>", url.path)
+        with request_context(name, self.headers.get("X-Correlation-ID")) as trace:
+            self.correlation_id = trace.correlation_id
+            try:
+                route(url)
+            finally:
+                self.correlation_id = None  # Keep-alive: the next request on this connection gets its own
+
+    def _route_get(self, url):
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if url.path == "/price":
+            def price():
+                price, change_24h = service.get_eth_price()
+                return {"price": price, "change_24h": change_24h}
+            return self._call(price)
+        if url.path == "/markets":
+            return self._call(lambda: {"assets": service.get_market_summary()})
+        if url.path.startswith("/submissions/") and url.path.endswith("/result"):
+            return self._call(lambda: service.get_request_result(url.path.split("/")[2]), respond=lambda result: self._json(
+                200 if result is not None else 404, {"result": result} if result is not None else {"error": "unknown transaction"}))
+        if url.path.startswith("/submissions/"):
+            return self._call(lambda: service.get_transaction_status(url.path.rsplit("/", 1)[1]), respond=lambda status: self._json(
+                200 if status else 404, status or {"error": "unknown transaction"}))
+        if url.path.startswith("/sessions/") and url.path.endswith("/requests"):
+            return self._call(lambda: {"requests": service.list_requests(url.path.split("/")[2], _integer(query, "limit", 50))})
+        if url.path == "/result":
+            return self._call(lambda: {"result": service.get_blockchain_result(_integer(query, "model_id", 11), query["prompt"])})
+        self._json(404, {"error": "not found"})
+
+    def _route_post(self, url):
+        path = url.path
+        body = self._read_json()
+        if body is None:
+            return self._json(400, {"error": "invalid JSON body"})
+        if path == "/recommendation":
+            return self._call(lambda: {"recommendation": service.get_defi_recommendation(body["user_input"], body["risk_profile"])})
+        if path == "/recommendation/stream":
+            return self._call(lambda: self._start_stream(service.stream_defi_recommendation(
+                body["user_input"], body["risk_profile"])), respond=self._stream)
+        if path == "/submissions":
+            return self._call(lambda: {"tx_hash": service.send_to_blockchain(
+                body["prompt"], _integer(body, "model_id", 11), body.get("session_id"))})
+        if path == "/pipeline":
+            return self._call(lambda: service.recommend_and_submit(
+                body["user_input"], body["risk_profile"], body.get("blockchain_prompt"), _integer(body, "model_id", 11),
+                session_id=body.get("session_id")))
+        self._json(404, {"error": "not found"})
+
+    # Helpers
+
+    def _call(self, fn, respond=None):
+        try:
+            result = fn()
+        except UpstreamBusy as busy:
+            # Shed load instead of queueing behind an exhausted rate limit
+            self._json(503, {"error": str(busy)}, {"Retry-After": str(max(1, round(busy.retry_after)))})
+        except KeyError as missing:
+            self._json(400, {"error": f"missing field {missing}"})
+        except BadRequest as error_message:
+            self._json(400, {"error": str(error_message)})
+        except Exception as error_message:
+            self._json(502, {"error": str(error_message)})
+        else:
+            if respond is None:
+                self._json(200, result)
+            else:
+                respond(result)
+
+    def _read_json(self):
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return None
+        return body if isinstance(body, dict) else None
+
+    def _json(self, status, payload, headers=None):
+        self._text(status, json.dumps(payload), "application/json", headers)
+
+    def _text(self, status, text, content_type, headers=None):
+        data = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self._correlation_header()
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _correlation_header(self):
+        if self.correlation_id is not None:
+            self.send_header("X-Correlation-ID", self.correlation_id)
+
+    @staticmethod
+    def _start_stream(chunks):
+        """Run a chunk generator up to its first chunk, while errors can still get their own status
+
+        Missing fields, a refused rate-limit token and a failed Claude request all
+        happen before the first text, so they surface as 400 / 503 / 502 rather
+        than as a 200 stream that breaks off.
+        """
+        first = next(chunks, None)
+        return chunks, [] if first is None else [first]
+
+    def _stream(self, started):
+        """Send text chunks with chunked transfer encoding as they are produced"""
+        chunks, first = started
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self._correlation_header()
+        self.end_headers()
+        try:
+            for text in itertools.chain(first, chunks):
+                data = text.encode("utf-8")
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # Client went away: closing the generator closes the Claude stream too
+            chunks.close()
+            self.close_connection = True
+        except Exception as error_message:
+            chunks.close()
+            print(f"Error streaming recommendation: {str(error_message)}")
+            self.close_connection = True
+
+
+def _warm_up():
+    try:
+        service.warm_up()
+    except Exception as error_message:
+        # Requests still work, they just build what's missing themselves
+        print(f"Error warming up: {str(error_message)}")
+    startup.mark_ready()
+
+
+def main():
+    server = PooledHTTPServer((API_HOST, API_PORT), APIHandler)
+    register_stats("zagent_api", lambda: {"queued": server.requests_queue.qsize(), "rejected_total": server.rejected})
+    register_stats("zagent_startup", lambda: {"ready": int(startup.is_ready()),
+                                              **{f"{phase}_seconds": seconds for phase, seconds in startup.phases().items()}})
+    print(f"zAgent API listening on {API_HOST}:{API_PORT} ({API_WORKERS} workers, queue {API_QUEUE_SIZE})")
+    startup.mark("listening")
+    threading.Thread(target=_warm_up, name="warm-up", daemon=True).start()
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
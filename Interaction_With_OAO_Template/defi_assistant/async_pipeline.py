@@ -0,0 +1,273 @@
+# async_pipeline.py
+# Asyncio path that runs the Claude recommendation and the on-chain submission
+# concurrently, so end-to-end latency is the slowest stage instead of the sum.
+#
+# All coroutines run on one long-lived event loop in a background thread; the
+# AsyncWeb3 / AsyncAnthropic / aiohttp clients are bound to that loop and reused.
+# Callers outside asyncio use run_pipeline(), which returns a concurrent.futures
+# Future that can be waited on or cancelled.
+import os
+import time
+import asyncio
+import threading
+
+import aiohttp
+from web3 import AsyncWeb3
+from anthropic import AsyncAnthropic
+
+from resources import get_web3, get_account, get_contract_abi, get_provider_pool
+from price_cache import eth_price_cache, parse_eth_price, COINGECKO_SIMPLE_PRICE_URL, ETH_PRICE_PARAMS
+from recommendation import build_recommendation_request, message_text, CLAUDE_MODEL
+from recommendation_cache import recommendation_cache, make_key
+from market_data import market_cache, market_context
+from tick_store import get_tick_store, trend_context
+from nonce_manager import get_nonce_manager
+from fee_oracle import fee_oracle
+from receipt_tracker import receipt_tracker
+from token_budget import log_token_usage
+from ledger import get_request_ledger
+from tracing import request_context, span, link
+from rate_limit import anthropic_upstream, coingecko_upstream, HIGH
+import prompt_bindings as bindings  # Generated encoders/decoders for Prompt.sol
+
+# Per-stage timeouts in seconds
+PRICE_TIMEOUT = float(os.getenv("PIPELINE_PRICE_TIMEOUT", "5"))
+RECOMMENDATION_TIMEOUT = float(os.getenv("PIPELINE_RECOMMENDATION_TIMEOUT", "120"))
+PREFLIGHT_TIMEOUT = float(os.getenv("PIPELINE_PREFLIGHT_TIMEOUT", "15"))
+SUBMIT_TIMEOUT = float(os.getenv("PIPELINE_SUBMIT_TIMEOUT", "15"))
+
+_loop = None
+_loop_lock = threading.Lock()
+_clients = {}  # Only touched from the loop thread
+
+
+def get_loop():
+    """The process-wide event loop, started in a daemon thread on first use"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="async-pipeline", daemon=True).start()
+        return _loop
+
+
+def _client(name, factory):
+    if name not in _clients:
+        _clients[name] = factory()
+    return _clients[name]
+
+
+def get_async_web3():
+    # Bound to the pool's primary endpoint: the submission's nonce and broadcast must hit the same node
+    return _client("web3", lambda: AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(get_provider_pool().primary.url)))
+
+
+def get_async_contract():
+    return _client("contract", lambda: get_async_web3().eth.contract(
+        address=os.getenv("CONTRACT_ADDRESS"), abi=get_contract_abi()))
+
+
+def get_async_anthropic_client():
+    return _client("anthropic", lambda: AsyncAnthropic(api_key=os.getenv("CLAUDE_API_KEY"), max_retries=0))
+
+
+def get_http_client():
+    # aiohttp is already installed as the transport of AsyncWeb3
+    return _client("http", lambda: aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=PRICE_TIMEOUT)))
+
+
+# Stages
+
+async def fetch_eth_price_async():
+    """ETH price and 24h change, from the shared cache when it is fresh"""
+    cached = eth_price_cache.peek()
+    if cached is not None:
+        return cached
+
+    async def fetch():
+        async with get_http_client().get(COINGECKO_SIMPLE_PRICE_URL, params=ETH_PRICE_PARAMS) as response:
+            response.raise_for_status()
+            return parse_eth_price(await response.json())
+
+    with span("coingecko.price"):
+        price = await coingecko_upstream.call_async(fetch, key="eth_price", priority=HIGH)
+    eth_price_cache.set(price)  # Sync callers benefit from this fetch too
+    return price
+
+
+async def get_defi_recommendation_async(user_input, risk_profile, eth_price, eth_change):
+    # Market overview only if it is already cached; it is not worth a stage of its own
+    market_info = market_context(market_cache.peek()) + trend_context(get_tick_store())
+    cache_key = make_key(user_input, risk_profile, eth_price, eth_change, extra=CLAUDE_MODEL, context=market_info)
+    cached = recommendation_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    request_kwargs = build_recommendation_request(user_input, risk_profile, eth_price, eth_change, market_info)
+
+    async def create():
+        with span("claude.create"):
+            message = await get_async_anthropic_client().messages.create(**request_kwargs)
+        log_token_usage(request_kwargs, message.usage.input_tokens, message.usage.output_tokens)
+        return message_text(message)
+
+    final_str = await anthropic_upstream.call_async(create, key=cache_key, priority=HIGH)
+    recommendation_cache.put(cache_key, final_str)
+    return final_str
+
+
+async def preflight_async(prompt_text, model_id=11):
+    """Fee, gas pricing, chain id, nonce and gas limit for a submission"""
+    w3 = get_async_web3()
+    contract = get_async_contract()
+    account = get_account()
+    nonce_manager = get_nonce_manager(get_web3(), account.address)
+
+    # The same per-block quote the sync path uses: within a block this is a dictionary
+    # lookup, otherwise one batched round trip (run off the loop, it is a blocking call)
+    quote = await asyncio.to_thread(fee_oracle.quote, model_id,
+                                    account.address if nonce_manager.needs_sync() else None)
+    if 'nonce' in quote:
+        nonce_manager.seed(quote['nonce'])
+    fee = quote['fee']
+    pricing = {name: quote[name] for name in ('maxFeePerGas', 'maxPriorityFeePerGas', 'gasPrice') if name in quote}
+
+    data = AsyncWeb3.to_hex(bindings.encode_calculate_ai_result(model_id, prompt_text))
+    gas = fee_oracle.cached_gas_limit(model_id, prompt_text)
+    if gas is None:
+        with span("rpc.estimate_gas"):
+            estimate = await w3.eth.estimate_gas({'from': account.address, 'to': contract.address, 'data': data, 'value': fee})
+        gas = fee_oracle.remember_gas_estimate(model_id, prompt_text, estimate)
+
+    return {'fee': fee, 'chain_id': quote['chain_id'], 'gas': gas, 'data': data, 'to': contract.address, **pricing}
+
+
+async def _allocate_nonce(nonce_manager):
+    """nonce_manager.allocate() off the event loop, since it may need a get_transaction_count round trip
+
+    Shielded: a caller cancelled meanwhile doesn't stop the thread, so the nonce
+    it goes on to allocate is given back when it arrives instead of leaving a gap.
+    """
+    allocation = asyncio.ensure_future(asyncio.to_thread(nonce_manager.allocate))
+    try:
+        return await asyncio.shield(allocation)
+    except asyncio.CancelledError:
+        def give_back(done):
+            if not done.cancelled() and done.exception() is None:
+                nonce_manager.release(done.result())  # Never used for a transaction
+        allocation.add_done_callback(give_back)
+        raise
+
+
+async def submit_prompt_async(prompt_text, model_id, quote, session_id=None):
+    """Sign locally and broadcast through AsyncWeb3; returns the tx hash"""
+    ledger = get_request_ledger()
+    w3 = get_async_web3()
+    account = get_account()
+    nonce_manager = get_nonce_manager(get_web3(), account.address)
+    pricing = {name: quote[name] for name in ('maxFeePerGas', 'maxPriorityFeePerGas', 'gasPrice') if name in quote}
+
+    nonce = await _allocate_nonce(nonce_manager)
+    record = None
+    sending = False
+    try:
+        tx = {
+            'from': account.address,
+            'to': quote['to'],
+            'data': quote['data'],
+            'value': quote['fee'],
+            'gas': quote['gas'],
+            'nonce': nonce,
+            'chainId': quote['chain_id'],
+            **pricing,
+        }
+        with span("sign"):
+            signed_tx = account.sign_transaction(tx)
+        signed_hash = AsyncWeb3.to_hex(signed_tx.hash)
+        # sqlite write, off the loop; shielded so the row can still be closed below if we are cancelled meanwhile
+        record = asyncio.ensure_future(asyncio.to_thread(ledger.record, signed_hash, prompt_text, model_id, session_id))
+        await asyncio.shield(record)
+        sending = True
+        with span("rpc.send_raw_transaction"):
+            tx_hash = AsyncWeb3.to_hex(await w3.eth.send_raw_transaction(signed_tx.rawTransaction))
+    except BaseException as error:
+        # BaseException: a stage timeout or run_pipeline's cancel() arrives as CancelledError
+        if sending and isinstance(error, asyncio.CancelledError):
+            # Cancelled mid-broadcast: the node may already have the transaction, so its nonce
+            # can't be reused; resync from the chain and let the tracker settle the row
+            nonce_manager.resync()
+            receipt_tracker.track(signed_hash, model_id=model_id, prompt=prompt_text)
+            raise
+        nonce_manager.abandon(nonce, error)
+        if record is not None:
+            await asyncio.wait([record])
+            if not record.cancelled() and record.exception() is None:
+                ledger.update(signed_hash, status="error", error=str(error) or "cancelled")
+        raise
+
+    link(tx_hash=tx_hash)
+    receipt_tracker.track(tx_hash, model_id=model_id, prompt=prompt_text)
+    return tx_hash
+
+
+# Pipeline
+
+async def _stage(name, coro, timeout, timings, errors):
+    """Run one stage with a timeout, recording its duration and any error"""
+    start = time.perf_counter()
+    try:
+        with span(f"pipeline.{name}"):
+            return await asyncio.wait_for(coro, timeout)
+    except asyncio.TimeoutError:
+        errors[name] = f"timed out after {timeout}s"
+    except Exception as error_message:
+        errors[name] = str(error_message)
+    finally:
+        timings[name] = time.perf_counter() - start
+    return None
+
+
+async def recommend_and_submit(user_input, risk_profile, blockchain_prompt=None, model_id=11, correlation_id=None,
+                               session_id=None):
+    """Recommendation and oracle submission side by side
+
+    The recommendation waits only for the price; the chain branch (preflight,
+    then sign + broadcast) runs concurrently with both. A failing stage is
+    reported in 'errors' without stopping the other branch.
+    """
+    with request_context("pipeline", correlation_id) as trace:
+        result = await _recommend_and_submit(user_input, risk_profile, blockchain_prompt, model_id, session_id)
+    result["correlation_id"] = trace.correlation_id
+    return result
+
+
+async def _recommend_and_submit(user_input, risk_profile, blockchain_prompt, model_id, session_id):
+    timings, errors = {}, {}
+    start = time.perf_counter()
+
+    price_task = asyncio.ensure_future(_stage("price", fetch_eth_price_async(), PRICE_TIMEOUT, timings, errors))
+
+    async def recommendation_branch():
+        eth_price, eth_change = await price_task or (None, None)
+        return await _stage("recommendation",
+                            get_defi_recommendation_async(user_input, risk_profile, eth_price, eth_change),
+                            RECOMMENDATION_TIMEOUT, timings, errors)
+
+    async def chain_branch():
+        if blockchain_prompt is None:
+            return None
+        quote = await _stage("preflight", preflight_async(blockchain_prompt, model_id), PREFLIGHT_TIMEOUT, timings, errors)
+        if quote is None:
+            return None
+        return await _stage("submit", submit_prompt_async(blockchain_prompt, model_id, quote, session_id), SUBMIT_TIMEOUT, timings, errors)
+
+    recommendation, tx_hash = await asyncio.gather(recommendation_branch(), chain_branch())
+    timings["total"] = time.perf_counter() - start
+    return {"recommendation": recommendation, "tx_hash": tx_hash, "timings": timings, "errors": errors}
+
+
+def run_pipeline(user_input, risk_profile, blockchain_prompt=None, model_id=11, correlation_id=None, session_id=None):
+    """Schedule recommend_and_submit on the background loop; cancel() on the result cancels every stage"""
+    return asyncio.run_coroutine_threadsafe(
+        recommend_and_submit(user_input, risk_profile, blockchain_prompt, model_id, correlation_id, session_id),
+        get_loop())
@@ -0,0 +1,112 @@
+# bench_bindings.py
+# Microbenchmark: generated prompt_bindings.py versus web3's generic contract
+# path for the calls and events on the submission / result / indexing hot paths.
+# Every pair is checked to produce the same bytes / values before it is timed.
+# Offline: no provider is contacted.
+#
+# Usage (from defi_assistant/):
+#   python bench/bench_bindings.py [--seconds 0.5] [--prompt-length 500]
+import os
+import sys
+import time
+import argparse
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))  # defi_assistant/ modules
+
+from eth_abi import encode
+from web3 import Web3
+from web3.providers.base import BaseProvider
+
+import prompt_bindings as bindings
+from resources import ABI_PATH, get_contract_abi
+
+CONTRACT_ADDRESS = "0x5FbDB2315678afecb367f032d93F642f64180aa3"
+SENDER = "0xf39Fd6e51aad88F6F4ce6aB8827279cffFb92266"
+
+
+def rate(fn, seconds):
+    """Mean microseconds per call, timed for about `seconds`"""
+    calls, start = 0, time.perf_counter()
+    batch = 100
+    while time.perf_counter() - start < seconds:
+        for _ in range(batch):
+            fn()
+        calls += batch
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def log(topic, data):
+    # Shape of a log as web3 returns it from eth_getLogs / receipts
+    return {
+        "address": CONTRACT_ADDRESS, "topics": [topic], "data": data, "blockNumber": 7, "transactionIndex": 0,
+        "transactionHash": b"\x11" * 32, "logIndex": 0, "blockHash": b"\x22" * 32, "removed": False,
+    }
+
+
+def cases(contract, prompt_length):
+    prompt = ("Analyze yield optimization for staking ETH " * 20)[:prompt_length]
+    prompt_hash = Web3.keccak(text=prompt)
+    output = "Recommendation: " + "x" * prompt_length
+    result_data = encode(["string"], [output])
+    fee_data = encode(["uint256"], [10 ** 15])
+    request_log = log(bindings.PROMPT_REQUEST_TOPIC, encode(["uint256", "address", "uint256", "string"], [42, SENDER, 11, prompt]))
+    updated_log = log(bindings.PROMPTS_UPDATED_TOPIC, encode(["uint256", "uint256", "bytes32", "string", "bytes"],
+                                                             [42, 11, prompt_hash, output, b""]))
+    codec = contract.w3.codec
+
+    def generic_event(name, entry):
+        args = getattr(contract.events, name)().process_log(entry)["args"]
+        return tuple(args.values())
+
+    # (name, generic web3 path, generated path); both return comparable values
+    return [
+        ("encode estimateFee",
+         lambda: Web3.to_bytes(hexstr=contract.functions.estimateFee(11)._encode_transaction_data()),
+         lambda: bindings.encode_estimate_fee(11)),
+        ("encode calculateAIResult",
+         lambda: Web3.to_bytes(hexstr=contract.functions.calculateAIResult(11, prompt)._encode_transaction_data()),
+         lambda: bindings.encode_calculate_ai_result(11, prompt)),
+        ("encode getAIResult",
+         lambda: Web3.to_bytes(hexstr=contract.functions.getAIResult(11, prompt)._encode_transaction_data()),
+         lambda: bindings.encode_get_ai_result(11, prompt)),
+        ("encode getAIResultByHash",
+         lambda: Web3.to_bytes(hexstr=contract.functions.getAIResultByHash(11, prompt_hash)._encode_transaction_data()),
+         lambda: bindings.encode_get_ai_result_by_hash(11, prompt_hash)),
+        ("decode estimateFee",
+         lambda: codec.decode(["uint256"], fee_data)[0],
+         lambda: bindings.decode_estimate_fee(fee_data)),
+        ("decode getAIResult",
+         lambda: codec.decode(["string"], result_data)[0],
+         lambda: bindings.decode_get_ai_result(result_data)),
+        ("decode promptRequest log",
+         lambda: generic_event("promptRequest", request_log),
+         lambda: tuple(bindings.decode_log(request_log)[1])),
+        ("decode promptsUpdated log",
+         lambda: generic_event("promptsUpdated", updated_log),
+         lambda: tuple(bindings.decode_log(updated_log)[1])),
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generated bindings vs web3 contract encode/decode")
+    parser.add_argument("--seconds", type=float, default=0.5, help="time spent on each measurement")
+    parser.add_argument("--prompt-length", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    # Unconnected instance: only the ABI codec is exercised
+    contract = Web3(BaseProvider()).eth.contract(address=CONTRACT_ADDRESS, abi=get_contract_abi())
+    print(f"{os.path.relpath(ABI_PATH)} -> prompt_bindings.py (generator v{bindings.GENERATOR_VERSION})")
+    print(f"{'case':<28}{'web3 us':>10}{'generated us':>14}{'speedup':>9}")
+    for name, generic, generated in cases(contract, args.prompt_length):
+        if generic() != generated():
+            print(f"{name}: results differ\n  web3:      {generic()!r}\n  generated: {generated()!r}", file=sys.stderr)
+            return 1
+        generic_us = rate(generic, args.seconds)
+        generated_us = rate(generated, args.seconds)
+        print(f"{name:<28}{generic_us:>10.2f}{generated_us:>14.2f}{generic_us / generated_us:>8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,328 @@
+# fake_servers.py
+# Local stand-ins for the three upstreams, so benchmarks run with no network:
+#   - FakeRPC: JSON-RPC node serving the Prompt contract (batches supported)
+#   - FakeAnthropic: Messages API, blocking and SSE streaming, with a configurable token rate
+#   - FakeCoinGecko: simple/price and coins/markets
+# Each server runs in a daemon thread on an ephemeral port; .url gives its base URL.
+import json
+import time
+import random
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from eth_abi import encode, decode
+from eth_utils import keccak
+
+CHAIN_ID = 31337
+CONTRACT_ADDRESS = "0x5FbDB2315678afecb367f032d93F642f64180aa3"
+SENDER = "0xf39Fd6e51aad88F6F4ce6aB8827279cffFb92266"
+ORACLE_FEE = 10 ** 15
+BASE_FEE = 10 ** 9
+
+
+def selector(signature):
+    return keccak(text=signature)[:4]
+
+
+def topic(signature):
+    return "0x" + keccak(text=signature).hex()
+
+
+ESTIMATE_FEE = selector("estimateFee(uint256)")
+GET_AI_RESULT = selector("getAIResult(uint256,string)")
+GET_AI_RESULT_BY_HASH = selector("getAIResultByHash(uint256,bytes32)")
+GET_AI_RESULT_BY_REQUEST_ID = selector("getAIResultByRequestId(uint256)")
+CALCULATE_AI_RESULT = selector("calculateAIResult(uint256,string)")
+PROMPT_REQUEST_TOPIC = topic("promptRequest(uint256,address,uint256,string)")
+PROMPTS_UPDATED_TOPIC = topic("promptsUpdated(uint256,uint256,bytes32,string,bytes)")
+
+
+class _Server:
+    handler_class = None
+
+    def __init__(self, host="127.0.0.1", port=0):
+        handler = type("Handler", (self.handler_class,), {"fake": self})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://{host}:{self.httpd.server_address[1]}"
+        self.requests = 0
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # Otherwise delayed ACKs add ~40 ms to every small response
+    fake = None
+
+    def log_message(self, *args):
+        pass  # Keep benchmark output clean
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"null")
+
+    def _send(self, status, payload, content_type="application/json"):
+        data = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+# JSON-RPC node
+
+class _RPCHandler(_Handler):
+    def do_POST(self):
+        self.fake.requests += 1
+        time.sleep(self.fake.latency)
+        body = self._body()
+        if isinstance(body, list):
+            return self._send(200, [self.fake.handle(item) for item in body])
+        self._send(200, self.fake.handle(body))
+
+
+class FakeRPC(_Server):
+    """In-memory chain with the Prompt contract; every transaction is mined in its own block
+    and the oracle answers in the same block"""
+
+    handler_class = _RPCHandler
+
+    def __init__(self, latency=0.0, **kwargs):
+        self.latency = latency  # Simulated network round trip per HTTP request
+        self.lock = threading.Lock()
+        self.block = 1000
+        self.nonce = 0
+        self.next_request_id = 1
+        self.receipts = {}  # tx hash -> receipt
+        self.logs = []
+        self.results = {}  # (model_id, keccak256(prompt)) -> output
+        self.outputs = {}  # request id -> output
+        super().__init__(**kwargs)
+
+    def handle(self, request):
+        try:
+            result = getattr(self, "rpc_" + request["method"])(*request.get("params", []))
+            return {"jsonrpc": "2.0", "id": request.get("id"), "result": result}
+        except AttributeError:
+            return {"jsonrpc": "2.0", "id": request.get("id"), "error": {"code": -32601, "message": "method not found"}}
+        except Exception as error:
+            return {"jsonrpc": "2.0", "id": request.get("id"), "error": {"code": -32000, "message": str(error)}}
+
+    def rpc_eth_chainId(self):
+        return hex(CHAIN_ID)
+
+    def rpc_net_version(self):
+        return str(CHAIN_ID)
+
+    def rpc_eth_blockNumber(self):
+        return hex(self.block)
+
+    def rpc_eth_gasPrice(self):
+        return hex(2 * BASE_FEE)
+
+    def rpc_eth_maxPriorityFeePerGas(self):
+        return hex(BASE_FEE // 10)
+
+    def rpc_eth_feeHistory(self, count, newest, percentiles):
+        count = int(count, 16) if isinstance(count, str) else count
+        return {
+            "oldestBlock": hex(self.block - count + 1),
+            "baseFeePerGas": [hex(BASE_FEE)] * (count + 1),
+            "gasUsedRatio": [0.5] * count,
+            "reward": [[hex(BASE_FEE // 10)] for _ in range(count)],
+        }
+
+    def rpc_eth_getBlockByNumber(self, number, full=False):
+        return {"number": hex(self.block), "baseFeePerGas": hex(BASE_FEE), "timestamp": hex(int(time.time())),
+                "hash": "0x" + keccak(self.block.to_bytes(32, "big")).hex(), "transactions": []}
+
+    def rpc_eth_getTransactionCount(self, address, block="latest"):
+        return hex(self.nonce)
+
+    def rpc_eth_estimateGas(self, tx, block=None):
+        return hex(150_000 + len(tx.get("data", "")) * 20)
+
+    def rpc_eth_call(self, tx, block="latest"):
+        data = bytes.fromhex(tx["data"][2:])
+        if data[:4] == ESTIMATE_FEE:
+            return "0x" + encode(["uint256"], [ORACLE_FEE]).hex()
+        if data[:4] == GET_AI_RESULT:
+            model_id, prompt = decode(["uint256", "string"], data[4:])
+            return "0x" + encode(["string"], [self.results.get((model_id, keccak(text=prompt)), "")]).hex()
+        if data[:4] == GET_AI_RESULT_BY_HASH:
+            model_id, prompt_hash = decode(["uint256", "bytes32"], data[4:])
+            return "0x" + encode(["string"], [self.results.get((model_id, prompt_hash), "")]).hex()
+        if data[:4] == GET_AI_RESULT_BY_REQUEST_ID:
+            request_id, = decode(["uint256"], data[4:])
+            return "0x" + encode(["string"], [self.outputs.get(request_id, "")]).hex()
+        raise ValueError("execution reverted")
+
+    def rpc_eth_sendRawTransaction(self, raw):
+        raw_bytes = bytes.fromhex(raw[2:])
+        tx_hash = "0x" + keccak(raw_bytes).hex()
+        model_id, prompt = _decode_prompt(raw_bytes)
+        with self.lock:
+            self.block += 1
+            self.nonce += 1
+            request_id = self.next_request_id
+            self.next_request_id += 1
+            output = f"Simulated oracle answer for request {request_id}"
+            prompt_hash = keccak(text=prompt)
+            self.results[(model_id, prompt_hash)] = output
+            self.outputs[request_id] = output
+            request_log = self._log(tx_hash, PROMPT_REQUEST_TOPIC,
+                                    encode(["uint256", "address", "uint256", "string"], [request_id, SENDER, model_id, prompt]))
+            updated_log = self._log(tx_hash, PROMPTS_UPDATED_TOPIC,
+                                    encode(["uint256", "uint256", "bytes32", "string", "bytes"],
+                                           [request_id, model_id, prompt_hash, output, b""]))
+            self.logs.extend([request_log, updated_log])
+            self.receipts[tx_hash] = {
+                "transactionHash": tx_hash, "transactionIndex": "0x0", "blockNumber": hex(self.block),
+                "blockHash": request_log["blockHash"], "from": SENDER, "to": CONTRACT_ADDRESS,
+                "cumulativeGasUsed": hex(180_000), "gasUsed": hex(180_000), "effectiveGasPrice": hex(BASE_FEE),
+                "contractAddress": None, "logs": [request_log], "logsBloom": "0x" + "00" * 256,
+                "status": "0x1", "type": "0x2",
+            }
+        return tx_hash
+
+    def _log(self, tx_hash, topic0, data):
+        return {
+            "address": CONTRACT_ADDRESS, "topics": [topic0], "data": "0x" + data.hex(),
+            "blockNumber": hex(self.block), "blockHash": "0x" + keccak(self.block.to_bytes(32, "big")).hex(),
+            "transactionHash": tx_hash, "transactionIndex": "0x0", "logIndex": hex(len(self.logs)), "removed": False,
+        }
+
+    def rpc_eth_getTransactionReceipt(self, tx_hash):
+        return self.receipts.get(tx_hash)
+
+    def rpc_eth_getTransactionByHash(self, tx_hash):
+        receipt = self.receipts.get(tx_hash)
+        if receipt is None:
+            return None
+        return {"hash": tx_hash, "blockNumber": receipt["blockNumber"], "from": SENDER, "to": CONTRACT_ADDRESS}
+
+    def rpc_eth_getLogs(self, log_filter):
+        from_block = int(log_filter.get("fromBlock", "0x0"), 16)
+        to_block = int(log_filter.get("toBlock", hex(self.block)), 16)
+        wanted = (log_filter.get("topics") or [None])[0]
+        if isinstance(wanted, str):
+            wanted = [wanted]
+        return [log for log in self.logs
+                if from_block <= int(log["blockNumber"], 16) <= to_block and (not wanted or log["topics"][0] in wanted)]
+
+
+def _decode_prompt(raw_bytes):
+    """Pull (model_id, prompt) out of a signed calculateAIResult transaction"""
+    try:
+        try:
+            from eth_account.typed_transactions import TypedTransaction
+        except ImportError:  # eth-account < 0.12
+            from eth_account._utils.typed_transactions import TypedTransaction
+        from hexbytes import HexBytes
+        data = TypedTransaction.from_bytes(HexBytes(raw_bytes)).as_dict()["data"]
+        data = bytes(data) if not isinstance(data, str) else bytes.fromhex(data[2:])
+        if data[:4] == CALCULATE_AI_RESULT:
+            return decode(["uint256", "string"], data[4:])
+    except Exception:
+        pass
+    return 11, ""
+
+
+# Anthropic Messages API
+
+class _AnthropicHandler(_Handler):
+    def do_POST(self):
+        self.fake.requests += 1
+        body = self._body()
+        fake = self.fake
+        output_tokens = min(body.get("max_tokens", fake.output_tokens), fake.output_tokens)
+        words = [f"token{i} " for i in range(output_tokens)]
+        message = {
+            "id": f"msg_bench_{fake.requests}", "type": "message", "role": "assistant", "model": body.get("model"),
+            "content": [{"type": "text", "text": "".join(words)}], "stop_reason": "end_turn", "stop_sequence": None,
+            "usage": {"input_tokens": len(json.dumps(body)) // 4, "output_tokens": output_tokens},
+        }
+
+        time.sleep(fake.time_to_first_token)
+        if not body.get("stream"):
+            time.sleep(output_tokens / fake.tokens_per_second)
+            return self._send(200, message)
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        start = dict(message, content=[], usage=dict(message["usage"], output_tokens=0))
+        self._event("message_start", {"type": "message_start", "message": start})
+        self._event("content_block_start", {"type": "content_block_start", "index": 0,
+                                            "content_block": {"type": "text", "text": ""}})
+        for word in words:
+            self._event("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                                "delta": {"type": "text_delta", "text": word}})
+            time.sleep(1.0 / fake.tokens_per_second)
+        self._event("content_block_stop", {"type": "content_block_stop", "index": 0})
+        self._event("message_delta", {"type": "message_delta", "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                                      "usage": {"output_tokens": output_tokens}})
+        self._event("message_stop", {"type": "message_stop"})
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _event(self, name, payload):
+        data = f"event: {name}\ndata: {json.dumps(payload)}\n\n".encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+class FakeAnthropic(_Server):
+    handler_class = _AnthropicHandler
+
+    def __init__(self, tokens_per_second=200.0, time_to_first_token=0.2, output_tokens=200, **kwargs):
+        self.tokens_per_second = tokens_per_second
+        self.time_to_first_token = time_to_first_token
+        self.output_tokens = output_tokens
+        super().__init__(**kwargs)
+
+
+# CoinGecko
+
+class _CoinGeckoHandler(_Handler):
+    def do_GET(self):
+        self.fake.requests += 1
+        time.sleep(self.fake.latency)
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        ids = [coin for coin in query.get("ids", "ethereum").split(",") if coin]
+        if url.path.endswith("/simple/price"):
+            return self._send(200, {coin: {"usd": self.fake.price(coin), "usd_24h_change": random.uniform(-5, 5)}
+                                    for coin in ids})
+        if url.path.endswith("/coins/markets"):
+            markets = []
+            for coin in ids:
+                price = self.fake.price(coin)
+                markets.append({
+                    "id": coin, "symbol": coin[:4], "current_price": price,
+                    "price_change_percentage_24h": random.uniform(-5, 5),
+                    "total_volume": random.uniform(1e6, 1e9), "market_cap": random.uniform(1e8, 1e11),
+                    "sparkline_in_7d": {"price": [price * (1 + random.gauss(0, 0.01)) for _ in range(168)]},
+                })
+            return self._send(200, markets)
+        self._send(404, {"error": "not found"})
+
+
+class FakeCoinGecko(_Server):
+    handler_class = _CoinGeckoHandler
+
+    def __init__(self, latency=0.05, **kwargs):
+        self.latency = latency
+        super().__init__(**kwargs)
+
+    @property
+    def api_url(self):
+        return self.url + "/api/v3/"
+
+    def price(self, coin):
+        return 3000.0 if coin == "ethereum" else 1.0 + (sum(map(ord, coin)) % 1000)
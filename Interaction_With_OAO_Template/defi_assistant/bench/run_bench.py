@@ -0,0 +1,157 @@
+# run_bench.py
+# Offline end-to-end benchmark for the zAgent backend. Starts the fakes from
+# fake_servers.py, points the app at them through environment variables and
+# times each stage of service.py.
+#
+# Usage (from defi_assistant/):
+#   python bench/run_bench.py                          # per-stage latency / throughput
+#   python bench/run_bench.py --users 20 --duration 30 # concurrent-user load, p50/p95/p99
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))  # defi_assistant/ modules
+sys.path.insert(0, BENCH_DIR)
+
+from fake_servers import FakeRPC, FakeAnthropic, FakeCoinGecko, CONTRACT_ADDRESS
+
+# Well-known local development key (anvil/hardhat account #0), never holds real funds
+BENCH_PRIVATE_KEY = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+
+STAGES = ("get_eth_price", "get_defi_recommendation", "send_to_blockchain", "get_blockchain_result")
+
+
+def percentile(samples, pct):
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def start_fakes(args):
+    rpc = FakeRPC(latency=args.rpc_latency)
+    anthropic = FakeAnthropic(tokens_per_second=args.tokens_per_second,
+                              time_to_first_token=args.ttft, output_tokens=args.output_tokens)
+    coingecko = FakeCoinGecko(latency=args.coingecko_latency)
+
+    data_dir = tempfile.mkdtemp(prefix="zagent-bench-")
+    os.environ.update({
+        "WEB3_PROVIDER_URI": rpc.url,
+        "CONTRACT_ADDRESS": CONTRACT_ADDRESS,
+        "WALLET_PRIVATE_KEY": BENCH_PRIVATE_KEY,
+        "CLAUDE_API_KEY": "bench",
+        "ANTHROPIC_BASE_URL": anthropic.url,
+        "COINGECKO_API_URL": coingecko.api_url,
+        "INDEXER_DB_PATH": os.path.join(data_dir, "prompt_index.db"),
+        "TICK_STORE_PATH": os.path.join(data_dir, "price_ticks.bin"),  # Fake prices stay out of the real history
+        "LEDGER_DB_PATH": os.path.join(data_dir, "requests.db"),  # Fake submissions stay out of the real ledger
+        "INDEXER_START_BLOCK": "0",
+        "INDEXER_CONFIRMATIONS": "0",  # The fake chain only advances when we submit
+        "INDEXER_POLL_INTERVAL": "0.2",
+        "RECEIPT_POLL_INTERVAL": "0.2",
+    })
+    os.environ.pop("ZAGENT_API_URL", None)  # Always benchmark the in-process service
+    return rpc, anthropic, coingecko
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {stage: [] for stage in STAGES}
+        self.errors = {stage: 0 for stage in STAGES}
+
+    def time(self, stage, fn, *args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        except Exception as error_message:
+            with self.lock:
+                self.errors[stage] += 1
+            print(f"{stage} failed: {error_message}", file=sys.stderr)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.samples[stage].append(elapsed)
+
+    def report(self, wall_seconds=None):
+        print(f"{'stage':<26}{'n':>6}{'err':>5}{'mean ms':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'ops/s':>9}")
+        for stage in STAGES:
+            samples = self.samples[stage]
+            if not samples:
+                continue
+            busy = wall_seconds or sum(samples)
+            print(f"{stage:<26}{len(samples):>6}{self.errors[stage]:>5}"
+                  f"{sum(samples) / len(samples) * 1000:>10.2f}"
+                  f"{percentile(samples, 50) * 1000:>9.2f}{percentile(samples, 95) * 1000:>9.2f}"
+                  f"{percentile(samples, 99) * 1000:>9.2f}{len(samples) / busy:>9.1f}")
+
+
+def user_flow(service, recorder, index, unique):
+    """One pass through the page: price, recommendation, submission, result"""
+    # unique=True defeats the recommendation cache so every call reaches the (fake) Messages API
+    user_input = f"I want safe stablecoin yield #{index}" if unique else "I want safe stablecoin yield"
+    prompt = f"Analyze yield optimization for {user_input} with Conservative risk profile"
+    recorder.time("get_eth_price", service.get_eth_price)
+    recorder.time("get_defi_recommendation", service.get_defi_recommendation, user_input, "Conservative")
+    recorder.time("send_to_blockchain", service.send_to_blockchain, prompt, 11)
+    recorder.time("get_blockchain_result", service.get_blockchain_result, 11, prompt)
+
+
+def run_stages(service, iterations, unique):
+    recorder = Recorder()
+    for index in range(iterations):
+        user_flow(service, recorder, index, unique)
+    recorder.report()
+
+
+def run_load(service, users, duration, unique):
+    recorder = Recorder()
+    deadline = time.perf_counter() + duration
+    counter = iter(range(10 ** 9))
+    counter_lock = threading.Lock()
+
+    def virtual_user():
+        while time.perf_counter() < deadline:
+            with counter_lock:
+                index = next(counter)
+            user_flow(service, recorder, index, unique)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        for _ in range(users):
+            pool.submit(virtual_user)
+    wall = time.perf_counter() - start
+    print(f"{users} concurrent users for {wall:.1f}s")
+    recorder.report(wall_seconds=wall)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline zAgent benchmark")
+    parser.add_argument("--iterations", type=int, default=20, help="sequential flows in stage mode")
+    parser.add_argument("--users", type=int, default=0, help="concurrent virtual users (enables load mode)")
+    parser.add_argument("--duration", type=float, default=30.0, help="load mode duration in seconds")
+    parser.add_argument("--cached", action="store_true", help="repeat the same question so the recommendation cache hits")
+    parser.add_argument("--rpc-latency", type=float, default=0.02, help="simulated RPC round trip (s)")
+    parser.add_argument("--coingecko-latency", type=float, default=0.05, help="simulated CoinGecko round trip (s)")
+    parser.add_argument("--tokens-per-second", type=float, default=400.0)
+    parser.add_argument("--ttft", type=float, default=0.2, help="fake Messages API time to first token (s)")
+    parser.add_argument("--output-tokens", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    start_fakes(args)
+    import service  # Imported after the environment points at the fakes
+
+    if args.users:
+        run_load(service, args.users, args.duration, unique=not args.cached)
+    else:
+        run_stages(service, args.iterations, unique=not args.cached)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+# bulk_submit.py
+# Submits many (model_id, prompt) rows to the ORA AI Oracle with bounded concurrency.
+# Every row is journaled in SQLite, including the signed tx hash before it is
+# broadcast, so a rerun after a crash resumes without double-submitting.
+#
+# Usage: python bulk_submit.py prompts.csv [--concurrency 8] [--journal bulk_journal.db] [--wait] [-o report.csv]
+# Input is a CSV with model_id,prompt columns or a JSONL file with the same keys.
+# The CSV report goes to --output (default stdout); progress and log lines go to stderr.
+import os
+import sys
+import csv
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+
+from web3.exceptions import TransactionNotFound
+
+from resources import get_web3
+from receipt_tracker import receipt_tracker
+from submission import submit_prompt
+
+DONE_STATUSES = ("mined", "failed")
+
+
+def read_rows(path):
+    """Yield (model_id, prompt) rows from a CSV or JSONL file"""
+    with open(path, 'r', newline='') as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    item = json.loads(line)
+                    yield int(item["model_id"]), item["prompt"]
+        else:
+            for item in csv.DictReader(f):
+                yield int(item["model_id"]), item["prompt"]
+
+
+def row_key(index, model_id, prompt):
+    return hashlib.sha256(f"{index}\0{model_id}\0{prompt}".encode("utf-8")).hexdigest()
+
+
+class Journal:
+    """Per-row submission state, safe to share between worker threads"""
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS rows (
+                row_key TEXT PRIMARY KEY,
+                row_index INTEGER,
+                model_id INTEGER,
+                status TEXT,
+                tx_hash TEXT,
+                request_id TEXT,
+                error TEXT,
+                updated_at REAL
+            )""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS rows_by_tx ON rows (tx_hash)")
+        self._db.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._db.execute("SELECT status, tx_hash FROM rows WHERE row_key = ?", (key,)).fetchone()
+        return row if row else (None, None)
+
+    def set(self, key, index, model_id, **fields):
+        fields["updated_at"] = time.time()
+        columns = ", ".join(fields)
+        updates = ", ".join(f"{name} = excluded.{name}" for name in fields)
+        with self._lock:
+            self._db.execute(
+                f"INSERT INTO rows (row_key, row_index, model_id, {columns}) VALUES (?, ?, ?, {', '.join('?' * len(fields))}) "
+                f"ON CONFLICT(row_key) DO UPDATE SET {updates}",
+                (key, index, model_id, *fields.values()),
+            )
+            self._db.commit()
+
+    def update_by_tx(self, tx_hash, **fields):
+        fields["updated_at"] = time.time()
+        with self._lock:
+            self._db.execute(
+                f"UPDATE rows SET {', '.join(f'{name} = ?' for name in fields)} WHERE tx_hash = ?",
+                (*fields.values(), tx_hash),
+            )
+            self._db.commit()
+
+    def report(self):
+        with self._lock:
+            return self._db.execute(
+                "SELECT row_index, model_id, status, tx_hash, request_id, error FROM rows ORDER BY row_index"
+            ).fetchall()
+
+
+def submit_row(journal, index, model_id, prompt):
+    """Submit one row unless the journal says it already went out; returns True if a tx was broadcast now"""
+    key = row_key(index, model_id, prompt)
+    status, tx_hash = journal.get(key)
+    if status in DONE_STATUSES:
+        return False
+    if status == "submitted":
+        # Broadcast by an earlier run; just follow its receipt again for the requestId
+        receipt_tracker.track(tx_hash, model_id=model_id, prompt=prompt)
+        return False
+
+    if tx_hash and status in ("signed", "error"):
+        # Crashed between signing and recording the broadcast, or the broadcast raised
+        # (e.g. timed out after the node accepted it): ask the node whether it arrived
+        try:
+            get_web3().eth.get_transaction(tx_hash)
+            journal.set(key, index, model_id, status="submitted")
+            receipt_tracker.track(tx_hash, model_id=model_id, prompt=prompt)
+            return False
+        except TransactionNotFound:
+            pass  # Never broadcast, safe to submit again
+
+    try:
+        tx_hash = submit_prompt(
+            prompt, model_id,
+            on_signed=lambda signed_hash: journal.set(key, index, model_id, status="signed", tx_hash=signed_hash),
+            session_id="bulk",  # Groups bulk jobs in the request ledger
+        )
+        journal.set(key, index, model_id, status="submitted", tx_hash=tx_hash, error=None)
+        return True
+    except Exception as error_message:
+        journal.set(key, index, model_id, status="error", error=str(error_message))
+        return False
+
+
+def submit_file(path, journal_path="bulk_journal.db", concurrency=8, wait=False, wait_timeout=600):
+    """Submit every row in a file and return (report rows, submissions per minute)"""
+    journal = Journal(journal_path)
+
+    def on_status(tx_hash, status):
+        if status["status"] != "pending":
+            request_id = str(status["request_id"]) if status["request_id"] is not None else None
+            journal.update_by_tx(tx_hash, status=status["status"], request_id=request_id)
+
+    receipt_tracker.add_listener(on_status)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(submit_row, journal, index, model_id, prompt)
+                   for index, (model_id, prompt) in enumerate(read_rows(path))]
+        submitted = sum(1 for future in futures if future.result())
+    elapsed = time.perf_counter() - start
+    per_minute = submitted / elapsed * 60 if elapsed > 0 else 0.0
+
+    if wait:
+        # Give the receipt tracker time to fill in requestIds
+        deadline = time.time() + wait_timeout
+        while time.time() < deadline and any(row[2] == "submitted" for row in journal.report()):
+            time.sleep(1)
+
+    return journal.report(), per_minute
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-submit prompts to the ORA AI Oracle")
+    parser.add_argument("input", help="CSV or JSONL file with model_id and prompt")
+    parser.add_argument("--journal", default=os.getenv("BULK_JOURNAL_PATH", "bulk_journal.db"))
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("BULK_CONCURRENCY", "8")))
+    parser.add_argument("--wait", action="store_true", help="wait for receipts and report requestIds")
+    parser.add_argument("--wait-timeout", type=float, default=600)
+    parser.add_argument("-o", "--output", default="-", help="CSV report path ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    # Init / trace / error prints would otherwise interleave with a report on stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        rows, per_minute = submit_file(args.input, args.journal, args.concurrency, args.wait, args.wait_timeout)
+
+    with (open(args.output, "w", newline="") if args.output != "-" else contextlib.nullcontext(sys.stdout)) as output:
+        writer = csv.writer(output)
+        writer.writerow(["row", "model_id", "status", "tx_hash", "request_id", "error"])
+        writer.writerows(rows)
+    print(f"Submissions/minute: {per_minute:.1f}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
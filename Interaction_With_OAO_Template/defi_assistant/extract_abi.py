@@ -1,22 +1,142 @@
 # extract_abi.py
-import json
+# Extracts contract ABIs from the Foundry build artifacts (../out/<File>.sol/<Contract>.json)
+# into abi/<Contract>.json, each with a precomputed selector / topic / type index
+# (abi/<Contract>.index.json, see abi_index.py) that resources.py loads at runtime.
+#
+# Incremental: the sha256 of every artifact is kept in a manifest in forge's cache
+# directory, and artifacts whose content hasn't changed are skipped without parsing.
+# Outputs are only rewritten when their bytes change.
+# By default only contracts compiled from the project's src/ are extracted.
+#
+# Usage: python extract_abi.py [--out ../out] [--abi-dir abi] [--all] [--force]
 import os
+import sys
+import json
+import glob
+import hashlib
+import argparse
+
+from abi_index import build_index, abi_bytes, index_path, INDEX_VERSION
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(HERE)
+MANIFEST_PATH = os.path.join(PROJECT_DIR, "forge-cache", "extract_abi.json")
+SOURCE_PREFIX = "src/"
+
+
+def _artifact_source(artifact):
+    """(source path, contract name) the artifact was compiled from, if recorded"""
+    target = artifact.get("metadata", {}).get("settings", {}).get("compilationTarget") or {}
+    for source, contract in target.items():
+        return source, contract
+    return artifact.get("ast", {}).get("absolutePath"), None
+
+
+def _write_if_changed(path, data):
+    """Replace path with data unless it already holds exactly that; returns whether it was written"""
+    try:
+        with open(path, "rb") as existing:
+            if existing.read() == data:
+                return False
+    except OSError:
+        pass
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as output:
+        output.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+def load_manifest(path, include_all):
+    """Artifact path -> {sha256, contract}; empty when written by another version or with other options"""
+    try:
+        with open(path) as manifest_file:
+            manifest = json.load(manifest_file)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != INDEX_VERSION or manifest.get("all") != include_all:
+        return {}
+    return manifest.get("artifacts", {})
+
+
+def extract(out_dir, abi_dir, include_all=False, force=False, manifest_path=MANIFEST_PATH):
+    """Extract every changed artifact; returns counts of written, unchanged and skipped artifacts"""
+    artifact_paths = sorted(glob.glob(os.path.join(out_dir, "*.sol", "*.json")))
+    if not artifact_paths:
+        raise FileNotFoundError(out_dir)
+    previous = {} if force else load_manifest(manifest_path, include_all)
+    artifacts = {}
+    owners = {}  # contract name -> artifact that produced abi/<name>.json in this run
+    counts = {"written": 0, "unchanged": 0, "skipped": 0}
+    os.makedirs(abi_dir, exist_ok=True)
+
+    for artifact_path in artifact_paths:
+        relative = os.path.relpath(artifact_path, out_dir)
+        with open(artifact_path, "rb") as artifact_file:
+            raw = artifact_file.read()
+        digest = hashlib.sha256(raw).hexdigest()
+        known = previous.get(relative)
+        contract = known["contract"] if known else None
+        abi_path = os.path.join(abi_dir, f"{contract}.json")
+        outputs_exist = contract is None or (os.path.exists(abi_path) and os.path.exists(index_path(abi_path)))
+        if known and known["sha256"] == digest and outputs_exist:
+            artifacts[relative] = known
+            if contract is not None:
+                owners[contract] = relative
+            counts["unchanged" if contract is not None else "skipped"] += 1
+            continue
+
+        artifact = json.loads(raw)
+        source, contract = _artifact_source(artifact)
+        contract = contract or os.path.basename(artifact_path).split(".")[0]
+        abi = artifact.get("abi") or []
+        if not abi or (not include_all and not (source or "").startswith(SOURCE_PREFIX)):
+            artifacts[relative] = {"sha256": digest, "contract": None}  # Remembered so the next run skips it unread
+            counts["skipped"] += 1
+            continue
+        if contract in owners:
+            print(f"Warning: {relative} and {owners[contract]} both define {contract}; keeping {owners[contract]}")
+            artifacts[relative] = {"sha256": digest, "contract": None}
+            counts["skipped"] += 1
+            continue
+
+        data = abi_bytes(abi)
+        abi_path = os.path.join(abi_dir, contract + ".json")
+        index = build_index(abi, contract, hashlib.sha256(data).hexdigest())
+        changed = _write_if_changed(abi_path, data)
+        changed |= _write_if_changed(index_path(abi_path), json.dumps(index, indent=2, sort_keys=True).encode())
+        counts["written" if changed else "unchanged"] += 1
+        if changed:
+            print(f"ABI extracted and saved to {os.path.relpath(abi_path)}")
+        artifacts[relative] = {"sha256": digest, "contract": contract}
+        owners[contract] = relative
+
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    _write_if_changed(manifest_path, json.dumps(
+        {"version": INDEX_VERSION, "all": include_all, "artifacts": artifacts}, indent=2, sort_keys=True).encode())
+    return counts
+
 
-# Create abi directory if it doesn't exist
-os.makedirs('abi', exist_ok=True)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract ABIs and selector/topic indexes from Foundry artifacts")
+    parser.add_argument("--out", default=os.path.join(PROJECT_DIR, "out"), help="Foundry out/ directory")
+    parser.add_argument("--abi-dir", default=os.path.join(HERE, "abi"))
+    parser.add_argument("--all", action="store_true", help="also extract lib/ and test contracts, not only src/")
+    parser.add_argument("--force", action="store_true", help="ignore the manifest and reprocess every artifact")
+    args = parser.parse_args(argv)
 
-# Load the compiled contract artifact
-try:
-    with open('../out/Prompt.sol/Prompt.json', 'r') as f:
-        contract_data = json.load(f)
+    try:
+        counts = extract(args.out, args.abi_dir, include_all=args.all, force=args.force)
+    except FileNotFoundError:
+        print("Error: Compiled contract file not found. Make sure you've compiled the contract.")
+        print("Try running: forge build")
+        return 1
+    except Exception as e:
+        print(f"Error extracting ABI: {str(e)}")
+        return 1
+    print(f"ABIs: {counts['written']} written, {counts['unchanged']} unchanged, {counts['skipped']} skipped")
+    return 0
 
-    # Extract and save just the ABI
-    with open('abi/Prompt.json', 'w') as f:
-        json.dump(contract_data['abi'], f, indent=2)
 
-    print("ABI extracted and saved to abi/Prompt.json")
-except FileNotFoundError:
-    print("Error: Compiled contract file not found. Make sure you've compiled the contract.")
-    print("Try running: forge build")
-except Exception as e:
-    print(f"Error extracting ABI: {str(e)}")
\ No newline at end of file
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+# fee_oracle.py
+# Per-block fee cache and EIP-1559 fee oracle for calculateAIResult submissions.
+# One batched refresh per block window fetches eth_feeHistory and estimateFee;
+# every submission inside that window is priced without any RPC at all.
+import os
+import threading
+import time
+
+from resources import get_web3
+from rpc_batch import batch_call, contract_call_request
+import prompt_bindings as bindings  # Generated encoders/decoders for Prompt.sol
+from tracing import span
+
+BLOCK_TIME = float(os.getenv("FEE_CACHE_SECONDS", "12"))  # How long one block's fee data is reused
+FEE_HISTORY_BLOCKS = int(os.getenv("FEE_HISTORY_BLOCKS", "20"))
+PRIORITY_PERCENTILE = int(os.getenv("FEE_PRIORITY_PERCENTILE", "50"))
+BASE_FEE_MULTIPLIER = float(os.getenv("FEE_BASE_MULTIPLIER", "2"))  # Survives ~6 full blocks of base fee growth
+GAS_HEADROOM = float(os.getenv("GAS_LIMIT_HEADROOM", "1.25"))
+PROMPT_BUCKET_BYTES = int(os.getenv("GAS_PROMPT_BUCKET_BYTES", "256"))
+# Rough gas per extra prompt byte (calldata, storage, event data); covers the rest of a bucket
+GAS_PER_PROMPT_BYTE = int(os.getenv("GAS_PER_PROMPT_BYTE", "700"))
+
+
+def prompt_bucket(prompt_text):
+    """Prompt length bucket; gas for calculateAIResult grows with the stored prompt size"""
+    return len(prompt_text.encode("utf-8")) // PROMPT_BUCKET_BYTES
+
+
+def eip1559_fees(base_fees, rewards):
+    """maxFeePerGas / maxPriorityFeePerGas from a fee history window
+
+    base_fees ends with the base fee of the next (pending) block; rewards are
+    the per-block priority fees at PRIORITY_PERCENTILE. Returns None on chains
+    without a base fee.
+    """
+    if not any(base_fees):
+        return None
+    rewards = sorted(rewards)
+    priority_fee = rewards[len(rewards) // 2] if rewards else None
+    if priority_fee is None:
+        priority_fee = get_web3().eth.max_priority_fee
+    return {
+        "maxFeePerGas": int(base_fees[-1] * BASE_FEE_MULTIPLIER) + priority_fee,
+        "maxPriorityFeePerGas": priority_fee,
+    }
+
+
+class FeeOracle:
+    """Caches fee data per block and gas limits per (model, prompt-length bucket)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._block = None  # Latest block number seen in fee history
+        self._fetched_at = 0.0
+        self._fees = None  # EIP-1559 maxFeePerGas/maxPriorityFeePerGas, or a legacy gasPrice
+        self._oracle_fees = {}  # (model_id, block) -> estimateFee result
+        self._gas_limits = {}  # (model_id, bucket) -> gas limit with headroom
+        self._chain_id = None
+
+    def quote(self, model_id, address=None):
+        """Fee, gas pricing and chain id for a submission, plus the pending nonce if address is given"""
+        with self._lock:
+            fresh = self._block is not None and time.monotonic() - self._fetched_at < BLOCK_TIME
+            calls = []
+            if not fresh:
+                calls.append(("eth_feeHistory", [hex(FEE_HISTORY_BLOCKS), "latest", [PRIORITY_PERCENTILE]]))
+            if not fresh or (model_id, self._block) not in self._oracle_fees:
+                calls.append(contract_call_request(bindings.encode_estimate_fee(model_id)))
+            if self._chain_id is None:
+                calls.append(("eth_chainId", []))
+            if address is not None:
+                calls.append(("eth_getTransactionCount", [address, "pending"]))
+
+            with span("rpc.fee_quote"):
+                results = batch_call(calls) if calls else []
+            nonce = int(results.pop(), 16) if address is not None else None
+            if self._chain_id is None:
+                self._chain_id = int(results.pop(), 16)
+            if not fresh:
+                self._apply_fee_history(results.pop(0))
+            if results:
+                self._oracle_fees[(model_id, self._block)] = bindings.decode_estimate_fee(bytes.fromhex(results.pop()[2:]))
+
+            quote = {"fee": self._oracle_fees[(model_id, self._block)], "chain_id": self._chain_id, "block": self._block}
+            quote.update(self._fees)
+            if nonce is not None:
+                quote["nonce"] = nonce
+            return quote
+
+    def _apply_fee_history(self, history):
+        base_fees = [int(fee, 16) for fee in history["baseFeePerGas"]]
+        self._block = int(history["oldestBlock"], 16) + len(history["gasUsedRatio"]) - 1
+        self._fetched_at = time.monotonic()
+        # Entries for older blocks can never be hit again
+        self._oracle_fees = {key: fee for key, fee in self._oracle_fees.items() if key[1] == self._block}
+
+        rewards = [int(reward[0], 16) for reward in history.get("reward") or [] if reward]
+        # Pre-London chains have no base fee: fall back to a legacy gas price
+        self._fees = eip1559_fees(base_fees, rewards) or {"gasPrice": get_web3().eth.gas_price}
+
+    def gas_limit(self, model_id, prompt_text, tx):
+        """eth_estimateGas plus headroom, memoized per model and prompt-length bucket"""
+        limit = self.cached_gas_limit(model_id, prompt_text)
+        if limit is None:
+            with span("rpc.estimate_gas"):
+                estimate = get_web3().eth.estimate_gas(tx)
+            limit = self.remember_gas_estimate(model_id, prompt_text, estimate)
+        return limit
+
+    def cached_gas_limit(self, model_id, prompt_text):
+        return self._gas_limits.get((model_id, prompt_bucket(prompt_text)))
+
+    def remember_gas_estimate(self, model_id, prompt_text, estimate):
+        """Store an eth_estimateGas result (sync or async caller) and return the padded limit"""
+        key = (model_id, prompt_bucket(prompt_text))
+        limit = int(estimate * GAS_HEADROOM) + PROMPT_BUCKET_BYTES * GAS_PER_PROMPT_BYTE
+        with self._lock:
+            # Keep the largest estimate seen for the bucket so longer prompts in it still fit
+            limit = max(limit, self._gas_limits.get(key, 0))
+            self._gas_limits[key] = limit
+        return limit
+
+
+fee_oracle = FeeOracle()
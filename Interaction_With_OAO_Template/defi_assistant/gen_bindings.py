@@ -0,0 +1,351 @@
+# gen_bindings.py
+# Generates a typed Python module from a contract ABI with precomputed selectors
+# and topics and straight-line encode/decode functions for every function and
+# event, so hot paths (fee quotes, submissions, batched result reads, log
+# indexing) skip web3's per-call ABI resolution and codec dispatch.
+#
+# Elementary types (uintN, intN, address, bool, bytesN, bytes, string) are
+# encoded and decoded inline; anything else (arrays, tuples) falls back to
+# eth_abi with the type strings precomputed.
+#
+# Usage: python gen_bindings.py [abi/Prompt.json] [-o prompt_bindings.py] [--check]
+import os
+import re
+import sys
+import json
+import keyword
+import hashlib
+import argparse
+
+from abi_index import build_index
+
+GENERATOR_VERSION = 1
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+STATIC_TYPE = re.compile(r"^(uint|int)(\d*)$|^address$|^bool$|^bytes([1-9]|[12]\d|3[012])$")
+
+
+def snake(name):
+    """calculateAIResult -> calculate_ai_result"""
+    name = re.sub(r"(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])", "_", name).lower()
+    return name + "_" if keyword.iskeyword(name) else name
+
+
+def class_name(name):
+    return name[0].upper() + name[1:]
+
+
+def _binding_name(key, entry):
+    """Function name for an index key; overloads get their types appended"""
+    if "(" not in key:
+        return snake(key)
+    return snake(key.split("(", 1)[0]) + "_" + "_".join(re.sub(r"\W", "", kind) for kind in entry["inputs"])
+
+
+def _param_names(names):
+    seen = set()
+    result = []
+    for position, name in enumerate(names):
+        name = snake(name) if name else f"arg{position}"
+        while name in seen:
+            name += "_"
+        seen.add(name)
+        result.append(name)
+    return result
+
+
+def is_elementary(kind):
+    return kind in ("bytes", "string") or STATIC_TYPE.match(kind) is not None
+
+
+def python_type(kind):
+    if kind.startswith(("uint", "int")) and STATIC_TYPE.match(kind):
+        return "int"
+    if kind == "address" or kind == "string":
+        return "str"
+    if kind == "bool":
+        return "bool"
+    if kind == "bytes" or STATIC_TYPE.match(kind):
+        return "bytes"
+    return "Any"
+
+
+def _encode_word(kind, value):
+    """Expression encoding a static elementary value into one 32-byte word"""
+    match = STATIC_TYPE.match(kind)
+    if match.group(1) == "uint":
+        return f"_uint({value}, {match.group(2) or 256})"
+    if match.group(1) == "int":
+        return f"_int({value}, {match.group(2) or 256})"
+    if kind == "address":
+        return f"_address({value})"
+    if kind == "bool":
+        return f"_bool({value})"
+    return f"_fixed_bytes({value}, {match.group(3)})"
+
+
+def _decode_word(kind, data, start):
+    """Expression decoding a static elementary value from the word at data[start:start + 32]"""
+    match = STATIC_TYPE.match(kind)
+    if match.group(1) == "uint":
+        return f'int.from_bytes({data}[{start}:{start + 32}], "big")'
+    if match.group(1) == "int":
+        return f'int.from_bytes({data}[{start}:{start + 32}], "big", signed=True)'
+    if kind == "address":
+        return f"to_checksum_address({data}[{start + 12}:{start + 32}])"
+    if kind == "bool":
+        return f"{data}[{start + 31}] == 1"
+    return f"{data}[{start}:{start + int(match.group(3))}]"
+
+
+def _decoder_lines(types, names, data="data", indent="    "):
+    """Statements assigning each value of an ABI-encoded tuple in data to the matching name"""
+    if not all(is_elementary(kind) for kind in types):
+        return [f"{indent}({', '.join(names)},) = abi_decode({types!r}, {data})"]
+    lines = [f"{indent}if len({data}) < {32 * len(types)}:",
+             f'{indent}    raise ValueError(f"expected at least {32 * len(types)} bytes of ABI data, got {{len({data})}}")']
+    for position, (kind, name) in enumerate(zip(types, names)):
+        if kind == "string":
+            lines.append(f'{indent}{name} = _dynamic({data}, {32 * position}).decode("utf-8")')
+        elif kind == "bytes":
+            lines.append(f"{indent}{name} = _dynamic({data}, {32 * position})")
+        else:
+            lines.append(f"{indent}{name} = {_decode_word(kind, data, 32 * position)}")
+    return lines
+
+
+def _function_code(key, entry):
+    name = _binding_name(key, entry)
+    constant = name.upper()
+    args = _param_names(entry["input_names"])
+    signature = entry["signature"]
+    lines = []
+
+    # Encoder
+    typed_args = ", ".join(f"{arg}: {python_type(kind)}" for arg, kind in zip(args, entry["inputs"]))
+    lines.append(f"def encode_{name}({typed_args}) -> bytes:")
+    lines.append(f'    """Calldata for {signature}"""')
+    if not entry["inputs"]:
+        lines.append(f"    return {constant}_SELECTOR")
+    elif not all(is_elementary(kind) for kind in entry["inputs"]):
+        lines.append(f"    return {constant}_SELECTOR + abi_encode({entry['inputs']!r}, [{', '.join(args)}])")
+    else:
+        head_size = 32 * len(args)
+        head, tails = [], []
+        for arg, kind in zip(args, entry["inputs"]):
+            if kind in ("string", "bytes"):
+                tail = f"tail{len(tails)}"
+                value = f'{arg}.encode("utf-8")' if kind == "string" else f"bytes({arg})"
+                lines.append(f"    {tail} = _dynamic_tail({value})")
+                offset = " + ".join([str(head_size)] + [f"len({previous})" for previous in tails])
+                # The first offset is a constant; later ones depend on the preceding tails' lengths
+                head.append(f"_uint({offset}, 256)" if tails else f"_WORD_{head_size}")
+                tails.append(tail)
+            else:
+                head.append(_encode_word(kind, arg))
+        lines.append(f"    return {' + '.join([f'{constant}_SELECTOR'] + head + tails)}")
+    lines.append("")
+    lines.append("")
+
+    # Return data decoder
+    outputs = entry["outputs"]
+    if outputs:
+        names = [f"value{position}" for position in range(len(outputs))]
+        result_type = python_type(outputs[0]) if len(outputs) == 1 else \
+            "Tuple[" + ", ".join(python_type(kind) for kind in outputs) + "]"
+        lines.append(f"def decode_{name}(data: bytes) -> {result_type}:")
+        lines.append(f'    """Return data of {signature} -> {", ".join(outputs)}"""')
+        lines += _decoder_lines(outputs, names)
+        lines.append(f"    return {names[0] if len(names) == 1 else '(' + ', '.join(names) + ')'}")
+        lines.append("")
+        lines.append("")
+    return lines
+
+
+def _event_code(key, entry):
+    name = _binding_name(key, entry)
+    cls = class_name(key.split("(", 1)[0]) if "(" not in key else class_name(name)
+    fields = _param_names(entry["input_names"])
+    lines = [f"class {cls}(NamedTuple):", f'    """{entry["signature"]}"""']
+    for field, kind, indexed in zip(fields, entry["inputs"], entry["indexed"]):
+        # Indexed dynamic values are only present as their keccak hash
+        field_type = "bytes" if indexed and not STATIC_TYPE.match(kind) else python_type(kind)
+        lines.append(f"    {field}: {field_type}")
+    lines += ["", ""]
+
+    lines.append(f"def decode_{name}(topics: Sequence[bytes], data: bytes) -> {cls}:")
+    lines.append(f'    """Arguments of a {entry["signature"]} log"""')
+    data_types = [kind for kind, indexed in zip(entry["inputs"], entry["indexed"]) if not indexed]
+    data_names = [field for field, indexed in zip(fields, entry["indexed"]) if not indexed]
+    if data_types:
+        lines += _decoder_lines(data_types, data_names)
+    topic_position = 0 if entry["anonymous"] else 1
+    for field, kind, indexed in zip(fields, entry["inputs"], entry["indexed"]):
+        if indexed:
+            topic = f"_to_bytes(topics[{topic_position}])"
+            value = _decode_word(kind, topic, 0) if STATIC_TYPE.match(kind) else topic
+            lines.append(f"    {field} = {value}")
+            topic_position += 1
+    lines.append(f"    return {cls}({', '.join(fields)})")
+    lines += ["", ""]
+    return lines, name
+
+
+RUNTIME = '''
+_MASK_256 = (1 << 256) - 1
+
+
+def _uint(value, bits):
+    if not 0 <= value < 1 << bits:
+        raise ValueError(f"{value} does not fit uint{bits}")
+    return value.to_bytes(32, "big")
+
+
+def _int(value, bits):
+    if not -(1 << (bits - 1)) <= value < 1 << (bits - 1):
+        raise ValueError(f"{value} does not fit int{bits}")
+    return (value & _MASK_256).to_bytes(32, "big")
+
+
+def _bool(value):
+    if not isinstance(value, bool):
+        raise TypeError(f"expected bool, got {value!r}")
+    return _WORD_1 if value else _WORD_0
+
+
+def _to_bytes(value):
+    if isinstance(value, str):
+        return bytes.fromhex(value[2:] if value.startswith(("0x", "0X")) else value)
+    return bytes(value)
+
+
+def _address(value):
+    raw = _to_bytes(value)
+    if len(raw) != 20:
+        raise ValueError(f"{value!r} is not a 20-byte address")
+    return bytes(12) + raw
+
+
+def _fixed_bytes(value, size):
+    raw = _to_bytes(value)
+    if len(raw) > size:
+        raise ValueError(f"{len(raw)} bytes do not fit bytes{size}")
+    return raw + bytes(32 - len(raw))
+
+
+def _dynamic_tail(raw):
+    """Length word plus the data padded to a multiple of 32 bytes"""
+    return len(raw).to_bytes(32, "big") + raw + bytes(-len(raw) % 32)
+
+
+def _dynamic(data, head_position):
+    """bytes/string value whose offset word is at head_position"""
+    offset = int.from_bytes(data[head_position:head_position + 32], "big")
+    length = int.from_bytes(data[offset:offset + 32], "big")
+    if offset + 32 + length > len(data):
+        raise ValueError("ABI data is shorter than its encoded length")
+    return data[offset + 32:offset + 32 + length]
+'''
+
+
+def generate(abi, abi_name, abi_sha256):
+    index = build_index(abi, abi_name, abi_sha256)
+    functions = index["functions"]
+    events = index["events"]
+    fallback = any(not is_elementary(kind)
+                   for entry in functions.values() for kind in entry["inputs"] + entry["outputs"]) or \
+        any(not is_elementary(kind) for entry in events.values() for kind in entry["inputs"])
+    words = {0, 1} | {32 * len(entry["inputs"]) for entry in functions.values()}
+
+    lines = [
+        f"# {snake(abi_name)}_bindings.py",
+        f"# Generated by gen_bindings.py from abi/{abi_name}.json -- do not edit; rerun the generator.",
+        "# Precomputed selectors/topics and specialized ABI encoders/decoders for every function and event.",
+        "from typing import Any, NamedTuple, Sequence, Tuple  # noqa: F401",
+        "",
+        "from eth_utils import to_checksum_address",
+    ]
+    if fallback:
+        lines.append("from eth_abi import encode as abi_encode, decode as abi_decode")
+    lines += [
+        "",
+        f"GENERATOR_VERSION = {GENERATOR_VERSION}",
+        f'ABI_SHA256 = "{abi_sha256}"',
+        "",
+    ]
+    lines += [f'_WORD_{value} = ({value}).to_bytes(32, "big")' for value in sorted(words)]
+    lines.append("")
+    lines.append("# Function selectors")
+    for key, entry in functions.items():
+        lines.append(f'{_binding_name(key, entry).upper()}_SELECTOR = bytes.fromhex("{entry["selector"][2:]}")  # {entry["signature"]}')
+    lines.append("")
+    lines.append("# Event topics")
+    for key, entry in events.items():
+        lines.append(f'{_binding_name(key, entry).upper()}_TOPIC = bytes.fromhex("{entry["topic"][2:]}")  # {entry["signature"]}')
+    lines.append(RUNTIME)
+    lines.append("")
+    lines.append("# Functions")
+    lines.append("")
+    for key, entry in functions.items():
+        lines += _function_code(key, entry)
+    lines.append("# Events")
+    lines.append("")
+    decoders = []
+    for key, entry in events.items():
+        event_lines, name = _event_code(key, entry)
+        lines += event_lines
+        if not entry["anonymous"]:
+            decoders.append((name, entry))
+    lines.append("EVENT_DECODERS = {")
+    for name, entry in decoders:
+        lines.append(f'    {name.upper()}_TOPIC: ("{entry["signature"].split("(", 1)[0]}", decode_{name}),')
+    lines.append("}")
+    lines += [
+        "",
+        "",
+        "def decode_log(log):",
+        '    """(event name, decoded arguments) for a log of this contract, or None for an unknown topic"""',
+        '    topics = log["topics"]',
+        "    if not topics:",
+        "        return None",
+        "    decoder = EVENT_DECODERS.get(_to_bytes(topics[0]))",
+        "    if decoder is None:",
+        "        return None",
+        "    name, decode = decoder",
+        '    return name, decode(topics, _to_bytes(log["data"]))',
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate typed Python bindings from a contract ABI")
+    parser.add_argument("abi", nargs="?", default=os.path.join(HERE, "abi", "Prompt.json"))
+    parser.add_argument("-o", "--output", help="default: <contract>_bindings.py next to this script")
+    parser.add_argument("--check", action="store_true", help="exit 1 if the output is missing or out of date")
+    args = parser.parse_args(argv)
+
+    with open(args.abi, "rb") as abi_file:
+        raw = abi_file.read()
+    abi_name = os.path.splitext(os.path.basename(args.abi))[0]
+    source = generate(json.loads(raw), abi_name, hashlib.sha256(raw).hexdigest())
+    output = args.output or os.path.join(HERE, f"{snake(abi_name)}_bindings.py")
+
+    try:
+        with open(output) as existing:
+            current = existing.read() == source
+    except OSError:
+        current = False
+    if args.check:
+        print(f"{output} is {'up to date' if current else 'out of date'}")
+        return 0 if current else 1
+    if current:
+        print(f"{output} is up to date")
+        return 0
+    with open(output, "w") as generated:
+        generated.write(source)
+    print(f"Bindings written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+# ledger.py
+# Local SQLite ledger of every oracle submission: prompt, model id, tx hash,
+# requestId, status and result with timestamps, indexed by tx hash, requestId
+# and user session. Rows are written when a transaction is signed and kept up
+# to date by the receipt tracker (status, requestId) and the log indexer (result),
+# so status and result lookups are local queries that survive restarts
+# (submissions still pending at shutdown are tracked again on startup).
+import os
+import time
+import sqlite3
+import threading
+
+LEDGER_DB_PATH = os.getenv("LEDGER_DB_PATH", "requests.db")
+
+COLUMNS = ("tx_hash", "session_id", "model_id", "prompt", "request_id", "status", "result",
+           "block_number", "error", "created_at", "updated_at", "mined_at", "result_at")
+
+
+class RequestLedger:
+    """Submission records keyed by tx hash"""
+
+    def __init__(self, db_path=LEDGER_DB_PATH):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")  # Readers (other processes, the UI) don't block the writer
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS requests (
+                tx_hash TEXT PRIMARY KEY,
+                session_id TEXT,
+                model_id INTEGER,
+                prompt TEXT,
+                request_id TEXT,
+                status TEXT,
+                result TEXT,
+                block_number INTEGER,
+                error TEXT,
+                created_at REAL,
+                updated_at REAL,
+                mined_at REAL,
+                result_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS requests_by_request_id ON requests (request_id);
+            CREATE INDEX IF NOT EXISTS requests_by_session ON requests (session_id, created_at);
+        """)
+        self._db.commit()
+
+    # Writes
+
+    def record(self, tx_hash, prompt, model_id, session_id=None):
+        """Add a signed submission (status 'pending')"""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                """INSERT OR IGNORE INTO requests (tx_hash, session_id, model_id, prompt, status, created_at, updated_at)
+                   VALUES (?, ?, ?, ?, 'pending', ?, ?)""",
+                (tx_hash, session_id, model_id, prompt, now, now),
+            )
+            self._db.commit()
+
+    def update(self, tx_hash, **changes):
+        changes["updated_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in changes if name in COLUMNS)
+        values = [value for name, value in changes.items() if name in COLUMNS]
+        with self._lock:
+            self._db.execute(f"UPDATE requests SET {assignments} WHERE tx_hash = ?", (*values, tx_hash))
+            self._db.commit()
+
+    def on_receipt(self, tx_hash, status):
+        """Receipt tracker listener: status, block and requestId"""
+        changes = {"status": status["status"], "block_number": status.get("block_number")}
+        if status.get("request_id") is not None:
+            changes["request_id"] = str(status["request_id"])  # uint256 doesn't fit SQLite INTEGER
+        if status["status"] == "mined":
+            changes["mined_at"] = time.time()
+        self.update(tx_hash, **changes)
+
+    def on_result(self, request_id, output):
+        """Log indexer listener: the oracle answered requestId"""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE requests SET result = ?, status = 'answered', result_at = ?, updated_at = ? WHERE request_id = ?",
+                (output, now, now, str(request_id)),
+            )
+            self._db.commit()
+
+    # Reads
+
+    def _rows(self, where, params, suffix=""):
+        with self._lock:
+            cursor = self._db.execute(f"SELECT {', '.join(COLUMNS)} FROM requests WHERE {where} {suffix}", params)
+            return [dict(zip(COLUMNS, row)) for row in cursor.fetchall()]
+
+    def get(self, tx_hash):
+        rows = self._rows("tx_hash = ?", (tx_hash,))
+        return rows[0] if rows else None
+
+    def get_by_request_id(self, request_id):
+        rows = self._rows("request_id = ?", (str(request_id),))
+        return rows[0] if rows else None
+
+    def list_session(self, session_id, limit=50):
+        """Most recent submissions of one user session"""
+        return self._rows("session_id = ?", (session_id, limit), "ORDER BY created_at DESC LIMIT ?")
+
+    def outstanding(self):
+        """Mined submissions still waiting for the oracle"""
+        return self._rows("status = 'mined' AND result IS NULL", ())
+
+    def pending(self):
+        """Submissions whose receipt hadn't been seen yet"""
+        return self._rows("status = 'pending'", ())
+
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+
+def get_request_ledger():
+    """Process-wide ledger, subscribed to the receipt tracker and the log indexer"""
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            from receipt_tracker import receipt_tracker
+            from log_indexer import get_log_indexer
+
+            _ledger = RequestLedger()
+            receipt_tracker.add_listener(_ledger.on_receipt)
+            indexer = get_log_indexer()
+            indexer.add_listener(_ledger.on_result)
+            # The receipt tracker only remembers transactions in memory: follow the ones
+            # still pending when the last process stopped, so they get a requestId and result
+            for row in _ledger.pending():
+                receipt_tracker.track(row["tx_hash"], submitted_at=row["created_at"],
+                                      model_id=row["model_id"], prompt=row["prompt"])
+            # Results that were indexed while this process was down
+            for row in _ledger.outstanding():
+                indexed = indexer.get_by_request_id(row["request_id"])
+                if indexed is not None and indexed.get("output") is not None:
+                    _ledger.on_result(row["request_id"], indexed["output"])
+        return _ledger
@@ -0,0 +1,198 @@
+# log_indexer.py
+# Tails promptRequest / promptsUpdated events from the Prompt contract with
+# eth_getLogs and keeps a local SQLite index keyed by requestId, so reading an
+# oracle result is a local query instead of an eth_call carrying the whole prompt.
+import os
+import sqlite3
+import threading
+import time
+
+from web3 import Web3
+
+from resources import get_web3, get_contract, get_abi_index
+from tracing import span
+import prompt_bindings as bindings  # Generated log decoders for Prompt.sol events
+
+DB_PATH = os.getenv("INDEXER_DB_PATH", "prompt_index.db")
+BLOCK_RANGE = int(os.getenv("INDEXER_BLOCK_RANGE", "2000"))  # Max blocks per eth_getLogs call
+CONFIRMATIONS = int(os.getenv("INDEXER_CONFIRMATIONS", "2"))  # Stay this far behind head to avoid reorgs
+POLL_INTERVAL = float(os.getenv("INDEXER_POLL_INTERVAL", "5"))
+START_BLOCK = os.getenv("INDEXER_START_BLOCK")  # Contract deployment block; defaults to one range behind head
+
+EVENT_NAMES = ("promptRequest", "promptsUpdated")
+
+
+def event_topic(index, name):
+    """topic0 of the event's logs, from the precomputed ABI index"""
+    try:
+        return index["events"][name]["topic"]
+    except KeyError:
+        raise ValueError(f"Event {name} not found in ABI")
+
+
+class LogIndexer:
+    """Incremental event indexer with a persisted block cursor"""
+
+    def __init__(self, db_path=DB_PATH, block_range=BLOCK_RANGE, confirmations=CONFIRMATIONS):
+        self.block_range = block_range
+        self.confirmations = confirmations
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS cursor (id INTEGER PRIMARY KEY CHECK (id = 0), last_block INTEGER);
+            CREATE TABLE IF NOT EXISTS prompts (
+                request_id TEXT PRIMARY KEY,
+                model_id INTEGER,
+                sender TEXT,
+                prompt TEXT,
+                output TEXT,
+                request_tx TEXT,
+                request_block INTEGER,
+                result_block INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS prompts_by_input ON prompts (model_id, prompt);
+        """)
+        self._db.commit()
+        self._thread = None
+        self._listeners = []  # Called with (request_id, output) for each indexed result
+
+    # Cursor
+
+    def last_block(self):
+        row = self._db.execute("SELECT last_block FROM cursor WHERE id = 0").fetchone()
+        return row[0] if row else None
+
+    # Indexing
+
+    def run_once(self):
+        """Index every confirmed block after the cursor; returns the number of logs processed"""
+        w3 = get_web3()
+        contract = get_contract()
+        index = get_abi_index()
+        topics = [event_topic(index, name) for name in EVENT_NAMES]
+
+        head = w3.eth.block_number - self.confirmations
+        last = self.last_block()
+        if last is None:
+            last = int(START_BLOCK) - 1 if START_BLOCK else max(head - self.block_range, -1)
+
+        processed = 0
+        while last < head:
+            to_block = min(last + self.block_range, head)
+            with span("rpc.get_logs"):
+                logs = w3.eth.get_logs({
+                    "address": contract.address,
+                    "fromBlock": last + 1,
+                    "toBlock": to_block,
+                    "topics": [topics],  # topic0 is either event
+                })
+            results = []
+            with self._lock:
+                for log in logs:
+                    try:
+                        decoded = bindings.decode_log(log)
+                        if decoded is None:
+                            raise ValueError("unknown event topic")
+                    except Exception as error_message:
+                        # Skip it: raising here would fail the range before the cursor moves, forever
+                        print(f"Error decoding log {Web3.to_hex(log['transactionHash'])}:{log['logIndex']}: "
+                              f"{str(error_message)}")
+                        continue
+                    name, args = decoded
+                    self._store(name, args, log)
+                    if name == "promptsUpdated":
+                        results.append((args.request_id, args.output))
+                # Results and cursor are committed together, so a crash never skips a range
+                self._db.execute("INSERT OR REPLACE INTO cursor (id, last_block) VALUES (0, ?)", (to_block,))
+                self._db.commit()
+            self._notify(results)
+            processed += len(logs)
+            last = to_block
+        return processed
+
+    def _store(self, name, args, log):
+        request_id = str(args.request_id)  # uint256 doesn't fit SQLite INTEGER
+        if name == "promptRequest":
+            self._db.execute(
+                """INSERT INTO prompts (request_id, model_id, sender, prompt, request_tx, request_block)
+                   VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(request_id) DO UPDATE SET model_id = excluded.model_id, sender = excluded.sender,
+                       prompt = excluded.prompt, request_tx = excluded.request_tx, request_block = excluded.request_block""",
+                (request_id, args.model_id, args.sender, args.prompt,
+                 Web3.to_hex(log["transactionHash"]), log["blockNumber"]),
+            )
+        else:
+            self._db.execute(
+                # The result event carries only the prompt hash; the prompt comes from the promptRequest row
+                """INSERT INTO prompts (request_id, model_id, output, result_block) VALUES (?, ?, ?, ?)
+                   ON CONFLICT(request_id) DO UPDATE SET output = excluded.output, result_block = excluded.result_block""",
+                (request_id, args.model_id, args.output, log["blockNumber"]),
+            )
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    def _notify(self, results):
+        for request_id, output in results:
+            for callback in self._listeners:
+                try:
+                    callback(request_id, output)
+                except Exception as error_message:
+                    print(f"Error in indexer listener: {str(error_message)}")
+
+    def start(self):
+        """Tail new blocks in a daemon thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="log-indexer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self.run_once()
+            except Exception as error_message:
+                print(f"Error indexing prompt events: {str(error_message)}")
+            time.sleep(POLL_INTERVAL)
+
+    # Lookups
+
+    def get_by_request_id(self, request_id):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT request_id, model_id, sender, prompt, output, request_tx, request_block, result_block "
+                "FROM prompts WHERE request_id = ?", (str(request_id),)
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ("request_id", "model_id", "sender", "prompt", "output", "request_tx", "request_block", "result_block")
+        return dict(zip(keys, row))
+
+    def get_result(self, model_id, prompt):
+        """Latest indexed output for a prompt, like Prompt.getAIResult but local"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT output FROM prompts WHERE model_id = ? AND prompt = ? AND output IS NOT NULL "
+                "ORDER BY result_block DESC LIMIT 1", (model_id, prompt)
+            ).fetchone()
+        return row[0] if row else None
+
+
+_indexer = None
+_indexer_lock = threading.Lock()
+
+
+def get_log_indexer():
+    """Process-wide indexer, started on first use"""
+    global _indexer
+    with _indexer_lock:
+        if _indexer is None:
+            _indexer = LogIndexer()
+            _indexer.start()
+        return _indexer
+
+
+if __name__ == "__main__":
+    # One-shot catch-up, e.g. from cron: python log_indexer.py
+    count = LogIndexer().run_once()
+    print(f"Indexed {count} prompt events")
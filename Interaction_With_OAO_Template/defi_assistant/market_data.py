@@ -0,0 +1,147 @@
+# market_data.py
+# Multi-asset market panel: one CoinGecko /coins/markets request for every
+# tracked asset (with the 7d hourly sparkline), held as NumPy arrays so that
+# returns, volatility and correlation for the whole panel are a few vector ops.
+import os
+import time
+import warnings
+
+import numpy as np
+
+from price_cache import PriceCache, get_coingecko
+from tracing import span
+from rate_limit import coingecko_upstream, LOW
+
+# CoinGecko ids of the tracked assets (up to 250 fit in one markets page)
+MARKET_ASSETS = tuple(coin.strip() for coin in os.getenv(
+    "MARKET_ASSETS",
+    "ethereum,bitcoin,wrapped-steth,usd-coin,tether,dai,aave,uniswap,maker,lido-dao,curve-dao-token,chainlink",
+).split(",") if coin.strip())
+MARKET_CACHE_TTL = float(os.getenv("MARKET_CACHE_TTL", "60"))
+MARKET_PROMPT_ASSETS = int(os.getenv("MARKET_PROMPT_ASSETS", "6"))  # Rows included in the Claude prompt
+
+SPARKLINE_PERIODS_PER_YEAR = 24 * 365  # The 7d sparkline is hourly
+
+
+class MarketTable:
+    """Column arrays for a panel of assets, one row per asset"""
+
+    def __init__(self, ids, symbols, price, change_24h, volume, market_cap, sparkline):
+        self.ids = ids
+        self.symbols = symbols
+        self.index = {coin: row for row, coin in enumerate(ids)}
+        self.price = price
+        self.change_24h = change_24h
+        self.volume = volume
+        self.market_cap = market_cap
+        self.sparkline = sparkline  # (assets, hours) float64, NaN where CoinGecko had no point
+        self.fetched_at = time.time()
+        self._stats = None
+
+    @classmethod
+    def from_markets(cls, markets):
+        """Build the table from a /coins/markets response (sparkline=true)"""
+        rows = len(markets)
+        width = max((len((m.get("sparkline_in_7d") or {}).get("price") or []) for m in markets), default=0)
+        sparkline = np.full((rows, width), np.nan)
+        for row, market in enumerate(markets):
+            points = (market.get("sparkline_in_7d") or {}).get("price") or []
+            if points:
+                sparkline[row, width - len(points):] = points  # Align on the most recent point
+
+        def column(name):
+            return np.array([market.get(name) for market in markets], dtype=np.float64)
+
+        return cls(
+            ids=tuple(market["id"] for market in markets),
+            symbols=tuple(market.get("symbol", "").upper() for market in markets),
+            price=column("current_price"),
+            change_24h=column("price_change_percentage_24h"),
+            volume=column("total_volume"),
+            market_cap=column("market_cap"),
+            sparkline=sparkline,
+        )
+
+    def stats(self):
+        """Vectorized 7d return, annualized volatility and the return correlation matrix"""
+        if self._stats is None:
+            # Rows without sparkline points (or a response without any) come out as NaN
+            with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)  # nanstd of an all-NaN row
+                log_returns = np.diff(np.log(self.sparkline), axis=1)
+                valid = ~np.isnan(self.sparkline)
+                return_7d = np.full(len(self.ids), np.nan)
+                if self.sparkline.size:
+                    has_points = valid.any(axis=1)
+                    first = self.sparkline[np.arange(len(self.ids)), valid.argmax(axis=1)]
+                    return_7d[has_points] = (self.sparkline[has_points, -1] / first[has_points] - 1) * 100
+                volatility = np.nanstd(log_returns, axis=1) * np.sqrt(SPARKLINE_PERIODS_PER_YEAR) * 100
+                # Correlation over the hours every asset has a return for
+                complete = ~np.isnan(log_returns).any(axis=0)
+                correlation = np.corrcoef(log_returns[:, complete]) if complete.sum() > 1 else None
+            self._stats = {"return_7d": return_7d, "volatility": volatility, "correlation": correlation}
+        return self._stats
+
+    def correlation(self, coin_a, coin_b):
+        matrix = self.stats()["correlation"]
+        if matrix is None or coin_a not in self.index or coin_b not in self.index:
+            return None
+        return float(matrix[self.index[coin_a], self.index[coin_b]])
+
+    def rows(self):
+        """One dict per asset, for the UI and the JSON API"""
+        stats = self.stats()
+
+        def number(value):
+            # NaN isn't valid JSON
+            return None if value is None or np.isnan(value) else round(float(value), 6)
+
+        return [{
+            "id": coin,
+            "symbol": self.symbols[row],
+            "price": number(self.price[row]),
+            "change_24h": number(self.change_24h[row]),
+            "return_7d": number(stats["return_7d"][row]),
+            "volatility": number(stats["volatility"][row]),
+            "volume": number(self.volume[row]),
+            "market_cap": number(self.market_cap[row]),
+            "eth_correlation": number(self.correlation(coin, "ethereum")),
+        } for row, coin in enumerate(self.ids)]
+
+
+def fetch_market_table(ids=MARKET_ASSETS):
+    """One markets request for every asset in ids"""
+    with span("coingecko.markets"):
+        # Background refresh (tick collector, prompt context): yields to interactive price lookups
+        markets = coingecko_upstream.call(lambda: get_coingecko().get_coins_markets(
+            vs_currency="usd", ids=",".join(ids), sparkline=True, per_page=250, price_change_percentage="24h"),
+            priority=LOW)
+    return MarketTable.from_markets(markets)
+
+
+def market_context(table, max_assets=MARKET_PROMPT_ASSETS):
+    """Short market summary for the recommendation prompt ('' without data)"""
+    if table is None or not table.ids:
+        return ""
+    stats = table.stats()
+    lines = []
+    for row in np.argsort(-np.nan_to_num(table.market_cap, nan=-1))[:max_assets]:
+        coin = table.ids[row]
+        # Fields CoinGecko didn't return (NaN) are left out rather than printed as "nan"
+        fields = [
+            (table.price[row], "${:,.2f}"),
+            (table.change_24h[row], "24h {:+.2f}%"),
+            (stats["return_7d"][row], "7d {:+.2f}%"),
+            (stats["volatility"][row], "annualized volatility {:.0f}%"),
+        ]
+        if coin != "ethereum":
+            fields.append((table.correlation(coin, "ethereum"), "correlation with ETH {:.2f}"))
+        parts = [template.format(value) for value, template in fields if value is not None and not np.isnan(value)]
+        if parts:
+            lines.append(f"{table.symbols[row]}: " + ", ".join(parts))
+    if not lines:
+        return ""
+    return "Market overview:\n" + "\n".join(lines) + "\n"
+
+
+market_cache = PriceCache(fetch_market_table, ttl=MARKET_CACHE_TTL)
@@ -0,0 +1,85 @@
+# nonce_manager.py
+# Hands out transaction nonces locally so submissions from the same wallet
+# don't each need a get_transaction_count round trip and don't race each other.
+import threading
+from contextlib import contextmanager
+
+# Error fragments nodes return when the nonce we used no longer matches the chain
+NONCE_ERRORS = ("nonce too low", "nonce too high", "replacement transaction underpriced", "already known", "invalid nonce")
+
+
+class NonceManager:
+    """Per-account nonce allocator, synced from the chain once and then counted locally"""
+
+    def __init__(self, w3, address):
+        self.w3 = w3
+        self.address = address
+        self._lock = threading.Lock()  # Only held for in-memory work or a single RPC, safe to use from asyncio via to_thread
+        self._next_nonce = None  # None means "sync from the chain before the next allocation"
+
+    def allocate(self):
+        """Return the next free nonce for this account"""
+        with self._lock:
+            if self._next_nonce is None:
+                # 'pending' includes our own transactions that are still in the mempool
+                self._next_nonce = self.w3.eth.get_transaction_count(self.address, 'pending')
+            nonce = self._next_nonce
+            self._next_nonce += 1
+            return nonce
+
+    def needs_sync(self):
+        """True until the first chain sync (or after a resync)"""
+        return self._next_nonce is None
+
+    def seed(self, chain_nonce):
+        """Sync from a transaction count fetched elsewhere, e.g. inside a batched preflight"""
+        with self._lock:
+            if self._next_nonce is None:
+                self._next_nonce = chain_nonce
+
+    def release(self, nonce):
+        """Give back a nonce that was never broadcast"""
+        with self._lock:
+            # Only the newest nonce can be reused safely, otherwise leave a gap and resync
+            if self._next_nonce == nonce + 1:
+                self._next_nonce = nonce
+            else:
+                self._next_nonce = None
+
+    def resync(self):
+        """Forget local state, e.g. after a dropped or replaced transaction"""
+        with self._lock:
+            self._next_nonce = None
+
+    @contextmanager
+    def reserve(self):
+        """Allocate a nonce for one submission
+
+        If the body raises before the transaction is broadcast the nonce is
+        released; nonce-related node errors trigger a resync from the chain.
+        """
+        nonce = self.allocate()
+        try:
+            yield nonce
+        except Exception as error:
+            self.abandon(nonce, error)
+            raise
+
+    def abandon(self, nonce, error):
+        """A submission using nonce failed with error: release it, or resync on nonce errors"""
+        if any(fragment in str(error).lower() for fragment in NONCE_ERRORS):
+            self.resync()
+        else:
+            self.release(nonce)
+
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def get_nonce_manager(w3, address):
+    """Return the process-wide NonceManager for an account"""
+    with _managers_lock:
+        if address not in _managers:
+            _managers[address] = NonceManager(w3, address)
+        return _managers[address]
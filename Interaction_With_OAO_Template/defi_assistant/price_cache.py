@@ -0,0 +1,147 @@
+# price_cache.py
+# Process-wide ETH price cache shared by every Streamlit session and rerun.
+# Streamlit re-executes app.py on each interaction but keeps imported modules in
+# sys.modules, so state kept here survives reruns and is shared between sessions.
+import os
+import threading
+import time
+
+from pycoingecko import CoinGeckoAPI  # Import the CoinGecko API library for cryptocurrency data
+
+from tracing import span
+from rate_limit import coingecko_upstream, raise_for_rate_limit
+
+
+class PriceCache:
+    """TTL cache with single-flight refresh and stale-while-revalidate"""
+
+    def __init__(self, fetch_fn, ttl=None, stale_ttl=None, wait_timeout=10.0):
+        self.fetch_fn = fetch_fn  # Function that hits the upstream API and returns the value
+        # Seconds a value counts as fresh
+        self.ttl = float(ttl if ttl is not None else os.getenv("PRICE_CACHE_TTL", "30"))
+        # Extra seconds a value may be served while a background refresh runs
+        self.stale_ttl = float(stale_ttl if stale_ttl is not None else os.getenv("PRICE_CACHE_STALE_TTL", "300"))
+        self.wait_timeout = wait_timeout  # How long followers wait for the leader's fetch
+
+        self._lock = threading.Lock()
+        self._inflight = None  # threading.Event set when the current refresh finishes
+        self._value = None
+        self._fetched_at = 0.0
+
+        # Counters, read through stats()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.fetches = 0
+        self.errors = 0
+
+    def get(self):
+        """Return the cached value, refreshing it at most once per TTL window"""
+        with self._lock:
+            age = time.monotonic() - self._fetched_at
+
+            if self._value is not None and age < self.ttl:
+                self.hits += 1
+                return self._value
+
+            if self._value is not None and age < self.ttl + self.stale_ttl:
+                # Serve the stale value right away and refresh in the background
+                self.stale_hits += 1
+                if self._inflight is None:
+                    self._inflight = threading.Event()
+                    threading.Thread(target=self._refresh, daemon=True).start()
+                return self._value
+
+            # Nothing usable: one caller (the leader) fetches, everyone else waits for it
+            self.misses += 1
+            leader = self._inflight is None
+            if leader:
+                self._inflight = threading.Event()
+            inflight = self._inflight
+
+        if leader:
+            self._refresh()
+        else:
+            inflight.wait(self.wait_timeout)
+
+        with self._lock:
+            return self._value
+
+    def _refresh(self):
+        try:
+            value = self.fetch_fn()
+            with self._lock:
+                self._value = value
+                self._fetched_at = time.monotonic()
+                self.fetches += 1
+        except Exception as error_message:
+            with self._lock:
+                self.errors += 1
+            print(f"Error refreshing price cache: {str(error_message)}")
+        finally:
+            with self._lock:
+                inflight, self._inflight = self._inflight, None
+            inflight.set()
+
+    def peek(self):
+        """Return the value if it is still fresh, without counting a lookup or fetching"""
+        with self._lock:
+            if self._value is not None and time.monotonic() - self._fetched_at < self.ttl:
+                return self._value
+            return None
+
+    def set(self, value):
+        """Store a value fetched elsewhere, e.g. by the async pipeline"""
+        with self._lock:
+            self._value = value
+            self._fetched_at = time.monotonic()
+            self.fetches += 1
+
+    def invalidate(self):
+        """Drop the cached value so the next get() fetches again"""
+        with self._lock:
+            self._value = None
+            self._fetched_at = 0.0
+
+    def stats(self):
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "fetches": self.fetches,
+                "errors": self.errors,
+                "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+                "age_seconds": time.monotonic() - self._fetched_at if self._value is not None else None,
+            }
+
+
+_coingecko = CoinGeckoAPI()  # Reuse one client (and its HTTP session) for the whole process
+# Overridable so benchmarks (bench/) can point at a local stand-in
+_coingecko.api_base_url = os.getenv("COINGECKO_API_URL", _coingecko.api_base_url)
+_coingecko.session.hooks["response"].append(raise_for_rate_limit)  # Keep the 429 status and Retry-After
+
+COINGECKO_SIMPLE_PRICE_URL = _coingecko.api_base_url + "simple/price"
+ETH_PRICE_PARAMS = {"ids": "ethereum", "vs_currencies": "usd", "include_24hr_change": "true"}
+
+
+def get_coingecko():
+    """The shared CoinGecko client, for other feeds such as market_data"""
+    return _coingecko
+
+
+def fetch_eth_price():
+    """Fetch ETH price and 24h change straight from CoinGecko"""
+    with span("coingecko.price"):
+        eth_data = coingecko_upstream.call(
+            lambda: _coingecko.get_price(ids='ethereum', vs_currencies='usd', include_24hr_change=True))
+    return parse_eth_price(eth_data)
+
+
+def parse_eth_price(eth_data):
+    return eth_data['ethereum']['usd'], eth_data['ethereum']['usd_24h_change']
+
+
+eth_price_cache = PriceCache(fetch_eth_price)
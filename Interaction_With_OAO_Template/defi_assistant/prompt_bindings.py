@@ -0,0 +1,301 @@
+# prompt_bindings.py
+# Generated by gen_bindings.py from abi/Prompt.json -- do not edit; rerun the generator.
+# Precomputed selectors/topics and specialized ABI encoders/decoders for every function and event.
+from typing import Any, NamedTuple, Sequence, Tuple  # noqa: F401
+
+from eth_utils import to_checksum_address
+
+GENERATOR_VERSION = 1
+ABI_SHA256 = "b1a20f76abacc7c24e739c590ed4f89a0b4e8b39b30162f79fb4c5955201ea4c"
+
+_WORD_0 = (0).to_bytes(32, "big")
+_WORD_1 = (1).to_bytes(32, "big")
+_WORD_32 = (32).to_bytes(32, "big")
+_WORD_64 = (64).to_bytes(32, "big")
+_WORD_96 = (96).to_bytes(32, "big")
+
+# Function selectors
+AI_ORACLE_SELECTOR = bytes.fromhex("31b221cd")  # aiOracle()
+AI_ORACLE_CALLBACK_SELECTOR = bytes.fromhex("b0347814")  # aiOracleCallback(uint256,bytes,bytes)
+CALCULATE_AI_RESULT_SELECTOR = bytes.fromhex("fac5d7e1")  # calculateAIResult(uint256,string)
+CALLBACK_GAS_LIMIT_SELECTOR = bytes.fromhex("20f38718")  # callbackGasLimit(uint256)
+ESTIMATE_FEE_SELECTOR = bytes.fromhex("127e8e4d")  # estimateFee(uint256)
+GET_AI_RESULT_SELECTOR = bytes.fromhex("2c6296b7")  # getAIResult(uint256,string)
+GET_AI_RESULT_BY_HASH_SELECTOR = bytes.fromhex("e27b4d99")  # getAIResultByHash(uint256,bytes32)
+GET_AI_RESULT_BY_REQUEST_ID_SELECTOR = bytes.fromhex("e2f151ff")  # getAIResultByRequestId(uint256)
+IS_FINALIZED_SELECTOR = bytes.fromhex("33727c4d")  # isFinalized(uint256)
+LATEST_REQUEST_SELECTOR = bytes.fromhex("9c92abba")  # latestRequest(uint256,bytes32)
+OUTPUTS_SELECTOR = bytes.fromhex("9149bdf2")  # outputs(uint256)
+REQUESTS_SELECTOR = bytes.fromhex("81d12c58")  # requests(uint256)
+SET_CALLBACK_GAS_LIMIT_SELECTOR = bytes.fromhex("813d1e15")  # setCallbackGasLimit(uint256,uint64)
+
+# Event topics
+PROMPT_REQUEST_TOPIC = bytes.fromhex("a0faead83d70148ae18b694377f9bef079251342ab90e14af0f9ef68b891269f")  # promptRequest(uint256,address,uint256,string)
+PROMPTS_UPDATED_TOPIC = bytes.fromhex("cee02fc5bb4c2855a1a78df9151f1659e28f4255a5abcef0d3e8c5787eda3f8b")  # promptsUpdated(uint256,uint256,bytes32,string,bytes)
+
+_MASK_256 = (1 << 256) - 1
+
+
+def _uint(value, bits):
+    if not 0 <= value < 1 << bits:
+        raise ValueError(f"{value} does not fit uint{bits}")
+    return value.to_bytes(32, "big")
+
+
+def _int(value, bits):
+    if not -(1 << (bits - 1)) <= value < 1 << (bits - 1):
+        raise ValueError(f"{value} does not fit int{bits}")
+    return (value & _MASK_256).to_bytes(32, "big")
+
+
+def _bool(value):
+    if not isinstance(value, bool):
+        raise TypeError(f"expected bool, got {value!r}")
+    return _WORD_1 if value else _WORD_0
+
+
+def _to_bytes(value):
+    if isinstance(value, str):
+        return bytes.fromhex(value[2:] if value.startswith(("0x", "0X")) else value)
+    return bytes(value)
+
+
+def _address(value):
+    raw = _to_bytes(value)
+    if len(raw) != 20:
+        raise ValueError(f"{value!r} is not a 20-byte address")
+    return bytes(12) + raw
+
+
+def _fixed_bytes(value, size):
+    raw = _to_bytes(value)
+    if len(raw) > size:
+        raise ValueError(f"{len(raw)} bytes do not fit bytes{size}")
+    return raw + bytes(32 - len(raw))
+
+
+def _dynamic_tail(raw):
+    """Length word plus the data padded to a multiple of 32 bytes"""
+    return len(raw).to_bytes(32, "big") + raw + bytes(-len(raw) % 32)
+
+
+def _dynamic(data, head_position):
+    """bytes/string value whose offset word is at head_position"""
+    offset = int.from_bytes(data[head_position:head_position + 32], "big")
+    length = int.from_bytes(data[offset:offset + 32], "big")
+    if offset + 32 + length > len(data):
+        raise ValueError("ABI data is shorter than its encoded length")
+    return data[offset + 32:offset + 32 + length]
+
+
+# Functions
+
+def encode_ai_oracle() -> bytes:
+    """Calldata for aiOracle()"""
+    return AI_ORACLE_SELECTOR
+
+
+def decode_ai_oracle(data: bytes) -> str:
+    """Return data of aiOracle() -> address"""
+    if len(data) < 32:
+        raise ValueError(f"expected at least 32 bytes of ABI data, got {len(data)}")
+    value0 = to_checksum_address(data[12:32])
+    return value0
+
+
+def encode_ai_oracle_callback(request_id: int, output: bytes, callback_data: bytes) -> bytes:
+    """Calldata for aiOracleCallback(uint256,bytes,bytes)"""
+    tail0 = _dynamic_tail(bytes(output))
+    tail1 = _dynamic_tail(bytes(callback_data))
+    return AI_ORACLE_CALLBACK_SELECTOR + _uint(request_id, 256) + _WORD_96 + _uint(96 + len(tail0), 256) + tail0 + tail1
+
+
+def encode_calculate_ai_result(model_id: int, prompt: str) -> bytes:
+    """Calldata for calculateAIResult(uint256,string)"""
+    tail0 = _dynamic_tail(prompt.encode("utf-8"))
+    return CALCULATE_AI_RESULT_SELECTOR + _uint(model_id, 256) + _WORD_64 + tail0
+
+
+def encode_callback_gas_limit(arg0: int) -> bytes:
+    """Calldata for callbackGasLimit(uint256)"""
+    return CALLBACK_GAS_LIMIT_SELECTOR + _uint(arg0, 256)
+
+
+def decode_callback_gas_limit(data: bytes) -> int:
+    """Return data of callbackGasLimit(uint256) -> uint64"""
+    if len(data) < 32:
+        raise ValueError(f"expected at least 32 bytes of ABI data, got {len(data)}")
+    value0 = int.from_bytes(data[0:32], "big")
+    return value0
+
+
+def encode_estimate_fee(model_id: int) -> bytes:
+    """Calldata for estimateFee(uint256)"""
+    return ESTIMATE_FEE_SELECTOR + _uint(model_id, 256)
+
+
+def decode_estimate_fee(data: bytes) -> int:
+    """Return data of estimateFee(uint256) -> uint256"""
+    if len(data) < 32:
+        raise ValueError(f"expected at least 32 bytes of ABI data, got {len(data)}")
+    value0 = int.from_bytes(data[0:32], "big")
+    return value0
+
+
+def encode_get_ai_result(model_id: int, prompt: str) -> bytes:
+    """Calldata for getAIResult(uint256,string)"""
+    tail0 = _dynamic_tail(prompt.encode("utf-8"))
+    return GET_AI_RESULT_SELECTOR + _uint(model_id, 256) + _WORD_64 + tail0
+
+
+def decode_get_ai_result(data: bytes) -> str:
+    """Return data of getAIResult(uint256,string) -> string"""
+    if len(data) < 32:
+        raise ValueError(f"expected at least 32 bytes of ABI data, got {len(data)}")
+    value0 = _dynamic(data, 0).decode("utf-8")
+    return value0
+
+
+def encode_get_ai_result_by_hash(model_id: int, prompt_hash: bytes) -> bytes:
+    """Calldata for getAIResultByHash(uint256,bytes32)"""
+    return GET_AI_RESULT_BY_HASH_SELECTOR + _uint(model_id, 256) + _fixed_bytes(prompt_hash, 32)
+
+
+def decode_get_ai_result_by_hash(data: bytes) -> str:
+    """Return data of getAIResultByHash(uint256,bytes32) -> string"""
+    if len(data) < 32:
+        raise ValueError(f"expected at least 32 bytes of ABI data, got {len(data)}")
+    value0 = _dynamic(data, 0).decode("utf-8")
+    return value0
+
+
+def encode_get_ai_result_by_request_id(request_id: int) -> bytes:
+    """Calldata for getAIResultByRequestId(uint256)"""
+    return GET_AI_RESULT_BY_REQUEST_ID_SELECTOR + _uint(request_id, 256)
+
+
+def decode_get_ai_result_by_request_id(data: bytes) -> str:
+    """Return data of getAIResultByRequestId(uint256) -> string"""
+    if len(data) < 32:
+        raise ValueError(f"expected at least 32 bytes of ABI data, got {len(data)}")
+    value0 = _dynamic(data, 0).decode("utf-8")
+    return value0
+
+
+def encode_is_finalized(request_id: int) -> bytes:
+    """Calldata for isFinalized(uint256)"""
+    return IS_FINALIZED_SELECTOR + _uint(request_id, 256)
+
+
+def decode_is_finalized(data: bytes) -> bool:
+    """Return data of isFinalized(uint256) -> bool"""
+    if len(data) < 32:
+        raise ValueError(f"expected at least 32 bytes of ABI data, got {len(data)}")
+    value0 = data[31] == 1
+    return value0
+
+
+def encode_latest_request(arg0: int, arg1: bytes) -> bytes:
+    """Calldata for latestRequest(uint256,bytes32)"""
+    return LATEST_REQUEST_SELECTOR + _uint(arg0, 256) + _fixed_bytes(arg1, 32)
+
+
+def decode_latest_request(data: bytes) -> int:
+    """Return data of latestRequest(uint256,bytes32) -> uint256"""
+    if len(data) < 32:
+        raise ValueError(f"expected at least 32 bytes of ABI data, got {len(data)}")
+    value0 = int.from_bytes(data[0:32], "big")
+    return value0
+
+
+def encode_outputs(arg0: int) -> bytes:
+    """Calldata for outputs(uint256)"""
+    return OUTPUTS_SELECTOR + _uint(arg0, 256)
+
+
+def decode_outputs(data: bytes) -> str:
+    """Return data of outputs(uint256) -> string"""
+    if len(data) < 32:
+        raise ValueError(f"expected at least 32 bytes of ABI data, got {len(data)}")
+    value0 = _dynamic(data, 0).decode("utf-8")
+    return value0
+
+
+def encode_requests(arg0: int) -> bytes:
+    """Calldata for requests(uint256)"""
+    return REQUESTS_SELECTOR + _uint(arg0, 256)
+
+
+def decode_requests(data: bytes) -> Tuple[str, int, bytes]:
+    """Return data of requests(uint256) -> address, uint96, bytes32"""
+    if len(data) < 96:
+        raise ValueError(f"expected at least 96 bytes of ABI data, got {len(data)}")
+    value0 = to_checksum_address(data[12:32])
+    value1 = int.from_bytes(data[32:64], "big")
+    value2 = data[64:96]
+    return (value0, value1, value2)
+
+
+def encode_set_callback_gas_limit(model_id: int, gas_limit: int) -> bytes:
+    """Calldata for setCallbackGasLimit(uint256,uint64)"""
+    return SET_CALLBACK_GAS_LIMIT_SELECTOR + _uint(model_id, 256) + _uint(gas_limit, 64)
+
+
+# Events
+
+class PromptRequest(NamedTuple):
+    """promptRequest(uint256,address,uint256,string)"""
+    request_id: int
+    sender: str
+    model_id: int
+    prompt: str
+
+
+def decode_prompt_request(topics: Sequence[bytes], data: bytes) -> PromptRequest:
+    """Arguments of a promptRequest(uint256,address,uint256,string) log"""
+    if len(data) < 128:
+        raise ValueError(f"expected at least 128 bytes of ABI data, got {len(data)}")
+    request_id = int.from_bytes(data[0:32], "big")
+    sender = to_checksum_address(data[44:64])
+    model_id = int.from_bytes(data[64:96], "big")
+    prompt = _dynamic(data, 96).decode("utf-8")
+    return PromptRequest(request_id, sender, model_id, prompt)
+
+
+class PromptsUpdated(NamedTuple):
+    """promptsUpdated(uint256,uint256,bytes32,string,bytes)"""
+    request_id: int
+    model_id: int
+    prompt_hash: bytes
+    output: str
+    callback_data: bytes
+
+
+def decode_prompts_updated(topics: Sequence[bytes], data: bytes) -> PromptsUpdated:
+    """Arguments of a promptsUpdated(uint256,uint256,bytes32,string,bytes) log"""
+    if len(data) < 160:
+        raise ValueError(f"expected at least 160 bytes of ABI data, got {len(data)}")
+    request_id = int.from_bytes(data[0:32], "big")
+    model_id = int.from_bytes(data[32:64], "big")
+    prompt_hash = data[64:96]
+    output = _dynamic(data, 96).decode("utf-8")
+    callback_data = _dynamic(data, 128)
+    return PromptsUpdated(request_id, model_id, prompt_hash, output, callback_data)
+
+
+EVENT_DECODERS = {
+    PROMPT_REQUEST_TOPIC: ("promptRequest", decode_prompt_request),
+    PROMPTS_UPDATED_TOPIC: ("promptsUpdated", decode_prompts_updated),
+}
+
+
+def decode_log(log):
+    """(event name, decoded arguments) for a log of this contract, or None for an unknown topic"""
+    topics = log["topics"]
+    if not topics:
+        return None
+    decoder = EVENT_DECODERS.get(_to_bytes(topics[0]))
+    if decoder is None:
+        return None
+    name, decode = decoder
+    return name, decode(topics, _to_bytes(log["data"]))
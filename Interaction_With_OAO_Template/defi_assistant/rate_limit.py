@@ -0,0 +1,323 @@
+# rate_limit.py
+# Process-wide admission control for the paid / rate-limited upstreams
+# (Anthropic, CoinGecko), shared by every Streamlit session and API worker:
+#   - a token bucket per upstream, with waiters served in priority order
+#   - coalescing: identical requests in flight at the same time share one call
+#   - retries with full-jitter exponential backoff; a Retry-After from the
+#     upstream pauses the whole bucket (for at most UPSTREAM_BACKOFF_MAX), so
+#     other sessions don't hit the 429 too; one longer than the caller's wait
+#     budget fails fast with UpstreamBusy
+# A caller that would queue longer than its wait budget gets UpstreamBusy
+# instead of adding to the burst.
+import os
+import time
+import heapq
+import random
+import asyncio
+import itertools
+import threading
+
+from tracing import Counter, register_metric
+
+# Priorities: lower is served first
+HIGH, NORMAL, LOW = 0, 1, 2  # Interactive request / default / background refresh
+
+RETRIES = int(os.getenv("UPSTREAM_RETRIES", "4"))
+BACKOFF_BASE = float(os.getenv("UPSTREAM_BACKOFF_BASE", "0.5"))
+BACKOFF_MAX = float(os.getenv("UPSTREAM_BACKOFF_MAX", "20"))
+MAX_WAIT = float(os.getenv("UPSTREAM_MAX_WAIT", "30"))  # Longest a caller queues for a token
+
+RETRIES_TOTAL = register_metric(Counter("zagent_upstream_retries_total", "Upstream calls retried, by upstream and reason"))
+REJECTED_TOTAL = register_metric(Counter("zagent_upstream_rejected_total", "Calls refused because the queue wait exceeded the budget"))
+
+
+class UpstreamBusy(Exception):
+    """The upstream's rate budget is exhausted for longer than the caller may wait"""
+
+    def __init__(self, upstream, retry_after):
+        super().__init__(f"{upstream} is busy, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class RateLimited(Exception):
+    """An upstream answered 429 (raised by hooks on clients that hide the status)"""
+
+    def __init__(self, status, retry_after=None):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value):
+    """Seconds from a Retry-After header (delta-seconds form only), or None"""
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Token bucket whose waiters are admitted highest priority first, FIFO within a priority"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate  # Tokens per second
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._waiters = []  # heap of (priority, sequence)
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def pause_until(self, deadline):
+        """Admit nobody before deadline (monotonic), e.g. after a Retry-After"""
+        with self._cond:
+            self._paused_until = max(self._paused_until, deadline)
+            self._tokens = 0.0
+
+    def queue_length(self):
+        with self._cond:
+            return len(self._waiters)
+
+    def expected_wait(self):
+        """Rough seconds until a newly queued caller is admitted"""
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            backlog = len(self._waiters) + 1 - self._tokens
+            return max(self._paused_until - now, 0.0) + max(backlog, 0.0) / self.rate
+
+    def acquire(self, priority=NORMAL, timeout=None):
+        """Take one token; returns False if timeout passes first"""
+        entry = (priority, next(self._sequence))
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self._waiters[0] == entry and now >= self._paused_until and self._tokens >= 1:
+                        self._tokens -= 1
+                        return True
+                    if self._waiters[0] == entry:
+                        wait = max(self._paused_until - now, (1 - self._tokens) / self.rate, 0.001)
+                    else:
+                        wait = None  # Woken when the head is admitted
+                    if deadline is not None:
+                        remaining = deadline - now
+                        if remaining <= 0:
+                            return False
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._cond.wait(wait)
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _AsyncFlight:
+    def __init__(self, task):
+        self.task = task  # The shared call, owned by no single caller
+        self.waiters = 0
+
+
+class Upstream:
+    """Rate limit, coalescing and retry policy for one upstream service"""
+
+    def __init__(self, name, rate, burst, retryable, retry_after=lambda error: None):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.retryable = retryable  # error -> bool
+        self.retry_after = retry_after  # error -> seconds or None
+        self.calls = 0
+        self.coalesced = 0
+        self._inflight = {}  # key -> _Flight (threads)
+        self._inflight_async = {}  # key -> _AsyncFlight (event loop)
+        self._lock = threading.Lock()
+
+    # Admission
+
+    def admit(self, priority=NORMAL, max_wait=MAX_WAIT):
+        """Wait for a token, or raise UpstreamBusy if that would take longer than max_wait"""
+        expected = self.bucket.expected_wait()
+        if expected > max_wait or not self.bucket.acquire(priority, timeout=max_wait):
+            REJECTED_TOTAL.inc(upstream=self.name)
+            raise UpstreamBusy(self.name, expected)
+
+    def _backoff(self, attempt, error, max_wait):
+        retry_after = self.retry_after(error)
+        if retry_after is not None:
+            # Everyone waits, not just this caller: the limit is per API key, not per session.
+            # Capped, so a bogus or hour-long Retry-After can't stall every session for that long
+            pause = min(retry_after, BACKOFF_MAX)
+            self.bucket.pause_until(time.monotonic() + pause)
+            if retry_after > max_wait:
+                REJECTED_TOTAL.inc(upstream=self.name)
+                raise UpstreamBusy(self.name, retry_after) from error
+            RETRIES_TOTAL.inc(upstream=self.name, reason="retry_after")
+            return pause
+        RETRIES_TOTAL.inc(upstream=self.name, reason="backoff")
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+    # Blocking callers
+
+    def call(self, fn, key=None, priority=NORMAL, max_wait=MAX_WAIT):
+        """fn() under the rate limit, with retries; callers passing the same key at the same time share one call"""
+        if key is None:
+            return self._call(fn, priority, max_wait)
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+            else:
+                self.coalesced += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        try:
+            flight.result = self._call(fn, priority, max_wait)
+            return flight.result
+        except Exception as error_message:
+            flight.error = error_message
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            flight.done.set()
+
+    def _call(self, fn, priority, max_wait):
+        for attempt in range(RETRIES + 1):
+            self.admit(priority, max_wait)
+            self.calls += 1
+            try:
+                return fn()
+            except Exception as error_message:
+                if attempt == RETRIES or not self.retryable(error_message):
+                    raise
+                time.sleep(self._backoff(attempt, error_message, max_wait))
+
+    # Asyncio callers (the async pipeline's loop)
+
+    async def call_async(self, coro_fn, key=None, priority=NORMAL, max_wait=MAX_WAIT):
+        """Async twin of call(); coro_fn() must return a new coroutine for each attempt
+
+        A coalesced call runs in its own task, so cancelling one caller (e.g. the
+        one that started it) doesn't cancel it for the others; it is only
+        cancelled once every caller waiting on it has been.
+        """
+        if key is None:
+            return await self._call_async(coro_fn, priority, max_wait)
+        flight = self._inflight_async.get(key)
+        if flight is None:
+            flight = self._inflight_async[key] = _AsyncFlight(
+                asyncio.ensure_future(self._call_async(coro_fn, priority, max_wait)))
+
+            def forget(task, flight=flight):
+                if self._inflight_async.get(key) is flight:
+                    del self._inflight_async[key]
+            flight.task.add_done_callback(forget)
+        else:
+            self.coalesced += 1
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()  # Nobody else wants the result
+            raise
+        finally:
+            flight.waiters -= 1
+
+    async def _call_async(self, coro_fn, priority, max_wait):
+        loop = asyncio.get_running_loop()
+        for attempt in range(RETRIES + 1):
+            # Waiting for a token blocks, so it happens on an executor thread, not on the loop
+            await loop.run_in_executor(None, self.admit, priority, max_wait)
+            self.calls += 1
+            try:
+                return await coro_fn()
+            except Exception as error_message:
+                if attempt == RETRIES or not self.retryable(error_message):
+                    raise
+                await asyncio.sleep(self._backoff(attempt, error_message, max_wait))
+
+    def stats(self):
+        return {"calls": self.calls, "coalesced": self.coalesced, "queued": self.bucket.queue_length()}
+
+
+# Anthropic
+
+def _anthropic_retryable(error):
+    import anthropic
+    if isinstance(error, (anthropic.RateLimitError, anthropic.InternalServerError,
+                          anthropic.APIConnectionError, anthropic.APITimeoutError)):
+        return True
+    return isinstance(error, anthropic.APIStatusError) and error.status_code == 529  # Overloaded
+
+
+def _anthropic_retry_after(error):
+    response = getattr(error, "response", None)
+    return parse_retry_after(response.headers.get("retry-after")) if response is not None else None
+
+
+anthropic_upstream = Upstream(
+    "anthropic",
+    rate=float(os.getenv("ANTHROPIC_RPM", "50")) / 60,
+    burst=int(os.getenv("ANTHROPIC_BURST", "10")),
+    retryable=_anthropic_retryable,
+    retry_after=_anthropic_retry_after,
+)
+
+
+# CoinGecko
+
+def _coingecko_retryable(error):
+    import requests
+    import aiohttp
+    if isinstance(error, (RateLimited, requests.ConnectionError, requests.Timeout,
+                          aiohttp.ClientConnectionError, asyncio.TimeoutError)):
+        return True
+    if isinstance(error, requests.HTTPError):
+        return error.response is not None and error.response.status_code >= 500
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status == 429 or error.status >= 500
+    return False
+
+
+def _coingecko_retry_after(error):
+    if isinstance(error, RateLimited):
+        return error.retry_after
+    headers = getattr(error, "headers", None)  # aiohttp.ClientResponseError
+    if getattr(error, "status", None) == 429 and headers is not None:
+        return parse_retry_after(headers.get("Retry-After"))
+    return None
+
+
+def raise_for_rate_limit(response, *args, **kwargs):
+    """requests response hook: surface 429 with its Retry-After (pycoingecko would turn it into a bare ValueError)"""
+    if response.status_code == 429:
+        raise RateLimited(429, parse_retry_after(response.headers.get("Retry-After")))
+
+
+coingecko_upstream = Upstream(
+    "coingecko",
+    rate=float(os.getenv("COINGECKO_RPM", "30")) / 60,
+    burst=int(os.getenv("COINGECKO_BURST", "5")),
+    retryable=_coingecko_retryable,
+    retry_after=_coingecko_retry_after,
+)
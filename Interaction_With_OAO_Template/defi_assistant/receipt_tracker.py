@@ -0,0 +1,120 @@
+# receipt_tracker.py
+# Follows submitted transactions in a background thread so the Streamlit script
+# thread can return as soon as a transaction is broadcast. The UI polls
+# get_status(), which is a dictionary lookup, instead of waiting for the block.
+import os
+import threading
+import time
+
+from web3.exceptions import TransactionNotFound
+
+from resources import get_web3, get_account, get_contract
+from nonce_manager import get_nonce_manager
+from tracing import span, link, Histogram, register_metric
+import prompt_bindings as bindings  # Generated log decoders for Prompt.sol events
+
+POLL_INTERVAL = float(os.getenv("RECEIPT_POLL_INTERVAL", "2"))
+# A transaction the node no longer knows about after this long is considered dropped
+DROP_TIMEOUT = float(os.getenv("RECEIPT_DROP_TIMEOUT", "600"))
+
+RECEIPT_WAIT_SECONDS = register_metric(Histogram("zagent_receipt_wait_seconds", "Broadcast to receipt, by final status"))
+
+
+class ReceiptTracker:
+    """Background receipt poller publishing per-transaction status updates"""
+
+    def __init__(self, poll_interval=POLL_INTERVAL, drop_timeout=DROP_TIMEOUT):
+        self.poll_interval = poll_interval
+        self.drop_timeout = drop_timeout
+        self._statuses = {}  # tx hash -> status dict
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._listeners = []  # Called with (tx_hash, status) on every status change
+
+    def track(self, tx_hash, submitted_at=None, **info):
+        """Start following a broadcast transaction; extra info is kept with its status"""
+        now = time.time()
+        with self._lock:
+            self._statuses[tx_hash] = dict(info, tx_hash=tx_hash, status="pending", request_id=None,
+                                           block_number=None, submitted_at=submitted_at or now, updated_at=now)
+            self._pending.add(tx_hash)
+            self._ensure_thread()
+        self._wakeup.set()
+
+    def get_status(self, tx_hash):
+        with self._lock:
+            status = self._statuses.get(tx_hash)
+            return dict(status) if status is not None else None
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="receipt-tracker", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+            with self._lock:
+                pending = list(self._pending)
+            for tx_hash in pending:
+                try:
+                    self._poll(tx_hash)
+                except Exception as error_message:
+                    print(f"Error polling receipt for {tx_hash}: {str(error_message)}")
+
+    def _poll(self, tx_hash):
+        w3 = get_web3()
+        try:
+            with span("rpc.get_receipt"):
+                receipt = w3.eth.get_transaction_receipt(tx_hash)
+        except TransactionNotFound:
+            receipt = None
+
+        if receipt is None:
+            status = self.get_status(tx_hash)
+            if time.time() - status["submitted_at"] > self.drop_timeout:
+                try:
+                    w3.eth.get_transaction(tx_hash)
+                except TransactionNotFound:
+                    self._update(tx_hash, status="dropped")
+                    # Our local nonce counter is now ahead of the chain
+                    get_nonce_manager(w3, get_account().address).resync()
+            return
+
+        update = {"block_number": receipt["blockNumber"], "gas_used": receipt["gasUsed"]}
+        if receipt["status"] == 1:
+            # The promptRequest event carries the oracle requestId we need for the result
+            address = get_contract().address
+            events = [bindings.decode_prompt_request(log["topics"], bytes(log["data"])) for log in receipt["logs"]
+                      if log["address"] == address and log["topics"]
+                      and bytes(log["topics"][0]) == bindings.PROMPT_REQUEST_TOPIC]
+            if events:
+                update["request_id"] = events[0].request_id
+                link(tx_hash=tx_hash, request_id=update["request_id"])
+            update["status"] = "mined"
+        else:
+            update["status"] = "failed"
+        RECEIPT_WAIT_SECONDS.observe(time.time() - self.get_status(tx_hash)["submitted_at"], status=update["status"])
+        self._update(tx_hash, **update)
+
+    def _update(self, tx_hash, **changes):
+        with self._lock:
+            status = self._statuses[tx_hash]
+            status.update(changes, updated_at=time.time())
+            if status["status"] != "pending":
+                self._pending.discard(tx_hash)
+            snapshot = dict(status)
+        for callback in self._listeners:
+            try:
+                callback(tx_hash, snapshot)
+            except Exception as error_message:
+                print(f"Error in receipt listener: {str(error_message)}")
+
+
+receipt_tracker = ReceiptTracker()
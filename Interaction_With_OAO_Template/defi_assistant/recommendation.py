@@ -0,0 +1,65 @@
+# recommendation.py
+# Claude request building and response parsing, shared by the blocking,
+# streaming and async recommendation paths.
+from token_budget import classify_request, trim_input, OUTPUT_BUDGETS
+
+CLAUDE_MODEL = "claude-3-5-sonnet-20240620"
+CLAUDE_SYSTEM = "You are an expert in DeFi protocols and yield optimization strategies with access to current ETH price data."
+
+# Answer instructions per request class; the output budget comes from token_budget.OUTPUT_BUDGETS
+ANSWER_INSTRUCTIONS = {
+    "quick": "Answer briefly, in a few sentences, naming specific protocols where relevant.",
+    "standard": "Provide a concise recommendation for the best DeFi strategy based on the request and risk profile.\n"
+                "    Include specific protocols, expected yields, and the main risk factors.",
+    "detailed": "Provide a detailed recommendation for the best DeFi strategy based on the request and risk profile.\n"
+                "    Include specific protocols, expected yields, and risk factors.",
+}
+
+
+def build_recommendation_request(user_input, risk_profile, eth_price, eth_change, market_info=""):
+    """Build the Claude messages.create arguments for a recommendation"""
+    request_class = classify_request(user_input)
+    user_input = trim_input(user_input)  # Oversized pastes would only add input tokens and latency
+    eth_info = ""
+
+    if eth_price is not None and eth_change is not None:
+        eth_info = f"Current ETH price: ${eth_price:,.2f} with a 24h change of {eth_change:.2f}%.\n"
+
+    # Create the prompt for Claude AI
+    prompt = f"""
+    You are a DeFi assistant helping users optimize their yield strategies.
+    {eth_info}{market_info}
+    User risk profile: {risk_profile}
+    User request: {user_input} 
+    
+    {ANSWER_INSTRUCTIONS[request_class]}
+    """
+
+    return dict(
+        model=CLAUDE_MODEL,
+        max_tokens=OUTPUT_BUDGETS[request_class],
+        temperature=0.2,
+        system=CLAUDE_SYSTEM,
+        messages=[
+            {"role": "user", "content": prompt}
+        ]
+    )
+
+
+def message_text(message):
+    """Join the text of a Claude response"""
+    final_str = ""
+
+    # Handle different possible response formats from Claude API
+    if hasattr(message.content, 'items'):  # If content is a dictionary loop through dictionary items
+        for _, value in message.content.items():
+            if isinstance(value, str):
+                final_str += value
+    elif isinstance(message.content, list):  # If content is a list loop through the list
+        for item in message.content:
+            if hasattr(item, 'text'):
+                final_str += item.text
+    else:
+        final_str = str(message.content)
+
+    return final_str
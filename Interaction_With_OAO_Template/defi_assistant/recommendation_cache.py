@@ -0,0 +1,129 @@
+# recommendation_cache.py
+# Caches Claude recommendations so repeated questions don't hit the API again.
+# Keys combine the normalized question, its answer-length class, the risk
+# profile, a quantized ETH price/change bucket and a coarse copy of the market
+# context, so answers are refreshed once the market moves enough.
+import os
+import re
+import json
+import sqlite3
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from token_budget import classify_request
+
+# Width of the price / 24h change buckets that make up the cache key
+PRICE_BUCKET_USD = float(os.getenv("RECOMMENDATION_PRICE_BUCKET_USD", "100"))
+CHANGE_BUCKET_PCT = float(os.getenv("RECOMMENDATION_CHANGE_BUCKET_PCT", "2.5"))
+
+
+def normalize_request(text):
+    """Lowercase, drop punctuation and collapse whitespace"""
+    text = re.sub(r"[^\w\s%$.]", " ", (text or "").lower())
+    return " ".join(text.replace(".", " ").split())
+
+
+def price_bucket(eth_price, eth_change):
+    """Quantize price data so small market moves map to the same key"""
+    if eth_price is None or eth_change is None:
+        return "no-price"
+    return f"{int(eth_price // PRICE_BUCKET_USD)}:{int(eth_change // CHANGE_BUCKET_PCT)}"
+
+
+def context_bucket(context):
+    """Market / trend context with every number rounded to one significant figure"""
+    def coarse(match):
+        value = float(match.group().replace(",", ""))
+        return "%g" % float("%.1g" % value)
+    return re.sub(r"\d[\d,]*(?:\.\d+)?", coarse, context or "")
+
+
+def make_key(user_input, risk_profile, eth_price, eth_change, extra="", context=""):
+    # The class is taken from the raw text: normalization drops the '?' that can make a request 'quick',
+    # and a quick answer is cut to a smaller max_tokens than the full one
+    raw = json.dumps([normalize_request(user_input), classify_request(user_input), risk_profile,
+                      price_bucket(eth_price, eth_change), context_bucket(context), extra])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class RecommendationCache:
+    """In-memory LRU + TTL cache with an optional SQLite tier that survives restarts"""
+
+    def __init__(self, max_entries=512, ttl=3600.0, db_path=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (stored_at, text), oldest first
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS recommendations (key TEXT PRIMARY KEY, stored_at REAL, text TEXT)"
+            )
+            self._db.commit()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[0] < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT stored_at, text FROM recommendations WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and now - row[0] < self.ttl:
+                    self._remember(key, row[0], row[1])  # Promote to memory
+                    self.disk_hits += 1
+                    return row[1]
+
+            self.misses += 1
+            return None
+
+    def put(self, key, text):
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, text)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO recommendations (key, stored_at, text) VALUES (?, ?, ?)",
+                    (key, now, text),
+                )
+                # Expired rows are never read again, clear them out as we go
+                self._db.execute("DELETE FROM recommendations WHERE stored_at < ?", (now - self.ttl,))
+                self._db.commit()
+
+    def _remember(self, key, stored_at, text):
+        self._entries[key] = (stored_at, text)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)  # Evict least recently used
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
+
+
+recommendation_cache = RecommendationCache(
+    max_entries=int(os.getenv("RECOMMENDATION_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("RECOMMENDATION_CACHE_TTL", "3600")),
+    db_path=os.getenv("RECOMMENDATION_CACHE_PATH"),  # Unset keeps the cache in memory only
+)
@@ -0,0 +1,113 @@
+# resources.py
+# Lazily built, process-shared clients (RPC pool, Web3, account, ABI and its index, contract, Anthropic).
+# Streamlit re-runs app.py on every click, but this module is imported once per
+# process, so anything stored here is built on first use and reused afterwards.
+# web3 and anthropic (most of the import time) are only imported by the builders.
+import os
+import json
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv  # Helps load environment variables from a .env file
+
+load_dotenv()
+
+ABI_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'abi', 'Prompt.json')
+
+# Keep-alive pool size for the RPC endpoint (one slot per concurrent caller)
+RPC_POOL_SIZE = int(os.getenv("RPC_POOL_SIZE", "20"))
+RPC_TIMEOUT = float(os.getenv("RPC_TIMEOUT", "30"))
+
+_lock = threading.RLock()  # Re-entrant: building the contract builds Web3 first
+_resources = {}
+init_times = {}  # Resource name -> seconds spent building it
+
+
+def _get(name, factory):
+    """Return the named resource, building it on first use"""
+    resource = _resources.get(name)
+    if resource is not None:
+        return resource
+    with _lock:
+        if name not in _resources:
+            start = time.perf_counter()
+            _resources[name] = factory()
+            init_times[name] = time.perf_counter() - start
+            print(f"Init - {name}: {init_times[name] * 1000:.1f} ms")
+        return _resources[name]
+
+
+def _build_rpc_session():
+    # One pooled keep-alive session for all RPC traffic instead of a new connection per rerun
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=RPC_POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _build_web3():
+    from web3 import Web3  # Library to interact with Ethereum blockchain
+    from rpc_pool import PooledProvider
+
+    # Every request goes through the provider pool (WEB3_PROVIDER_URIS, or the single WEB3_PROVIDER_URI)
+    return Web3(PooledProvider(get_provider_pool()))
+
+
+def _load_abi():
+    # Load the smart contract's ABI (Application Binary Interface) from a JSON file
+    with open(ABI_PATH, 'r') as f:
+        return json.load(f)
+
+
+def _build_contract():
+    contract_address = os.getenv("CONTRACT_ADDRESS")  # Get contract address from environment variables
+    return get_web3().eth.contract(address=contract_address, abi=get_contract_abi())
+
+
+def get_rpc_session():
+    return _get("rpc_session", _build_rpc_session)
+
+
+def _build_provider_pool():
+    from rpc_pool import ProviderPool, provider_urls  # Latency-scored endpoints with hedged reads
+    return ProviderPool(provider_urls(), session=get_rpc_session(), timeout=RPC_TIMEOUT, workers=RPC_POOL_SIZE)
+
+
+def get_provider_pool():
+    return _get("provider_pool", _build_provider_pool)
+
+
+def get_web3():
+    return _get("web3", _build_web3)
+
+
+def get_account():
+    # Create an Ethereum account using the private key
+    return _get("account", lambda: get_web3().eth.account.from_key(os.getenv("WALLET_PRIVATE_KEY")))
+
+
+def get_contract_abi():
+    return _get("contract_abi", _load_abi)
+
+
+def get_abi_index():
+    """Precomputed selectors, event topics and types for the contract (abi/Prompt.index.json)"""
+    from abi_index import load_index
+    return _get("abi_index", lambda: load_index(ABI_PATH))
+
+
+def get_contract():
+    return _get("contract", _build_contract)
+
+
+def _build_anthropic_client():
+    from anthropic import Anthropic  # Library to use Claude AI model
+    # Retries are done by rate_limit, which also honours Retry-After across sessions
+    return Anthropic(api_key=os.getenv("CLAUDE_API_KEY"), max_retries=0)
+
+
+def get_anthropic_client():
+    return _get("anthropic_client", _build_anthropic_client)
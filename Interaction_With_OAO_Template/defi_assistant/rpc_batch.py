@@ -0,0 +1,93 @@
+# rpc_batch.py
+# JSON-RPC batching and Multicall3 aggregation, so the submission preflight
+# (see fee_oracle.py) and multi-result reads cost one round trip instead of one per call.
+import os
+import itertools
+
+from web3 import Web3
+
+from resources import get_web3, get_contract, get_rpc_session, get_provider_pool, RPC_TIMEOUT
+import prompt_bindings as bindings  # Generated encoders/decoders for Prompt.sol (gen_bindings.py)
+
+# Multicall3 is deployed at the same address on almost every EVM chain
+MULTICALL3_ADDRESS = os.getenv("MULTICALL3_ADDRESS", "0xcA11bde05977b3631167028862bE2a173976CA11")
+AGGREGATE3_SELECTOR = Web3.keccak(text="aggregate3((address,bool,bytes)[])")[:4]
+
+_ids = itertools.count(1)
+
+
+class RPCBatchError(Exception):
+    """A call inside a JSON-RPC batch returned an error"""
+
+
+def batch_call(calls, endpoint=None):
+    """Send [(method, params), ...] as one JSON-RPC batch and return the results in order"""
+    payload = [{"jsonrpc": "2.0", "id": next(_ids), "method": method, "params": params} for method, params in calls]
+    if endpoint is not None:
+        response = get_rpc_session().post(endpoint, json=payload, timeout=RPC_TIMEOUT)
+        response.raise_for_status()
+        answers = response.json()
+    else:
+        answers = get_provider_pool().batch(payload)  # Routed like single calls; hedged if all reads
+    # Servers may answer a batch in any order, match responses back by id
+    by_id = {item.get("id"): item for item in answers}
+    results = []
+    for request in payload:
+        item = by_id.get(request["id"])
+        if item is None or "error" in item:
+            error = item.get("error") if item else "missing response"
+            raise RPCBatchError(f"{request['method']} failed: {error}")
+        results.append(item["result"])
+    return results
+
+
+def contract_call_request(data, block="latest"):
+    """(method, params) for an eth_call of Prompt calldata (from prompt_bindings), for use in batch_call"""
+    return ("eth_call", [{"to": get_contract().address, "data": Web3.to_hex(data)}, block])
+
+
+def call_contract(data):
+    """Return data of a single eth_call of Prompt calldata"""
+    return bytes(get_web3().eth.call({"to": get_contract().address, "data": Web3.to_hex(data)}))
+
+
+def prompt_hash(prompt):
+    """keccak256 of the prompt, the key Prompt.sol stores results under"""
+    return Web3.keccak(text=prompt)
+
+
+def get_ai_results(pairs):
+    """Read the results for many (model_id, prompt) pairs in one batch"""
+    # By hash, so each call is 68 bytes of calldata whatever the prompt length
+    results = batch_call([contract_call_request(bindings.encode_get_ai_result_by_hash(model_id, prompt_hash(prompt)))
+                          for model_id, prompt in pairs])
+    return [bindings.decode_get_ai_result_by_hash(Web3.to_bytes(hexstr=result)) for result in results]
+
+
+def get_ai_results_by_request_id(request_ids):
+    """Read the results for many oracle requestIds in one batch"""
+    results = batch_call([contract_call_request(bindings.encode_get_ai_result_by_request_id(int(request_id)))
+                          for request_id in request_ids])
+    return [bindings.decode_get_ai_result_by_request_id(Web3.to_bytes(hexstr=result)) for result in results]
+
+
+def multicall(calls, allow_failure=True):
+    """Aggregate many view calls, given as (address, calldata), into a single eth_call through Multicall3
+
+    For providers that don't accept JSON-RPC batches. Returns the raw return
+    data for each call, or None where a call failed.
+    """
+    w3 = get_web3()
+    calls = [(address, allow_failure, data) for address, data in calls]
+    data = AGGREGATE3_SELECTOR + w3.codec.encode(["(address,bool,bytes)[]"], [calls])
+    raw = w3.eth.call({"to": MULTICALL3_ADDRESS, "data": Web3.to_hex(data)})
+    (results,) = w3.codec.decode(["(bool,bytes)[]"], raw)
+    return [return_data if success else None for success, return_data in results]
+
+
+def get_ai_results_multicall(pairs):
+    """Results for many (model_id, prompt) pairs through one Multicall3 eth_call"""
+    address = get_contract().address
+    raw_results = multicall([(address, bindings.encode_get_ai_result_by_hash(model_id, prompt_hash(prompt)))
+                             for model_id, prompt in pairs])
+    return [bindings.decode_get_ai_result_by_hash(raw) if raw is not None else None for raw in raw_results]
@@ -0,0 +1,260 @@
+# rpc_pool.py
+# Several JSON-RPC endpoints behind one web3 provider. Each endpoint keeps a
+# rolling latency window and an error score; requests go to the best-scoring
+# endpoint. Idempotent reads are hedged: if the first endpoint hasn't answered
+# after its p95 latency, the same request goes to the next one and the first
+# answer wins. Writes go to the primary (first configured) endpoint and fail
+# over to the others only when it can't be reached.
+#
+# Endpoints: WEB3_PROVIDER_URIS (comma-separated, primary first), or WEB3_PROVIDER_URI.
+import os
+import json
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import requests
+from eth_utils import keccak, to_bytes
+from web3.providers.base import JSONBaseProvider
+
+RPC_TIMEOUT = float(os.getenv("RPC_TIMEOUT", "30"))
+LATENCY_WINDOW = int(os.getenv("RPC_LATENCY_WINDOW", "100"))  # Samples kept per endpoint
+HEDGE_MIN_DELAY = float(os.getenv("RPC_HEDGE_MIN_DELAY", "0.05"))
+HEDGE_MAX_DELAY = float(os.getenv("RPC_HEDGE_MAX_DELAY", "2"))
+COOLDOWN_SECONDS = float(os.getenv("RPC_COOLDOWN", "30"))  # Endpoint skipped this long after repeated failures
+FAILURES_BEFORE_COOLDOWN = 3
+
+# Reads that are safe to send twice
+HEDGED_METHODS = frozenset({
+    "eth_call", "eth_gasPrice", "eth_getLogs", "eth_blockNumber", "eth_chainId", "eth_feeHistory",
+    "eth_maxPriorityFeePerGas", "eth_getBlockByNumber", "eth_getTransactionReceipt", "eth_getTransactionByHash",
+    "eth_estimateGas", "eth_getBalance", "eth_getCode", "web3_clientVersion", "net_version",
+})
+# Sent to the primary: writes, and the pending nonce, which only the node holding our transactions knows
+PRIMARY_METHODS = frozenset({"eth_sendRawTransaction", "eth_sendTransaction", "eth_getTransactionCount"})
+
+# A node that already has the transaction (e.g. the primary accepted it before timing out)
+ALREADY_KNOWN_ERRORS = ("already known", "known transaction", "already imported")
+
+
+def _endpoint_label(url):
+    # Never expose provider API keys (often the last path segment) in logs or metrics
+    return url.split("//", 1)[-1].split("/", 1)[0]
+
+
+class Endpoint:
+    """One RPC URL with its rolling latency and error statistics"""
+
+    def __init__(self, url):
+        self.url = url
+        self.label = _endpoint_label(url)
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.error_rate = 0.0  # Exponentially weighted, 0..1
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds, ok):
+        with self._lock:
+            self.requests += 1
+            self.error_rate = 0.9 * self.error_rate + (0.0 if ok else 0.1)
+            if ok:
+                self.latencies.append(seconds)
+                self.consecutive_failures = 0
+            else:
+                self.consecutive_failures += 1
+                if self.consecutive_failures >= FAILURES_BEFORE_COOLDOWN:
+                    self.cooldown_until = time.monotonic() + COOLDOWN_SECONDS
+
+    def percentile(self, pct):
+        with self._lock:
+            samples = sorted(self.latencies)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * pct))]
+
+    @property
+    def available(self):
+        return time.monotonic() >= self.cooldown_until
+
+    def score(self):
+        """Lower is better: median latency inflated by the error rate; untried endpoints go first"""
+        median = self.percentile(0.5)
+        if median is None:
+            return 0.0
+        return median * (1 + 4 * self.error_rate)
+
+
+class EndpointError(Exception):
+    """An endpoint could not be reached or answered with an HTTP error"""
+
+
+class ProviderPool:
+    """Routes JSON-RPC payloads across endpoints"""
+
+    def __init__(self, urls, session=None, timeout=RPC_TIMEOUT, workers=20):
+        if not urls:
+            raise ValueError("No RPC endpoints configured (WEB3_PROVIDER_URIS / WEB3_PROVIDER_URI)")
+        self.endpoints = [Endpoint(url) for url in urls]
+        self.primary = self.endpoints[0]
+        self.session = session or requests.Session()
+        self.timeout = timeout
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+        # One thread per pooled connection. Work is only handed over when a thread is idle, never
+        # queued: a read that finds them all busy goes out unhedged on the caller's own thread
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rpc-hedge")
+        self._idle_workers = threading.BoundedSemaphore(workers)
+
+    # Routing
+
+    def ranked(self):
+        """Available endpoints, best first (all of them if every one is cooling down)"""
+        available = [endpoint for endpoint in self.endpoints if endpoint.available] or self.endpoints
+        return sorted(available, key=lambda endpoint: endpoint.score())
+
+    def _primary_first(self):
+        others = [endpoint for endpoint in self.ranked() if endpoint is not self.primary]
+        return ([self.primary] if self.primary.available else []) + others + \
+            ([] if self.primary.available else [self.primary])
+
+    def _post(self, endpoint, body):
+        start = time.perf_counter()
+        try:
+            response = self.session.post(endpoint.url, data=body, timeout=self.timeout,
+                                         headers={"Content-Type": "application/json"})
+            if response.status_code == 429 or response.status_code >= 500:
+                raise EndpointError(f"{endpoint.label} answered HTTP {response.status_code}")
+            response.raise_for_status()
+            result = response.json()
+        except (requests.RequestException, ValueError) as error_message:
+            endpoint.record(time.perf_counter() - start, ok=False)
+            raise EndpointError(f"{endpoint.label}: {error_message}") from error_message
+        except EndpointError:
+            endpoint.record(time.perf_counter() - start, ok=False)
+            raise
+        endpoint.record(time.perf_counter() - start, ok=True)
+        return result
+
+    def _submit(self, endpoint, body):
+        """_post on an idle executor thread; None if every thread is busy"""
+        if not self._idle_workers.acquire(blocking=False):
+            return None
+        future = self._executor.submit(self._post, endpoint, body)
+        future.add_done_callback(lambda _: self._idle_workers.release())
+        return future
+
+    def _failover(self, endpoints, body):
+        """Try endpoints in order until one answers"""
+        last_error = None
+        for attempt, endpoint in enumerate(endpoints):
+            if attempt:
+                self.failovers += 1
+            try:
+                return self._post(endpoint, body)
+            except EndpointError as error_message:
+                last_error = error_message
+        raise last_error
+
+    def _hedged(self, endpoints, body):
+        """Send to the best endpoint; after its p95 latency also to the next one; first answer wins"""
+        if len(endpoints) == 1:
+            return self._post(endpoints[0], body)  # Nothing to hedge with; skip the thread hop
+        first, backups = endpoints[0], list(endpoints[1:])
+        delay = min(max(first.percentile(0.95) or HEDGE_MAX_DELAY, HEDGE_MIN_DELAY), HEDGE_MAX_DELAY)
+        future = self._submit(first, body)
+        if future is None:
+            # Every thread is busy, i.e. the pool is loaded: don't add duplicates to it
+            return self._failover(endpoints, body)
+        pending = {future: first}
+        hedge_at = time.monotonic() + delay  # Sent right away, so this is the endpoint's own time
+        hedged = False
+        last_error = None
+        while pending:
+            can_hedge = backups and not hedged
+            timeout = max(hedge_at - time.monotonic(), 0.0) if can_hedge else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # Slower than its usual p95: ask a second endpoint as well, if a thread is free
+                hedged = True
+                future = self._submit(backups[0], body)
+                if future is not None:
+                    self.hedges += 1
+                    pending[future] = backups.pop(0)
+                continue
+            for future in done:
+                endpoint = pending.pop(future)
+                try:
+                    result = future.result()
+                except EndpointError as error_message:
+                    last_error = error_message
+                    continue
+                if endpoint is not first:
+                    self.hedge_wins += 1
+                return result  # A slower duplicate finishes in the background and only updates its stats
+            if not pending and backups:
+                # Everything in flight failed: fail over right away
+                self.failovers += 1
+                future = self._submit(backups[0], body)
+                if future is None:
+                    return self._failover(backups, body)
+                pending[future] = backups.pop(0)
+        raise last_error
+
+    def send(self, method, body, raw_transaction=None):
+        if method in PRIMARY_METHODS:
+            response = self._failover(self._primary_first(), body)
+            error = response.get("error") if isinstance(response, dict) else None
+            if raw_transaction is not None and error and any(text in str(error.get("message", "")).lower()
+                                                             for text in ALREADY_KNOWN_ERRORS):
+                # Resent after a failover, but an earlier attempt had already delivered it
+                response = {"jsonrpc": "2.0", "id": response.get("id"), "result": "0x" + keccak(raw_transaction).hex()}
+            return response
+        if method in HEDGED_METHODS:
+            return self._hedged(self.ranked(), body)
+        return self._failover(self.ranked(), body)
+
+    def batch(self, payload):
+        """Send a JSON-RPC batch; hedged when every call in it is an idempotent read"""
+        body = json.dumps(payload).encode()
+        methods = {call["method"] for call in payload}
+        if methods & PRIMARY_METHODS:
+            return self._failover(self._primary_first(), body)
+        if methods <= HEDGED_METHODS:
+            return self._hedged(self.ranked(), body)
+        return self._failover(self.ranked(), body)
+
+    def stats(self):
+        """Flat numbers for /metrics"""
+        stats = {"hedges": self.hedges, "hedge_wins": self.hedge_wins, "failovers": self.failovers}
+        for index, endpoint in enumerate(self.endpoints):
+            stats[f"endpoint{index}_p50_seconds"] = endpoint.percentile(0.5) or 0.0
+            stats[f"endpoint{index}_p95_seconds"] = endpoint.percentile(0.95) or 0.0
+            stats[f"endpoint{index}_error_rate"] = endpoint.error_rate
+            stats[f"endpoint{index}_available"] = int(endpoint.available)
+            stats[f"endpoint{index}_requests"] = endpoint.requests
+        return stats
+
+
+class PooledProvider(JSONBaseProvider):
+    """web3 provider that sends every request through a ProviderPool"""
+
+    def __init__(self, pool):
+        super().__init__()
+        self.pool = pool
+        self.endpoint_uri = pool.primary.url
+
+    def make_request(self, method, params):
+        body = self.encode_rpc_request(method, params)
+        raw_transaction = None
+        if method == "eth_sendRawTransaction" and params:
+            raw_transaction = to_bytes(hexstr=params[0]) if isinstance(params[0], str) else bytes(params[0])
+        return self.pool.send(method, body, raw_transaction)
+
+
+def provider_urls():
+    urls = os.getenv("WEB3_PROVIDER_URIS") or os.getenv("WEB3_PROVIDER_URI") or ""
+    return [url.strip() for url in urls.split(",") if url.strip()]
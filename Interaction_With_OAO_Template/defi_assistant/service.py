@@ -0,0 +1,214 @@
+# service.py
+# The zAgent backend: price, recommendation, submission and result functions
+# with no Streamlit dependency. Used in-process by the page, by api_server.py
+# behind HTTP, and by batch jobs. Errors are raised, callers decide how to show them.
+#
+# Importing this module is cheap: the chain side (web3, eth_account, the async
+# pipeline) is imported inside the functions that need it, so a cold page can
+# show the ETH price before web3 has loaded. warm_up() loads it all ahead of time.
+import os
+
+from price_cache import eth_price_cache  # Process-wide ETH price cache shared across reruns and sessions
+# Web3, account, ABI, contract and Anthropic client are built once per process on first use
+from resources import get_contract, get_anthropic_client, get_provider_pool
+from recommendation import build_recommendation_request, message_text, CLAUDE_MODEL
+from recommendation_cache import recommendation_cache, make_key  # LRU+TTL cache for Claude answers
+from ledger import get_request_ledger  # SQLite record of every submission, by tx hash / requestId / session
+from streaming import stream_message  # Token-by-token Claude output with TTFT / tokens-per-second metrics
+from market_data import market_cache, market_context  # Bulk multi-asset panel with vectorized stats
+from tick_store import get_tick_store, trend_context  # On-disk ring buffer of price ticks for 1h/24h/7d trends
+from token_budget import log_token_usage  # Estimated vs actual tokens per request
+from rate_limit import anthropic_upstream, coingecko_upstream, HIGH  # Shared per-upstream rate limits, coalescing and retries
+from tracing import request_context, span, current_correlation_id, register_stats, start_metrics_server  # Spans, correlation ids and /metrics
+
+register_stats("zagent_price_cache", eth_price_cache.stats)
+register_stats("zagent_recommendation_cache", recommendation_cache.stats)
+register_stats("zagent_market_cache", market_cache.stats)
+register_stats("zagent_rpc", lambda: get_provider_pool().stats())
+register_stats("zagent_anthropic_upstream", anthropic_upstream.stats)
+register_stats("zagent_coingecko_upstream", coingecko_upstream.stats)
+
+# In-process deployments (the Streamlit page) have no api_server; METRICS_PORT serves /metrics on its own
+if os.getenv("METRICS_PORT"):
+    start_metrics_server(int(os.getenv("METRICS_PORT")))
+
+
+def get_eth_price():
+    """Get current ETH price and 24h change"""
+    # Served from the shared cache, so CoinGecko sees one request per TTL window
+    cached = eth_price_cache.get()
+    if cached is None:
+        print("Error fetching ETH price: no price available")
+        return None, None
+    price, change_24h = cached
+    return price, change_24h
+
+
+def get_recommendation_context():
+    """ETH price, 24h change and the market / trend text that go into the prompt"""
+    eth_price, eth_change = get_eth_price()
+    return eth_price, eth_change, market_context(market_cache.get()) + trend_context(get_tick_store())
+
+
+def get_recommendation_request(user_input, risk_profile, context):
+    """Claude request arguments shared by the blocking and streaming paths"""
+    return build_recommendation_request(user_input, risk_profile, *context)
+
+
+def get_market_summary():
+    """Price, 24h/7d change, volatility and ETH correlation for every tracked asset"""
+    table = market_cache.get()
+    return table.rows() if table is not None else []
+
+
+def recommendation_cache_key(user_input, risk_profile, context):
+    """Cache key for a request: normalized question and its class, risk profile, model, ETH price and context buckets"""
+    eth_price, eth_change, market_info = context
+    return make_key(user_input, risk_profile, eth_price, eth_change, extra=CLAUDE_MODEL, context=market_info)
+
+
+def get_defi_recommendation(user_input, risk_profile):
+    with request_context("recommendation"):
+        context = get_recommendation_context()
+        cache_key = recommendation_cache_key(user_input, risk_profile, context)
+        cached = recommendation_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        anthropic_client = get_anthropic_client()
+        request_kwargs = get_recommendation_request(user_input, risk_profile, context)
+
+        def create():
+            with span("claude.create"):
+                message = anthropic_client.messages.create(**request_kwargs)
+            log_token_usage(request_kwargs, message.usage.input_tokens, message.usage.output_tokens)
+            return message_text(message)
+
+        # Sessions asking the same question at the same time share one Claude call
+        final_str = anthropic_upstream.call(create, key=cache_key, priority=HIGH)
+
+        recommendation_cache.put(cache_key, final_str)
+        return final_str
+
+
+def stream_defi_recommendation(user_input, risk_profile, cancel_event=None):
+    """Yield the recommendation text as Claude generates it"""
+    with request_context("recommendation_stream"):
+        context = get_recommendation_context()
+        cache_key = recommendation_cache_key(user_input, risk_profile, context)
+        cached = recommendation_cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+        request_kwargs = get_recommendation_request(user_input, risk_profile, context)
+        anthropic_upstream.admit(HIGH)  # Streams take a token but aren't retried once text has been shown
+        chunks = []
+        on_metrics = lambda metrics: log_token_usage(request_kwargs, metrics.input_tokens, metrics.output_tokens)
+        for text in stream_message(get_anthropic_client(), cancel_event=cancel_event, on_metrics=on_metrics, **request_kwargs):
+            chunks.append(text)
+            yield text
+
+        # Only complete answers are cached, never a cancelled partial one
+        if cancel_event is None or not cancel_event.is_set():
+            recommendation_cache.put(cache_key, "".join(chunks))
+
+
+def send_to_blockchain(prompt_text, model_id=11, session_id=None):  # Default to Llama3 model_id (11)
+    """Submit a prompt to the blockchain AI Oracle and return the tx hash"""
+    # Returns as soon as the transaction is broadcast; receipts are followed in the background
+    from submission import submit_prompt  # Builds, signs and broadcasts calculateAIResult transactions
+
+    with request_context("submission"):
+        return submit_prompt(prompt_text, model_id, session_id=session_id)
+
+
+def get_transaction_status(tx_hash):
+    """Ledger row for a submission (status, requestId, result), or None for an unknown hash"""
+    from receipt_tracker import receipt_tracker  # Follows receipts in the background
+
+    return get_request_ledger().get(tx_hash) or receipt_tracker.get_status(tx_hash)
+
+
+def list_requests(session_id, limit=50):
+    """Most recent submissions of a user session, newest first"""
+    return get_request_ledger().list_session(session_id, limit)
+
+
+def get_request_result(tx_hash):
+    """Oracle output for a submission ('' while it is pending, None for an unknown hash)"""
+    from log_indexer import get_log_indexer  # Local index of promptRequest / promptsUpdated events
+    from rpc_batch import call_contract
+    import prompt_bindings as bindings
+
+    with request_context("request_result"):
+        ledger = get_request_ledger()
+        row = ledger.get(tx_hash)
+        if row is None:
+            return None
+        if row["result"] is not None or row["request_id"] is None:
+            return row["result"] or ""
+        # The indexer may have the answer before its listener reached this ledger (e.g. another process indexed it)
+        indexed = get_log_indexer().get_by_request_id(row["request_id"])
+        output = indexed["output"] if indexed is not None else None
+        if output is None:
+            # Not indexed yet: constant-size read by requestId
+            with span("rpc.get_ai_result"):
+                output = bindings.decode_get_ai_result_by_request_id(
+                    call_contract(bindings.encode_get_ai_result_by_request_id(int(row["request_id"])))) or None
+        if output is not None:
+            ledger.on_result(row["request_id"], output)
+        return output or ""
+
+
+def get_blockchain_result(model_id, prompt_text):
+    """AI Oracle result for a prompt ('' while it is still being processed)"""
+    from log_indexer import get_log_indexer
+    from rpc_batch import prompt_hash, call_contract
+    import prompt_bindings as bindings  # Generated encoders/decoders for Prompt.sol calls
+
+    with request_context("result"):
+        # Local read from the event index first; it is filled by a background eth_getLogs tail
+        with span("index.get_result"):
+            indexed = get_log_indexer().get_result(model_id, prompt_text)
+        if indexed is not None:
+            return indexed
+
+        # Not indexed yet: this retrieves the AI-generated result for the given prompt (by its hash, so
+        # the eth_call payload doesn't grow with the prompt)
+        with span("rpc.get_ai_result"):
+            return bindings.decode_get_ai_result_by_hash(
+                call_contract(bindings.encode_get_ai_result_by_hash(model_id, prompt_hash(prompt_text))))
+
+
+def recommend_and_submit(user_input, risk_profile, blockchain_prompt=None, model_id=11, timeout=None, session_id=None):
+    """Recommendation and submission concurrently; see async_pipeline.recommend_and_submit"""
+    from async_pipeline import run_pipeline  # Concurrent recommendation + submission on asyncio
+
+    # Traced on the event loop; the correlation id carries over if the caller already has one
+    future = run_pipeline(user_input, risk_profile, blockchain_prompt, model_id,
+                          correlation_id=current_correlation_id(), session_id=session_id)
+    try:
+        return future.result(timeout)
+    finally:
+        # The caller's timeout expired: stop every stage still running
+        if not future.done():
+            future.cancel()
+
+
+def warm_up():
+    """Import the chain side, build the shared clients and prime the price cache
+
+    Run in the background after startup (api_server does, before reporting
+    ready) so the first real request doesn't pay for it. Price errors are
+    logged, not raised: CoinGecko being down must not keep a replica unready.
+    """
+    import submission, log_indexer, async_pipeline  # noqa: F401  Loaded for their import time only
+    from resources import get_web3, get_account
+
+    get_web3()
+    get_account()
+    get_contract()
+    get_anthropic_client()
+    get_request_ledger()
+    get_eth_price()
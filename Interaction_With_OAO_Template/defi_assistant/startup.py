@@ -0,0 +1,168 @@
+# startup.py
+# Cold-start bookkeeping: named phases measured from process start
+# (first_render, listening, ready), the readiness flag behind api_server's
+# /ready, and an opt-in import profiler.
+#
+# STARTUP_PROFILE=1 times every module import (inclusive, and exclusive of the
+# imports it triggers) and prints the slowest ones with the phase timings once
+# the app has rendered / the API is ready. Import this module first so the
+# profiler sees everything imported after it.
+import os
+import sys
+import time
+import threading
+
+STARTUP_PROFILE = os.getenv("STARTUP_PROFILE", "").lower() in ("1", "true", "yes")
+PROFILE_TOP = int(os.getenv("STARTUP_PROFILE_TOP", "20"))  # Slowest imports listed in the report
+
+
+def _process_uptime():
+    """Seconds since this process started (Linux /proc), or 0 if unknown"""
+    try:
+        with open("/proc/self/stat") as stat:
+            started_ticks = int(stat.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as uptime:
+            boot_seconds = float(uptime.read().split()[0])
+        return max(boot_seconds - started_ticks / os.sysconf("SC_CLK_TCK"), 0.0)
+    except (OSError, ValueError, IndexError, AttributeError):
+        return 0.0
+
+
+# Process start on the perf_counter clock, so phases include interpreter and framework boot
+_started = time.perf_counter() - _process_uptime()
+_phases = {}  # phase name -> seconds since process start
+_lock = threading.Lock()
+_ready = threading.Event()
+
+
+def mark(phase):
+    """Record the first time a phase is reached; returns its seconds since process start"""
+    with _lock:
+        if phase not in _phases:
+            _phases[phase] = time.perf_counter() - _started
+            print(f"Startup - {phase}: {_phases[phase]:.3f} s")
+        return _phases[phase]
+
+
+def phases():
+    with _lock:
+        return dict(_phases)
+
+
+def mark_ready():
+    """Flip the readiness flag (first call only; later calls, e.g. Streamlit reruns, do nothing)"""
+    with _lock:
+        if _ready.is_set():
+            return
+        _ready.set()
+    mark("ready")
+    if STARTUP_PROFILE:
+        print(report())
+
+
+def is_ready():
+    return _ready.is_set()
+
+
+def readiness():
+    """Body for the readiness probe"""
+    return {"ready": _ready.is_set(), "uptime_seconds": time.perf_counter() - _started, "phases": phases()}
+
+
+# Import profiler
+
+class _TimedLoader:
+    """Wraps a module loader to time exec_module"""
+
+    def __init__(self, loader, profiler):
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profiler.enter()
+        start = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler.leave(module.__name__, time.perf_counter() - start)
+            # Code that inspects loaders later (importlib.resources, pkgutil) sees the real one
+            module.__loader__ = self._loader
+            if getattr(module, "__spec__", None) is not None:
+                module.__spec__.loader = self._loader
+
+
+class ImportProfiler:
+    """sys.meta_path hook recording inclusive and self time for every module import"""
+
+    def __init__(self):
+        self.inclusive = {}
+        self.self_time = {}
+        self._children = threading.local()  # Per thread: stack of child-import seconds
+
+    def find_spec(self, name, path=None, target=None):
+        if getattr(self._children, "finding", False):
+            return None
+        self._children.finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(name, path, target)
+                if spec is not None:
+                    if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                        spec.loader = _TimedLoader(spec.loader, self)
+                    return spec
+            return None
+        finally:
+            self._children.finding = False
+
+    def enter(self):
+        stack = getattr(self._children, "stack", None)
+        if stack is None:
+            stack = self._children.stack = []
+        stack.append(0.0)
+
+    def leave(self, name, seconds):
+        stack = self._children.stack
+        children = stack.pop()
+        if stack:
+            stack[-1] += seconds
+        self.inclusive[name] = seconds
+        self.self_time[name] = seconds - children
+
+    def packages(self):
+        """Self time summed per top-level package"""
+        totals = {}
+        for name, seconds in self.self_time.items():
+            package = name.split(".", 1)[0]
+            totals[package] = totals.get(package, 0.0) + seconds
+        return totals
+
+
+_profiler = None
+
+
+def report(top=PROFILE_TOP):
+    """Phase timings plus, when profiling, the slowest imports and packages"""
+    lines = ["Startup profile"]
+    lines += [f"  {phase:<24} {seconds:8.3f} s" for phase, seconds in sorted(phases().items(), key=lambda item: item[1])]
+    if _profiler is not None:
+        packages = sorted(_profiler.packages().items(), key=lambda item: -item[1])[:top]
+        lines.append(f"  imports: {len(_profiler.inclusive)} modules, {sum(_profiler.self_time.values()):.3f} s")
+        lines.append("  by package (self time):")
+        lines += [f"    {package:<32} {seconds * 1000:9.1f} ms" for package, seconds in packages]
+        modules = sorted(_profiler.inclusive.items(), key=lambda item: -item[1])[:top]
+        lines.append("  slowest modules (inclusive):")
+        lines += [f"    {name:<48} {seconds * 1000:9.1f} ms" for name, seconds in modules]
+    return "\n".join(lines)
+
+
+if STARTUP_PROFILE and _profiler is None:
+    _profiler = ImportProfiler()
+    sys.meta_path.insert(0, _profiler)
@@ -0,0 +1,87 @@
+# streaming.py
+# Streams Claude responses token by token and records latency metrics per request
+import threading
+import time
+from collections import deque
+
+from tracing import span, Histogram, register_metric
+
+# Metrics for the most recent streamed requests, newest last
+recent_metrics = deque(maxlen=200)
+_metrics_lock = threading.Lock()
+
+TTFT_SECONDS = register_metric(Histogram("zagent_claude_ttft_seconds", "Time to first streamed Claude token"))
+
+
+class StreamMetrics:
+    """Timing for one streamed request"""
+
+    def __init__(self, model):
+        self.model = model
+        self.started_at = time.perf_counter()
+        self.first_token_at = None
+        self.finished_at = None
+        self.input_tokens = None
+        self.output_tokens = 0
+        self.cancelled = False
+
+    @property
+    def time_to_first_token(self):
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started_at
+
+    @property
+    def tokens_per_second(self):
+        # Measured over the generation phase only, so TTFT does not drag it down
+        if self.first_token_at is None or self.finished_at is None:
+            return None
+        elapsed = self.finished_at - self.first_token_at
+        return self.output_tokens / elapsed if elapsed > 0 else None
+
+    def as_dict(self):
+        return {
+            "model": self.model,
+            "ttft_seconds": self.time_to_first_token,
+            "total_seconds": (self.finished_at or time.perf_counter()) - self.started_at,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "tokens_per_second": self.tokens_per_second,
+            "cancelled": self.cancelled,
+        }
+
+
+def stream_message(client, cancel_event=None, on_metrics=None, **create_kwargs):
+    """Yield text chunks from client.messages.stream
+
+    Stops early when cancel_event is set or when the consumer stops iterating
+    (e.g. Streamlit aborting the script run); leaving the `with` block closes
+    the HTTP response so Claude stops generating for us.
+    """
+    metrics = StreamMetrics(create_kwargs.get("model"))
+    try:
+        with span("claude.stream"), client.messages.stream(**create_kwargs) as stream:
+            for text in stream.text_stream:
+                if cancel_event is not None and cancel_event.is_set():
+                    metrics.cancelled = True
+                    break
+                if metrics.first_token_at is None:
+                    metrics.first_token_at = time.perf_counter()
+                metrics.output_tokens += 1  # Rough count (one per chunk) until the final usage arrives
+                yield text
+            if not metrics.cancelled:
+                usage = stream.get_final_message().usage
+                metrics.input_tokens = usage.input_tokens
+                metrics.output_tokens = usage.output_tokens
+    except GeneratorExit:
+        metrics.cancelled = True
+        raise
+    finally:
+        metrics.finished_at = time.perf_counter()
+        with _metrics_lock:
+            recent_metrics.append(metrics)
+        if metrics.time_to_first_token is not None:
+            TTFT_SECONDS.observe(metrics.time_to_first_token, model=metrics.model)
+        print(f"Stream - {metrics.as_dict()}")
+        if on_metrics is not None:
+            on_metrics(metrics)
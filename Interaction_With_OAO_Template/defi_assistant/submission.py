@@ -0,0 +1,81 @@
+# submission.py
+# Builds, signs and broadcasts calculateAIResult transactions to the ORA AI Oracle.
+# Shared by the Streamlit page and the bulk submission job, so it raises errors
+# instead of showing them in the UI.
+from resources import get_web3, get_account, get_contract
+from nonce_manager import get_nonce_manager
+from fee_oracle import fee_oracle  # Per-block fee cache and EIP-1559 pricing
+from receipt_tracker import receipt_tracker  # Follows receipts in the background
+from ledger import get_request_ledger  # Persistent record of every submission
+from tracing import span, link  # Per-call timings and the request -> tx hash -> requestId link
+import prompt_bindings as bindings  # Generated calldata encoders for Prompt.sol
+
+
+def submit_prompt(prompt_text, model_id=11, on_signed=None, session_id=None):  # Default to Llama3 model_id (11)
+    """Submit a prompt to the blockchain AI Oracle and return the tx hash
+
+    on_signed(tx_hash) is called after signing but before broadcasting, which
+    lets callers journal the hash and later tell whether a send went through.
+    The submission is also recorded in the request ledger under session_id.
+    """
+    ledger = get_request_ledger()
+    w3 = get_web3()
+    account = get_account()
+    contract = get_contract()
+
+    nonce_manager = get_nonce_manager(w3, account.address)
+
+    # Fee (how much ETH is needed to pay for the request) and gas pricing are cached per block;
+    # a refresh is one batched round trip that also carries the pending nonce on first use
+    quote = fee_oracle.quote(model_id, account.address if nonce_manager.needs_sync() else None)
+    if 'nonce' in quote:
+        nonce_manager.seed(quote['nonce'])
+    fee = quote['fee']
+
+    data = w3.to_hex(bindings.encode_calculate_ai_result(model_id, prompt_text))
+    # Gas limit from eth_estimateGas plus headroom, memoized per model and prompt-length bucket
+    gas = fee_oracle.gas_limit(model_id, prompt_text, {
+        'from': account.address,
+        'to': contract.address,
+        'data': data,
+        'value': fee,
+    })
+    # EIP-1559 maxFeePerGas/maxPriorityFeePerGas, or gasPrice on legacy chains
+    pricing = {name: quote[name] for name in ('maxFeePerGas', 'maxPriorityFeePerGas', 'gasPrice') if name in quote}
+
+    # Nonces come from the local per-account allocator, so concurrent submissions don't collide
+    with nonce_manager.reserve() as nonce:
+        # Build a transaction to call the calculateAIResult function on the smart contract
+        tx = {
+            'from': account.address,  # Sender's address
+            'to': contract.address,
+            'data': data,  # calculateAIResult(model_id, prompt_text) calldata
+            'gas': gas,  # Maximum gas units allowed
+            'nonce': nonce,  # Transaction sequence number
+            'chainId': quote['chain_id'],  # Given up front so web3 doesn't ask the node again
+            'value': fee,  # Amount of ETH to send with the transaction
+            **pricing
+        }
+
+        # Sign the transaction with the private key
+        with span("sign"):
+            signed_tx = w3.eth.account.sign_transaction(tx, private_key=account.key)
+        signed_hash = w3.to_hex(signed_tx.hash)
+        # In the ledger before broadcasting, so receipt updates always find the row
+        ledger.record(signed_hash, prompt_text, model_id, session_id)
+        if on_signed is not None:
+            on_signed(signed_hash)
+
+        # Send the signed transaction to the blockchain
+        try:
+            with span("rpc.send_raw_transaction"):
+                tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
+        except Exception as error_message:
+            ledger.update(signed_hash, status="error", error=str(error_message))
+            raise
+
+    # Don't wait for the block here: the background tracker follows the receipt
+    tx_hash = w3.to_hex(tx_hash)
+    link(tx_hash=tx_hash)
+    receipt_tracker.track(tx_hash, model_id=model_id, prompt=prompt_text)
+    return tx_hash
@@ -0,0 +1,283 @@
+# tick_store.py
+# Fixed-size, memory-mapped, columnar ring buffer of price ticks on disk, so the
+# prompt can include 1h/24h/7d trends without fetching history on demand.
+#
+# File layout (one file, TICK_STORE_PATH):
+#   header      int64[8]                  magic, version, capacity, assets, count (ticks ever written)
+#   timestamps  float64[capacity]         unix seconds
+#   prices      float64[assets, capacity] one contiguous column per asset
+# The asset ids live next to it in <path>.json.
+#
+# One process (whichever takes the lock file) runs the collector and writes;
+# every process maps the same file read-only and reads without copying.
+# The file survives restarts; the collector resumes at the stored count.
+# Readers use the layout stored in the file. Only the writer recreates it, when
+# its MARKET_ASSETS / TICK_CAPACITY differ, and readers then remap the new file.
+import os
+import json
+import time
+import warnings
+import threading
+
+import numpy as np
+
+try:
+    import fcntl  # Single-writer lock; without it (Windows) every process assumes it is the writer
+except ImportError:
+    fcntl = None
+
+from market_data import market_cache, MARKET_ASSETS
+
+TICK_STORE_PATH = os.getenv("TICK_STORE_PATH", "price_ticks.bin")
+TICK_CAPACITY = int(os.getenv("TICK_CAPACITY", "20160"))  # 14 days of one-minute ticks
+TICK_INTERVAL = float(os.getenv("TICK_INTERVAL", "60"))
+
+MAGIC = 0x7A7469636B73  # "ztick"
+VERSION = 1
+HEADER_WORDS = 8
+HEADER_BYTES = HEADER_WORDS * 8
+_COUNT = 4  # Header slot holding the number of ticks ever written
+
+WINDOWS = {"1h": 3600, "24h": 86400, "7d": 7 * 86400}
+
+
+class TickStore:
+    """Memory-mapped ring buffer of (timestamp, price per asset) ticks"""
+
+    def __init__(self, path=TICK_STORE_PATH, assets=MARKET_ASSETS, capacity=TICK_CAPACITY):
+        self.path = path
+        self.wanted_layout = (list(assets), capacity)  # Applied by the writer only
+        self._writer = False
+        self._lock_file = None
+        self._open("r")
+
+    # File handling
+
+    def _stored_layout(self):
+        """(assets, capacity) recorded in the file, or None if there is no complete store"""
+        assets = self._stored_assets()
+        try:
+            header = np.fromfile(self.path, dtype=np.int64, count=HEADER_WORDS)
+        except OSError:
+            return None
+        if len(header) < HEADER_WORDS or header[0] != MAGIC or header[1] != VERSION:
+            return None
+        if assets is None or len(assets) != header[3]:
+            return None  # Metadata from another layout, the writer is replacing the file
+        return assets, int(header[2])
+
+    def _open(self, mode):
+        """Map the file with the layout stored in it; an empty store until there is one"""
+        layout = self._stored_layout()
+        if layout is None:
+            self.assets, self.capacity = self.wanted_layout
+            self._inode = None
+            self.header = np.zeros(HEADER_WORDS, dtype=np.int64)
+            self.timestamps = np.empty(0)
+            self.prices = np.empty((len(self.assets), 0))
+        else:
+            self.assets, self.capacity = layout
+            self._inode = os.stat(self.path).st_ino
+            self._map(mode)
+        self.index = {coin: row for row, coin in enumerate(self.assets)}
+
+    def refresh(self):
+        """Readers: remap if the writer created or recreated the file since it was mapped"""
+        if self._writer:
+            return
+        try:
+            inode = os.stat(self.path).st_ino
+        except OSError:
+            inode = None
+        if inode != self._inode:
+            self._open("r")
+
+    def _stored_assets(self):
+        try:
+            with open(self.path + ".json") as meta:
+                return json.load(meta)["assets"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _create(self, assets, capacity):
+        if os.path.exists(self.path):
+            print(f"Tick store - layout changed, recreating {self.path}")
+        size = HEADER_BYTES + 8 * capacity * (1 + len(assets))
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as data:
+            data.truncate(size)
+        header = np.memmap(tmp_path, dtype=np.int64, mode="r+", shape=(HEADER_WORDS,))
+        header[:5] = [MAGIC, VERSION, capacity, len(assets), 0]
+        header.flush()
+        del header
+        with open(self.path + ".json", "w") as meta:
+            json.dump({"assets": list(assets)}, meta)
+        os.replace(tmp_path, self.path)
+
+    def _map(self, mode):
+        self.header = np.memmap(self.path, dtype=np.int64, mode=mode, shape=(HEADER_WORDS,))
+        self.timestamps = np.memmap(self.path, dtype=np.float64, mode=mode, offset=HEADER_BYTES,
+                                    shape=(self.capacity,))
+        self.prices = np.memmap(self.path, dtype=np.float64, mode=mode, offset=HEADER_BYTES + 8 * self.capacity,
+                                shape=(len(self.assets), self.capacity))
+
+    def acquire_writer(self):
+        """Become the single writer if no other process is; returns whether we are"""
+        if self._writer:
+            return True
+        self._lock_file = open(self.path + ".lock", "w")
+        if fcntl is not None:
+            try:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                self._lock_file.close()
+                self._lock_file = None
+                return False
+        # Only the lock holder may replace the file: a reader doing it would wipe the
+        # history while the writer kept appending to the old, unlinked inode
+        if self._stored_layout() != self.wanted_layout:
+            self._create(*self.wanted_layout)
+        self._writer = True
+        self._open("r+")
+        return True
+
+    # Writing
+
+    @property
+    def count(self):
+        return int(self.header[_COUNT])
+
+    def append(self, timestamp, prices_by_asset):
+        """Write one tick; assets missing from prices_by_asset are stored as NaN"""
+        slot = self.count % self.capacity
+        self.timestamps[slot] = timestamp
+        self.prices[:, slot] = [prices_by_asset.get(coin, np.nan) for coin in self.assets]
+        # Publish the tick only after its data is in place
+        self.header[_COUNT] = self.count + 1
+
+    def append_many(self, timestamps, prices):
+        """Bulk write, prices shaped (assets, ticks); used to seed from the 7d sparkline"""
+        for column, timestamp in enumerate(timestamps):
+            slot = self.count % self.capacity
+            self.timestamps[slot] = timestamp
+            self.prices[:, slot] = prices[:, column]
+            self.header[_COUNT] = self.count + 1
+
+    def flush(self):
+        self.timestamps.flush()
+        self.prices.flush()
+        self.header.flush()
+
+    # Reading
+
+    def window(self, seconds, now=None):
+        """(timestamps, prices) for ticks in the last `seconds`; views into the map unless the window wraps"""
+        count = self.count
+        if count == 0:
+            return np.empty(0), np.empty((len(self.assets), 0))
+        now = now or time.time()
+        if count <= self.capacity:
+            start = np.searchsorted(self.timestamps[:count], now - seconds)
+            return self.timestamps[start:count], self.prices[:, start:count]
+
+        # Full ring: oldest tick at the write position. Skip it, the writer may be replacing it right now
+        head = count % self.capacity
+        older = slice(head + 1, self.capacity)
+        newer = slice(0, head)
+        cutoff = now - seconds
+        if self.timestamps[newer].size and self.timestamps[0] <= cutoff:
+            start = np.searchsorted(self.timestamps[newer], cutoff)
+            return self.timestamps[start:head], self.prices[:, start:head]
+        start = head + 1 + np.searchsorted(self.timestamps[older], cutoff)
+        return (np.concatenate([self.timestamps[start:], self.timestamps[newer]]),
+                np.concatenate([self.prices[:, start:], self.prices[:, newer]], axis=1))
+
+    def aggregates(self, seconds, now=None):
+        """Per-asset first, last, min, max and % change over the window"""
+        timestamps, prices = self.window(seconds, now)
+        if not timestamps.size:
+            return None
+        with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # Assets with no price in the window stay NaN
+            first = prices[:, 0]
+            last = prices[:, -1]
+            return {
+                "ticks": int(timestamps.size),
+                "span_seconds": float(timestamps[-1] - timestamps[0]),
+                "first": first,
+                "last": last,
+                "min": np.nanmin(prices, axis=1),
+                "max": np.nanmax(prices, axis=1),
+                "change_pct": (last / first - 1) * 100,
+            }
+
+
+def trend_context(store, coin="ethereum"):
+    """Short 1h/24h/7d trend line for the recommendation prompt ('' without history)"""
+    if store is None:
+        return ""
+    store.refresh()
+    if coin not in store.index:
+        return ""
+    row = store.index[coin]
+    parts = []
+    for label, seconds in WINDOWS.items():
+        stats = store.aggregates(seconds)
+        # Skip windows that history only covers a small part of
+        if stats is None or stats["span_seconds"] < seconds * 0.5 or np.isnan(stats["change_pct"][row]):
+            continue
+        parts.append(f"{label} {stats['change_pct'][row]:+.2f}% (range ${stats['min'][row]:,.2f}-${stats['max'][row]:,.2f})")
+    if not parts:
+        return ""
+    return f"ETH trend: {', '.join(parts)}\n"
+
+
+# Collector
+
+def _seed_from_sparkline(store, table):
+    """Fill an empty store with the 7d hourly sparkline so trends are available on first start"""
+    if table.sparkline.size == 0:
+        return
+    hours = table.sparkline.shape[1]
+    timestamps = table.fetched_at - 3600 * np.arange(hours - 1, -1, -1)
+    prices = np.full((len(store.assets), hours), np.nan)
+    for coin, row in store.index.items():
+        if coin in table.index:
+            prices[row] = table.sparkline[table.index[coin]]
+    store.append_many(timestamps[:-1], prices[:, :-1])  # The last point is the current tick
+
+
+def _collect(store):
+    while True:
+        try:
+            table = market_cache.get()  # Shares the panel request with the UI and prompt
+            if table is not None:
+                if store.count == 0:
+                    _seed_from_sparkline(store, table)
+                store.append(time.time(), {coin: float(table.price[row]) for coin, row in table.index.items()})
+                store.flush()
+        except Exception as error_message:
+            print(f"Error collecting price tick: {str(error_message)}")
+        time.sleep(TICK_INTERVAL)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_tick_store():
+    """Process-wide store; the first process to take the writer lock also runs the collector"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = TickStore()
+            if _store.acquire_writer():
+                threading.Thread(target=_collect, args=(_store,), name="tick-collector", daemon=True).start()
+        return _store
+
+
+if __name__ == "__main__":
+    # Print the current trends from an existing store: python tick_store.py
+    store = TickStore()
+    print(f"{store.count} ticks for {len(store.assets)} assets")
+    print(trend_context(store) or "Not enough history yet")
@@ -0,0 +1,100 @@
+# token_budget.py
+# Local token estimates, input trimming and per-class output budgets for Claude
+# requests. Generation time grows with output length, so a quick question asks
+# for a short answer instead of the 5000-token ceiling every request used to get.
+import os
+import re
+import math
+import threading
+
+from tracing import Counter, register_metric
+
+# Output budget (max_tokens) per request class
+OUTPUT_BUDGETS = {
+    "quick": int(os.getenv("RECOMMENDATION_MAX_TOKENS_QUICK", "400")),
+    "standard": int(os.getenv("RECOMMENDATION_MAX_TOKENS_STANDARD", "1200")),
+    "detailed": int(os.getenv("RECOMMENDATION_MAX_TOKENS_DETAILED", "3000")),
+}
+# User input beyond this many (estimated) tokens is trimmed before it is sent
+MAX_INPUT_TOKENS = int(os.getenv("RECOMMENDATION_MAX_INPUT_TOKENS", "1500"))
+
+# Words that ask for a plan rather than a fact
+DETAILED_HINTS = ("strategy", "strategies", "portfolio", "allocate", "allocation", "compare", "plan",
+                  "step by step", "detailed", "in depth", "diversify", "rebalance")
+QUICK_HINTS = ("quick", "briefly", "short answer", "tl;dr", "in one sentence")
+QUICK_MAX_WORDS = 20
+
+TOKENS = register_metric(Counter("zagent_claude_tokens_total", "Claude tokens by direction and request class"))
+
+_lock = threading.Lock()
+_chars_per_token = 4.0  # English text averages ~4 characters per token; corrected from real usage below
+
+
+def estimate_tokens(text):
+    """Approximate Claude token count without a tokenizer or a network call"""
+    if not text:
+        return 0
+    return math.ceil(len(text) / _chars_per_token)
+
+
+def classify_request(user_input):
+    """'quick', 'standard' or 'detailed', from the wording and length of the question"""
+    text = user_input.lower()
+    if any(hint in text for hint in QUICK_HINTS):
+        return "quick"
+    if any(hint in text for hint in DETAILED_HINTS):
+        return "detailed"
+    if len(text.split()) <= QUICK_MAX_WORDS and "?" in text:
+        return "quick"
+    return "standard"
+
+
+def trim_input(text, max_tokens=MAX_INPUT_TOKENS):
+    """Fit text into max_tokens: collapse whitespace, drop repeated sentences, then keep head and tail"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    # Pasted documents are often mostly whitespace and repeated boilerplate
+    seen = set()
+    sentences = []
+    for sentence in re.split(r"(?<=[.!?])\s+", re.sub(r"\s+", " ", text).strip()):
+        key = sentence.lower()
+        if key not in seen:
+            seen.add(key)
+            sentences.append(sentence)
+    text = " ".join(sentences)
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    # The question is usually at the start or the end, so keep both and cut the middle
+    max_chars = int((max_tokens - 20) * _chars_per_token)  # Room for the marker
+    head = text[:max_chars * 2 // 3]
+    tail = text[len(text) - max_chars // 3:]
+    trimmed = estimate_tokens(text) - max_tokens
+    return f"{head} [... about {trimmed} tokens trimmed ...] {tail}"
+
+
+def request_class_for(max_tokens):
+    for request_class, budget in OUTPUT_BUDGETS.items():
+        if budget == max_tokens:
+            return request_class
+    return "custom"
+
+
+def log_token_usage(request_kwargs, input_tokens=None, output_tokens=None):
+    """Log estimated vs actual tokens for one request and feed the counters behind /metrics"""
+    global _chars_per_token
+    request_class = request_class_for(request_kwargs.get("max_tokens"))
+    prompt_text = request_kwargs.get("system", "") + "".join(
+        message["content"] for message in request_kwargs.get("messages", []) if isinstance(message["content"], str))
+    estimated = estimate_tokens(prompt_text)
+
+    if input_tokens:
+        TOKENS.inc(input_tokens, direction="input", request_class=request_class)
+        # Slowly track the real characters-per-token ratio so trimming stays close to the limit
+        with _lock:
+            _chars_per_token = 0.9 * _chars_per_token + 0.1 * (len(prompt_text) / input_tokens)
+    if output_tokens:
+        TOKENS.inc(output_tokens, direction="output", request_class=request_class)
+    print(f"Tokens - class={request_class} input={input_tokens} (estimated {estimated}) "
+          f"output={output_tokens}/{request_kwargs.get('max_tokens')}")
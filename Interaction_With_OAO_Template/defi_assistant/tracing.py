@@ -0,0 +1,236 @@
+# tracing.py
+# Timing spans around external calls, correlation ids that tie a user request
+# to its tx hash and oracle requestId, Prometheus text metrics and a slow-request log.
+#
+#   with request_context("recommendation"):   # one per user request
+#       with span("claude.create"):           # one per external call
+#           ...
+#       link(tx_hash=tx_hash)                 # later: request_id from the receipt tracker
+#
+# Context is carried in contextvars, so it follows asyncio tasks automatically.
+import os
+import time
+import uuid
+import threading
+import contextvars
+from collections import OrderedDict
+from contextlib import contextmanager
+
+SLOW_REQUEST_SECONDS = float(os.getenv("SLOW_REQUEST_SECONDS", "10"))
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+_current_request = contextvars.ContextVar("current_request", default=None)
+
+
+# Metrics
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in labels) + "}"
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_label_text(labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._series = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    lines.append(f"{self.name}_bucket{_label_text(labels + (('le', bound),))} {count}")
+                lines.append(f"{self.name}_bucket{_label_text(labels + (('le', '+Inf'),))} {series[-1]}")
+                lines.append(f"{self.name}_sum{_label_text(labels)} {series[-2]}")
+                lines.append(f"{self.name}_count{_label_text(labels)} {series[-1]}")
+        return lines
+
+
+STAGE_SECONDS = Histogram("zagent_stage_seconds", "Duration of external calls and pipeline stages")
+STAGE_ERRORS = Counter("zagent_stage_errors_total", "Failed external calls and pipeline stages")
+REQUEST_SECONDS = Histogram("zagent_request_seconds", "End-to-end duration of user requests")
+REQUEST_ERRORS = Counter("zagent_request_errors_total", "Failed user requests")
+SLOW_REQUESTS = Counter("zagent_slow_requests_total", "Requests slower than SLOW_REQUEST_SECONDS")
+
+_metrics = [STAGE_SECONDS, STAGE_ERRORS, REQUEST_SECONDS, REQUEST_ERRORS, SLOW_REQUESTS]
+_gauge_sources = {}  # metric prefix -> function returning a dict of numbers (e.g. cache stats())
+
+
+def register_metric(metric):
+    _metrics.append(metric)
+    return metric
+
+
+def register_stats(prefix, stats_fn):
+    """Expose stats_fn()'s numeric values as gauges named <prefix>_<key>"""
+    _gauge_sources[prefix] = stats_fn
+
+
+def render_metrics():
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    for prefix, stats_fn in sorted(_gauge_sources.items()):
+        try:
+            stats = stats_fn()
+        except Exception as error_message:
+            print(f"Error collecting {prefix} stats: {str(error_message)}")
+            continue
+        for key, value in sorted(stats.items()):
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                lines.append(f"# TYPE {prefix}_{key} gauge")
+                lines.append(f"{prefix}_{key} {value}")
+    return "\n".join(lines) + "\n"
+
+
+# Requests and spans
+
+class RequestTrace:
+    def __init__(self, name, correlation_id):
+        self.name = name
+        self.correlation_id = correlation_id
+        self.started_at = time.perf_counter()
+        self.spans = []  # (stage, seconds, error)
+        self.ids = {}  # tx_hash / request_id once known
+
+
+# tx hash -> correlation id, so the background receipt tracker can log under the right request
+_tx_correlation = OrderedDict()
+_tx_lock = threading.Lock()
+MAX_TRACKED_TX = 10_000
+
+
+def current_correlation_id():
+    trace = _current_request.get()
+    return trace.correlation_id if trace is not None else None
+
+
+@contextmanager
+def request_context(name, correlation_id=None):
+    """Trace one user request; nested calls join the request already in progress"""
+    if _current_request.get() is not None:
+        yield _current_request.get()
+        return
+
+    trace = RequestTrace(name, correlation_id or uuid.uuid4().hex[:16])
+    token = _current_request.set(trace)
+    failed = False
+    try:
+        yield trace
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        _current_request.reset(token)
+        elapsed = time.perf_counter() - trace.started_at
+        REQUEST_SECONDS.observe(elapsed, request=name)
+        if failed:
+            REQUEST_ERRORS.inc(request=name)
+        if elapsed > SLOW_REQUEST_SECONDS:
+            SLOW_REQUESTS.inc(request=name)
+            breakdown = ", ".join(f"{stage}={seconds:.3f}s{' (error)' if error else ''}"
+                                  for stage, seconds, error in trace.spans)
+            print(f"Slow request - {name} [{trace.correlation_id}] {elapsed:.2f}s {trace.ids}: {breakdown}")
+
+
+@contextmanager
+def span(stage):
+    """Time one external call or stage"""
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except BaseException:
+        error = True
+        STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        trace = _current_request.get()
+        if trace is not None:
+            trace.spans.append((stage, elapsed, error))
+
+
+def link(tx_hash=None, request_id=None):
+    """Attach a tx hash and/or oracle requestId to the current request (or to the request that sent tx_hash)"""
+    correlation_id = current_correlation_id()
+    if tx_hash is not None:
+        with _tx_lock:
+            if correlation_id is not None:
+                _tx_correlation[tx_hash] = correlation_id
+                while len(_tx_correlation) > MAX_TRACKED_TX:
+                    _tx_correlation.popitem(last=False)
+            else:
+                correlation_id = _tx_correlation.get(tx_hash)
+
+    trace = _current_request.get()
+    if trace is not None:
+        if tx_hash is not None:
+            trace.ids["tx_hash"] = tx_hash
+        if request_id is not None:
+            trace.ids["request_id"] = request_id
+    if correlation_id is not None:
+        print(f"Trace - [{correlation_id}] tx_hash={tx_hash} request_id={request_id}")
+    return correlation_id
+
+
+def correlation_for_tx(tx_hash):
+    with _tx_lock:
+        return _tx_correlation.get(tx_hash)
+
+
+def start_metrics_server(port):
+    """Serve /metrics from a daemon thread, for processes without api_server (e.g. Streamlit)"""
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            data = render_metrics().encode("utf-8")
+            self.send_response(200 if self.path.startswith("/metrics") else 404)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
@@ -1,7 +1,10 @@
 #!/usr/bin/env python3
 
+import argparse
 import copy
+import hashlib
 import json
+import os
 import re
 import subprocess
 from enum import Enum as PyEnum
@@ -12,6 +15,11 @@ VoidFn = Callable[[], None]
 
 CHEATCODES_JSON_URL = "https://raw.githubusercontent.com/foundry-rs/foundry/master/crates/cheatcodes/assets/cheatcodes.json"
 OUT_PATH = "src/Vm.sol"
+CACHE_PATH = "cache/vm.py.json"
+
+# Bump whenever a change to this script changes the generated output, so cached
+# results from the previous version are not reused.
+GENERATOR_VERSION = 1
 
 VM_SAFE_DOC = """\
 /// The `VmSafe` interface does not allow manipulation of the EVM state or other actions that may
@@ -26,9 +34,92 @@ VM_DOC = """\
 
 
 def main():
-    json_str = request.urlopen(CHEATCODES_JSON_URL).read().decode("utf-8")
-    contract = Cheatcodes.from_json(json_str)
+    parser = argparse.ArgumentParser(description="Generate src/Vm.sol from Foundry's cheatcodes.json")
+    parser.add_argument(
+        "--from",
+        dest="input",
+        default=CHEATCODES_JSON_URL,
+        help="cheatcodes.json to generate from: a local path (no network access) or a URL",
+    )
+    parser.add_argument("--out", default=OUT_PATH, help="output Solidity file")
+    parser.add_argument("--cache", default=CACHE_PATH, help="file recording the hashes of the last generation")
+    parser.add_argument("--no-fmt", dest="fmt", action="store_false", help="do not run `forge fmt` on the output")
+    parser.add_argument("--force", action="store_true", help="regenerate even if the input is unchanged")
+    args = parser.parse_args()
+
+    raw = read_input(args.input)
+    key = cache_key(raw, args.fmt)
+    if not args.force and is_up_to_date(args.cache, args.out, key):
+        print(f"{args.out} is up to date")
+        return
+
+    out = generate(Cheatcodes.from_json(raw))
+    write_if_changed(args.out, out.encode("utf-8"))
+
+    if args.fmt:
+        forge_fmt = ["forge", "fmt", args.out]
+        res = subprocess.run(forge_fmt)
+        assert res.returncode == 0, f"command failed: {forge_fmt}"
+
+    save_cache(args.cache, key, args.out)
+    print(f"Wrote to {args.out}")
+
+
+def read_input(source: str) -> bytes:
+    if re.match(r"^https?://", source):
+        return request.urlopen(source).read()
+    with open(source, "rb") as f:
+        return f.read()
+
+
+def sha256_file(path: str) -> str | None:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def cache_key(raw: bytes, fmt: bool) -> dict:
+    # The output is a pure function of the input bytes, this script's version and
+    # whether it was formatted, so these identify a generation.
+    return {
+        "generator": GENERATOR_VERSION,
+        "input_sha256": hashlib.sha256(raw).hexdigest(),
+        "fmt": fmt,
+    }
+
+
+def is_up_to_date(cache_path: str, out_path: str, key: dict) -> bool:
+    try:
+        with open(cache_path, "r") as f:
+            cache = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return False
+    # The output must also still be what was generated, not edited or deleted since.
+    return cache.get("key") == key and cache.get("output_sha256") == sha256_file(out_path)
+
+
+def save_cache(cache_path: str, key: dict, out_path: str):
+    cache = {"key": key, "output_sha256": sha256_file(out_path)}
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    write_if_changed(cache_path, (json.dumps(cache, indent=2, sort_keys=True) + "\n").encode("utf-8"))
+
+
+def write_if_changed(path: str, data: bytes):
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return
+    except FileNotFoundError:
+        pass
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
 
+def generate(contract: "Cheatcodes") -> str:
     ccs = contract.cheatcodes
     ccs = list(filter(lambda cc: cc.status not in ["experimental", "internal"], ccs))
     ccs.sort(key=lambda cc: cc.func.id)
@@ -84,16 +175,7 @@ def main():
     def memory_to_calldata(m: re.Match) -> str:
         return " calldata " + m.group(1)
 
-    out = re.sub(r" memory (.*returns)", memory_to_calldata, out)
-
-    with open(OUT_PATH, "w") as f:
-        f.write(out)
-
-    forge_fmt = ["forge", "fmt", OUT_PATH]
-    res = subprocess.run(forge_fmt)
-    assert res.returncode == 0, f"command failed: {forge_fmt}"
-
-    print(f"Wrote to {OUT_PATH}")
+    return re.sub(r" memory (.*returns)", memory_to_calldata, out)
 
 
 class CmpCheatcode:
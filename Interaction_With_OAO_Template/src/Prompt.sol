@@ -9,7 +9,7 @@ contract Prompt is AIOracleCallbackReceiver {
     event promptsUpdated(
         uint256 requestId,
         uint256 modelId,
-        string input,
+        bytes32 promptHash,
         string output,
         bytes callbackData
     );
@@ -21,11 +21,11 @@ contract Prompt is AIOracleCallbackReceiver {
         string prompt
     );
 
+    // Two fixed slots per request: the prompt itself is only kept in calldata and the promptRequest log
     struct AIOracleRequest {
         address sender;
-        uint256 modelId;
-        bytes input;
-        bytes output;
+        uint96 modelId;
+        bytes32 promptHash;
     }
 
     address owner;
@@ -49,18 +49,40 @@ contract Prompt is AIOracleCallbackReceiver {
         callbackGasLimit[modelId] = gasLimit;
     }
 
-    mapping(uint256 => mapping(string => string)) public prompts;
+    // Each output is stored once, keyed by requestId
+    mapping(uint256 => string) public outputs;
+
+    // Most recently answered request per model and keccak256(prompt), so results can still be looked up by prompt.
+    // Set in the callback, not at request time: resubmitting a prompt keeps serving the previous output until the new one arrives
+    mapping(uint256 => mapping(bytes32 => uint256)) public latestRequest;
 
     function getAIResult(uint256 modelId, string calldata prompt) external view returns (string memory) {
-        return prompts[modelId][prompt];
+        return _resultFor(modelId, keccak256(bytes(prompt)));
+    }
+
+    function getAIResultByHash(uint256 modelId, bytes32 promptHash) external view returns (string memory) {
+        return _resultFor(modelId, promptHash);
+    }
+
+    function _resultFor(uint256 modelId, bytes32 promptHash) internal view returns (string memory) {
+        uint256 requestId = latestRequest[modelId][promptHash];
+        // An unset entry reads as requestId 0, which must not return another prompt's output
+        if (requests[requestId].promptHash != promptHash) {
+            return "";
+        }
+        return outputs[requestId];
+    }
+
+    function getAIResultByRequestId(uint256 requestId) external view returns (string memory) {
+        return outputs[requestId];
     }
 
     function aiOracleCallback(uint256 requestId, bytes calldata output, bytes calldata callbackData) external override onlyAIOracleCallback() {
         AIOracleRequest storage request = requests[requestId];
         require(request.sender != address(0), "request does not exist");
-        request.output = output;
-        prompts[request.modelId][string(request.input)] = string(output);
-        emit promptsUpdated(requestId, request.modelId, string(request.input), string(output), callbackData);
+        outputs[requestId] = string(output);
+        latestRequest[request.modelId][request.promptHash] = requestId;
+        emit promptsUpdated(requestId, request.modelId, request.promptHash, string(output), callbackData);
     }
 
     function estimateFee(uint256 modelId) public view returns (uint256) {
@@ -68,16 +90,15 @@ contract Prompt is AIOracleCallbackReceiver {
     }
 
     function calculateAIResult(uint256 modelId, string calldata prompt) payable external {
+        require(modelId <= type(uint96).max, "modelId too large");
         bytes memory input = bytes(prompt);
         bytes memory callbackData = bytes("");
         address callbackAddress = address(this);
         uint256 requestId = aiOracle.requestCallback{value: msg.value}(
             modelId, input, callbackAddress, callbackGasLimit[modelId], callbackData
         );
-        AIOracleRequest storage request = requests[requestId];
-        request.input = input;
-        request.sender = msg.sender;
-        request.modelId = modelId;
+        bytes32 promptHash = keccak256(input);
+        requests[requestId] = AIOracleRequest({sender: msg.sender, modelId: uint96(modelId), promptHash: promptHash});
         emit promptRequest(requestId, msg.sender, modelId, prompt);
     }
 }
\ No newline at end of file
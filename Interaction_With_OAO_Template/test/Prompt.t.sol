@@ -0,0 +1,124 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.13;
+
+import {Test} from "forge-std/Test.sol";
+import {Prompt} from "../src/Prompt.sol";
+import {IAIOracle} from "OAO/contracts/interfaces/IAIOracle.sol";
+import {AIOracleCallbackReceiver} from "OAO/contracts/AIOracleCallbackReceiver.sol";
+
+// Stand-in for the OAO proxy: sequential requestIds, fee = callback gas limit, callbacks delivered by the test
+contract MockAIOracle is IAIOracle {
+    uint256 public nextRequestId = 1;
+
+    function requestCallback(uint256, bytes memory, address, uint64, bytes memory) external payable returns (uint256) {
+        return nextRequestId++;
+    }
+
+    function estimateFee(uint256, uint256 gasLimit) external pure returns (uint256) {
+        return gasLimit;
+    }
+
+    function isFinalized(uint256) external pure returns (bool) {
+        return true;
+    }
+}
+
+contract PromptTest is Test {
+    event promptsUpdated(uint256 requestId, uint256 modelId, bytes32 promptHash, string output, bytes callbackData);
+    event promptRequest(uint256 requestId, address sender, uint256 modelId, string prompt);
+
+    uint256 constant MODEL_ID = 11;
+    string constant PROMPT = "Analyze yield optimization for staking ETH";
+
+    MockAIOracle oracle;
+    Prompt prompt;
+
+    function setUp() public {
+        oracle = new MockAIOracle();
+        prompt = new Prompt(IAIOracle(address(oracle)));
+    }
+
+    function answer(uint256 requestId, string memory output) internal {
+        vm.prank(address(oracle));
+        prompt.aiOracleCallback(requestId, bytes(output), "");
+    }
+
+    function test_RequestStoresSenderModelAndPromptHash() public {
+        vm.expectEmit();
+        emit promptRequest(1, address(this), MODEL_ID, PROMPT);
+        prompt.calculateAIResult(MODEL_ID, PROMPT);
+
+        (address sender, uint96 modelId, bytes32 promptHash) = prompt.requests(1);
+        assertEq(sender, address(this));
+        assertEq(uint256(modelId), MODEL_ID);
+        assertEq(promptHash, keccak256(bytes(PROMPT)));
+    }
+
+    function test_ResultViews() public {
+        prompt.calculateAIResult(MODEL_ID, PROMPT);
+
+        vm.expectEmit();
+        emit promptsUpdated(1, MODEL_ID, keccak256(bytes(PROMPT)), "stake", "");
+        answer(1, "stake");
+
+        assertEq(prompt.getAIResult(MODEL_ID, PROMPT), "stake");
+        assertEq(prompt.getAIResultByHash(MODEL_ID, keccak256(bytes(PROMPT))), "stake");
+        assertEq(prompt.getAIResultByRequestId(1), "stake");
+        assertEq(prompt.outputs(1), "stake");
+        assertEq(prompt.latestRequest(MODEL_ID, keccak256(bytes(PROMPT))), 1);
+    }
+
+    function test_UnansweredAndUnknownPromptsAreEmpty() public {
+        prompt.calculateAIResult(MODEL_ID, PROMPT);
+        assertEq(prompt.getAIResult(MODEL_ID, PROMPT), "");
+        assertEq(prompt.getAIResultByRequestId(1), "");
+
+        answer(1, "stake");
+        // Unset latestRequest entries read as requestId 0 and must not leak another prompt's output
+        assertEq(prompt.getAIResult(MODEL_ID, "another prompt"), "");
+        assertEq(prompt.getAIResult(50, PROMPT), "");
+    }
+
+    function test_ResubmittedPromptServesPreviousOutputUntilAnswered() public {
+        prompt.calculateAIResult(MODEL_ID, PROMPT);
+        answer(1, "first");
+        prompt.calculateAIResult(MODEL_ID, PROMPT);
+
+        assertEq(prompt.getAIResult(MODEL_ID, PROMPT), "first");
+        assertEq(prompt.latestRequest(MODEL_ID, keccak256(bytes(PROMPT))), 1);
+
+        answer(2, "second");
+        assertEq(prompt.getAIResult(MODEL_ID, PROMPT), "second");
+        assertEq(prompt.getAIResultByRequestId(1), "first");
+        assertEq(prompt.getAIResultByRequestId(2), "second");
+    }
+
+    function test_CallbackOnlyFromOracle() public {
+        prompt.calculateAIResult(MODEL_ID, PROMPT);
+        vm.expectRevert(abi.encodeWithSelector(
+            AIOracleCallbackReceiver.UnauthorizedCallbackSource.selector, address(oracle), address(this)
+        ));
+        prompt.aiOracleCallback(1, bytes("forged"), "");
+    }
+
+    function test_CallbackForUnknownRequestReverts() public {
+        vm.prank(address(oracle));
+        vm.expectRevert(bytes("request does not exist"));
+        prompt.aiOracleCallback(7, bytes("orphan"), "");
+    }
+
+    function test_ModelIdMustFitUint96() public {
+        vm.expectRevert(bytes("modelId too large"));
+        prompt.calculateAIResult(uint256(type(uint96).max) + 1, PROMPT);
+    }
+
+    function test_EstimateFeeUsesCallbackGasLimit() public {
+        assertEq(prompt.estimateFee(MODEL_ID), 5_000_000);
+        prompt.setCallbackGasLimit(MODEL_ID, 1_000_000);
+        assertEq(prompt.estimateFee(MODEL_ID), 1_000_000);
+
+        vm.prank(address(0xBEEF));
+        vm.expectRevert(bytes("Only owner"));
+        prompt.setCallbackGasLimit(MODEL_ID, 1);
+    }
+}